@@ -0,0 +1,74 @@
+"""
+benchmarks/bench_normalize_coords.py
+Compare the original iterrows normalize_to_offense with the vectorized version.
+
+python benchmarks/bench_normalize_coords.py --rows 200000
+"""
+
+import os, sys, time, argparse
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.data.normalize_coords import offense_coordinates
+from src.data.tests.test_normalize_coords import legacy_normalize
+
+
+def synthetic_inputs(rows: int, games: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    gids = 2022020001 + np.arange(games)
+    sides = pd.DataFrame({
+        "game_id": np.repeat(gids, 3),
+        "period": np.tile([1, 2, 3], games),
+        "home_def": rng.choice(["left", "right"], games * 3),
+    })
+    teams = pd.DataFrame({"game_id": gids, "home_id": rng.integers(1, 33, games), "away_id": 0})
+    shots = pd.DataFrame({
+        "game_id": rng.choice(gids, rows),
+        "period": rng.integers(1, 4, rows),
+        "team_id": rng.integers(1, 33, rows),
+        "x": rng.integers(-99, 100, rows).astype(float),
+        "y": rng.integers(-42, 43, rows).astype(float),
+        "shot_type": "wrist",
+    })
+    shots.loc[shots.index % 2 == 0, "team_id"] = teams.set_index("game_id").loc[
+        shots.loc[shots.index % 2 == 0, "game_id"], "home_id"].to_numpy()
+    return shots, sides, teams
+
+
+def legacy(df, sides, teams):
+    """The original iterrows version (the reference kept in the normalize tests)."""
+    idx = {}
+    for gid, period, side in sides.itertuples(index=False):
+        idx.setdefault(str(gid), {})[period] = side
+    home_away = {str(g): (h, a) for g, h, a in teams.itertuples(index=False)}
+    return legacy_normalize(df, idx, home_away)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark normalize_to_offense")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--games", type=int, default=1312)
+    args = parser.parse_args()
+
+    shots, sides, teams = synthetic_inputs(args.rows, args.games)
+
+    t0 = time.perf_counter()
+    expected = legacy(shots, sides, teams)
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    result = offense_coordinates(shots, sides, teams)
+    t_vec = time.perf_counter() - t0
+
+    assert result.index.equals(expected.index)
+    assert np.allclose(result["x_off"], expected["x_off"].astype(float))
+    print(f"[INFO] rows={args.rows}  iterrows={t_legacy:.2f}s  vectorized={t_vec:.3f}s  "
+          f"speedup={t_legacy / t_vec:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+benchmarks/conftest.py
+Shared synthetic datasets for the pipeline benchmarks.
+
+pytest benchmarks/ --bench-scale season --benchmark-autosave
+pytest benchmarks/ --bench-scale season --benchmark-compare     # against the last saved run
+"""
+
+import os, sys
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.data.synthetic_games import write_synthetic_seasons
+from src.data.tidy_data import tidy_all_games
+
+# name -> (seasons, games per season)
+SCALES = {
+    "game": (1, 1),
+    "day": (1, 16),
+    "month": (1, 220),
+    "season": (1, 1312),
+    "all": (10, 1312),
+}
+
+
+def pytest_addoption(parser):
+    parser.addoption("--bench-scale", choices=sorted(SCALES), default="day",
+                     help="Synthetic dataset size for the benchmarks")
+
+
+@pytest.fixture(scope="session")
+def bench_scale(request):
+    return SCALES[request.config.getoption("--bench-scale")]
+
+
+@pytest.fixture(scope="session")
+def raw_dir(tmp_path_factory, bench_scale):
+    seasons, games = bench_scale
+    path = tmp_path_factory.mktemp("raw")
+    write_synthetic_seasons(str(path), seasons, games, backend="sqlite", seed=0)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def processed_dir(tmp_path_factory, raw_dir):
+    """Tidy outputs + game index for the synthetic raw store."""
+    path = tmp_path_factory.mktemp("processed")
+    tidy_all_games(raw_dir, processed_dir=str(path))
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def tidy_df(processed_dir):
+    from src.data.tidy_store import load_tidy_shots
+    return load_tidy_shots(processed_dir)
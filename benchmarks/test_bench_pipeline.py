@@ -0,0 +1,49 @@
+"""
+benchmarks/test_bench_pipeline.py
+pytest-benchmark suite for the data pipeline (run against synthetic games, no network).
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from src.data.raw_store import open_store
+from src.data.synthetic_games import synthetic_game
+from src.data.tidy_data import tidy_shots_from_game, tidy_all_games
+from src.data.normalize_coords import build_defending_side_index, normalize_to_offense
+
+
+def test_tidy_shots_from_game(benchmark):
+    game = synthetic_game(2022020001)
+    df = benchmark(tidy_shots_from_game, game)
+    assert not df.empty
+
+
+def test_raw_store_iter_games(benchmark, raw_dir):
+    store = open_store(raw_dir)
+    n = benchmark.pedantic(lambda: sum(1 for _ in store.iter_games()), rounds=3, iterations=1)
+    assert n == len(store.game_ids())
+
+
+@pytest.mark.parametrize("workers", [1, None], ids=["serial", "all-cores"])
+def test_tidy_all_games(benchmark, raw_dir, workers):
+    df = benchmark.pedantic(tidy_all_games, args=(raw_dir,), kwargs={"save": False, "workers": workers},
+                            rounds=3, iterations=1)
+    assert not df.empty
+
+
+def test_build_defending_side_index(benchmark, raw_dir):
+    idx = benchmark.pedantic(build_defending_side_index, args=(raw_dir,), rounds=3, iterations=1)
+    assert idx
+
+
+def test_normalize_to_offense(benchmark, tidy_df, raw_dir, processed_dir):
+    out = benchmark(normalize_to_offense, tidy_df, raw_dir, processed_dir)
+    assert (out["x_off"] >= 0).all()
+
+
+def test_shot_histogram(benchmark, tidy_df):
+    shot_map = pytest.importorskip("src.visualization.advanced_visualization.shot_map")
+    shots = tidy_df[(tidy_df["x"] >= 0)].dropna(subset=["x", "y"])
+    hist = benchmark(shot_map.shot_histogram, shots)
+    assert hist.sum() > 0
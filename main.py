@@ -6,8 +6,11 @@ Step 1.1: Test NHL API data downloading and print sample content.
 from src.utils.config import print_config
 from src.data.nhl_api_client import NHLDataClient
 from src.features.feature_engineering import build_features
+from src.features.feature_store import FeatureStore
 from src.models.baseline_models import train_logistic_regression
 from src.models.evaluation import evaluate_model
+from src.models.model_registry import save_model
+from src.models.wandb_logger import init_wandb, log_stage
 from src.serving.flask_app import start_server
 from src.data.tidy_data import summarize_game_info
 from src.data.tidy_data import tidy_all_games
@@ -37,15 +40,29 @@ def main():
     #     print(f"[FAIL] Could not download game {game_id}")
     
     
+    # Buffered experiment logging (local files when offline); stages below are timed
+    logger = init_wandb("nhl-xg", config={"model": "logreg_baseline"})
+
     # 2. Feature engineering
-    # tidy data
-    df = tidy_all_games("data/raw")
+    # tidy data (only new/changed games are re-parsed)
+    with log_stage("tidy"):
+        tidy_all_games("data/raw", incremental=True, keep_events=True)
+    # cached feature matrix: rebuilt only when the tidy data or feature version changes
+    with log_stage("features"):
+        features = FeatureStore().get_or_build()
+    df = features.frame()
     print(df.sample(5))
 
 
     # 3. Model training and evaluation
-    model = train_logistic_regression(df)
-    evaluate_model(model, df)
+    model = train_logistic_regression(features)
+    summary = evaluate_model(model, features, out_dir="data/evaluation", name="logreg_baseline", plots=True)
+    logger.log({"eval/auc": summary["auc"], "eval/logloss": summary["logloss"]})
+    logger.log_artifact("data/evaluation/logreg_baseline_metrics.json", type="evaluation")
+    # versioned artifact for serving (promoted = what the server loads)
+    save_model(model, "logreg_baseline", metrics={"auc": summary["auc"], "logloss": summary["logloss"]},
+               promote_now=True)
+    logger.finish()
 
     # 4. Serve model (optional)
     start_server()
@@ -11,7 +11,7 @@ def save_json(data, filepath):
     """Save a Python dict as a JSON file."""
     os.makedirs(os.path.dirname(filepath), exist_ok=True)
     with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+        json.dump(data, f, separators=(",", ":"))
     print(f"[INFO] Saved JSON to {filepath}")
 
 
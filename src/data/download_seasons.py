@@ -31,10 +31,16 @@ def main():
     parser.add_argument("--to-season", type=str, default=SEASONS[-1], 
                         help="End season (e.g., 2023)")
     parser.add_argument("--rate-limit", type=float, default=0.25, 
-                        help="Sleep seconds between requests")
+                        help="Average seconds between requests (shared by all workers)")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Number of parallel download workers")
+    parser.add_argument("--discovery", choices=["probe", "fallback"], default="probe",
+                        help="Game ID discovery: probe valid IDs, or enumerate the legacy ID ranges")
+    parser.add_argument("--refresh-manifest", action="store_true",
+                        help="Ignore saved per-season ID manifests and rediscover")
     args = parser.parse_args()
 
-    client = NHLDataClient(rate_limit_s=args.rate_limit)
+    client = NHLDataClient(rate_limit_s=args.rate_limit, concurrency=args.concurrency)
     try:
         start = SEASONS.index(args.from_season)  
     except ValueError:
@@ -46,7 +52,8 @@ def main():
 
     for season in SEASONS[start:end+1]:
         print(f"=== Downloading season {season} (types={args.include_types}) ===")
-        client.fetch_season(season, include_types=tuple(args.include_types), max_games=args.max_games)
+        client.fetch_season(season, include_types=tuple(args.include_types), max_games=args.max_games,
+                            discovery=args.discovery, refresh_manifest=args.refresh_manifest)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,53 @@
+"""
+event_stream.py
+Generator helpers for pulling events out of play-by-play documents.
+
+    plays = iter_plays(game, SHOT_TYPES)               # only the wanted typeDescKeys
+    rows  = project(plays, {"x": ("details", "xCoord"), ...})   # only the wanted fields
+
+Nothing here builds intermediate lists or DataFrames; callers decide when to materialize.
+"""
+
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+SHOT_TYPES = frozenset({"shot-on-goal", "goal"})
+
+FieldPath = Tuple[str, ...]
+
+
+def iter_plays(game: dict, types: Optional[Iterable[str]] = None) -> Iterator[dict]:
+    """Yield the plays of a game whose typeDescKey is in `types` (all plays if None)."""
+    wanted = frozenset(types) if types is not None else None
+    for play in game.get("plays") or []:
+        if wanted is None or play.get("typeDescKey") in wanted:
+            yield play
+
+
+def get_path(obj: dict, path: FieldPath, default=None):
+    """obj[path[0]][path[1]]... tolerating missing or null levels."""
+    for key in path:
+        if not isinstance(obj, dict):
+            return default
+        obj = obj.get(key)
+        if obj is None:
+            return default
+    return obj
+
+
+def project(plays: Iterable[dict], fields: Dict[str, FieldPath]) -> Iterator[tuple]:
+    """Yield one tuple per play with only the requested fields, in `fields` order."""
+    paths = list(fields.values())
+    for play in plays:
+        yield tuple(get_path(play, path) for path in paths)
+
+
+def iter_store_games(store, game_ids: Sequence[str]) -> Iterator[Tuple[str, dict]]:
+    """Yield (game_id, game) from a raw store, skipping (and reporting) unreadable games."""
+    for gid in game_ids:
+        try:
+            game = store.get(gid)
+        except Exception as e:
+            print(f"[WARN] Skipping game {gid}: {e}")
+            continue
+        if game is not None:
+            yield gid, game
@@ -0,0 +1,63 @@
+"""
+game_clock.py
+Vectorized parsing of the play-by-play clock ('MM:SS' strings, period numbers and
+period types) into integer-valued seconds. Used by the tidy pass and by feature code.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _mmss_slow(s: pd.Series) -> np.ndarray:
+    parts = s.str.split(":", n=1, expand=True)
+    if parts.shape[1] < 2:
+        return np.full(len(s), np.nan)
+    minutes = pd.to_numeric(parts[0], errors="coerce")
+    seconds = pd.to_numeric(parts[1], errors="coerce")
+    return (minutes * 60 + seconds).astype("float64").to_numpy()
+
+
+def mmss_to_seconds(values) -> np.ndarray:
+    """'MM:SS' strings -> seconds as float (NaN for missing/invalid)."""
+    s = pd.Series(values, dtype="object")
+    # Fast path: view fixed-width 'MM:SS' as a (n, 5) byte matrix and combine the digits
+    raw = np.asarray(s.where(s.notna(), ""), dtype="S5")
+    d = raw.view(np.uint8).reshape(len(raw), 5).astype(np.int16) - ord("0")
+    ok = (d[:, 2] == ord(":") - ord("0")) & ((d[:, [0, 1, 3, 4]] >= 0) & (d[:, [0, 1, 3, 4]] <= 9)).all(axis=1)
+    out = ((d[:, 0] * 10 + d[:, 1]) * 60 + d[:, 3] * 10 + d[:, 4]).astype("float64")
+    out[~ok] = np.nan
+    # Anything not in the canonical form (e.g. '5:30', '100:00') goes through the slow parser
+    retry = ~ok & s.notna().to_numpy()
+    if retry.any():
+        out[retry] = _mmss_slow(s[retry].astype("string"))
+    return out
+
+
+REG_PERIOD_SECONDS = 1200
+# Regular-season overtime is 5 minutes and is followed by the shootout; playoff OTs are full periods
+REG_SEASON_OT_SECONDS = 300
+
+
+def game_clock(game_id, period, period_type, time_in_period, time_remaining=None):
+    """
+    (period_seconds, game_seconds, seconds_remaining) as float arrays (NaN when unknown).
+    period_type ('REG' / 'OT' / 'SO') decides the period length; shootout attempts all
+    sit at the end of overtime (game_seconds 3900, 0 s remaining).
+    """
+    period = pd.to_numeric(pd.Series(period), errors="coerce").astype("float64").to_numpy()
+    ptype = pd.Series(period_type, dtype="object").to_numpy() if period_type is not None \
+        else np.where(period > 3, "OT", "REG")
+    regular_season = (np.asarray(game_id, dtype="int64") // 10_000) % 100 == 2
+
+    elapsed = mmss_to_seconds(time_in_period)
+    length = np.select([ptype == "SO", (ptype == "OT") & regular_season],
+                       [0, REG_SEASON_OT_SECONDS], REG_PERIOD_SECONDS)
+    elapsed = np.where(ptype == "SO", 0.0, elapsed)
+    start = np.where(regular_season & (period > 3),
+                     3 * REG_PERIOD_SECONDS + (period - 4) * REG_SEASON_OT_SECONDS,
+                     (period - 1) * REG_PERIOD_SECONDS)
+
+    remaining = mmss_to_seconds(time_remaining) if time_remaining is not None else np.full(len(elapsed), np.nan)
+    remaining = np.where(np.isnan(remaining), np.maximum(length - elapsed, 0), remaining)
+    remaining = np.where(ptype == "SO", 0.0, remaining)
+    return elapsed, start + elapsed, remaining
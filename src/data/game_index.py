@@ -0,0 +1,154 @@
+"""
+game_index.py
+Per-game metadata index, built in the same pass as tidying.
+
+    data/processed/game_index/games.parquet    one row per game
+        game_id, season, game_type, game_date, home_team_id, away_team_id,
+        n_events, n_shots, n_goals
+    data/processed/game_index/periods.parquet  one row per (game, period)
+        game_id, period, home_def
+
+Later stages (coordinate normalization, features) read this table instead of raw JSON.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.data.raw_store import open_store, season_of
+from src.data.tidy_store import default_format
+from src.utils.config import PROCESSED_DIR
+
+INDEX_NAME = "game_index"
+
+GAME_COLUMNS = [
+    "game_id", "season", "game_type", "game_date", "home_team_id", "away_team_id",
+    "n_events", "n_shots", "n_goals",
+]
+PERIOD_COLUMNS = ["game_id", "period", "home_def"]
+
+GAME_DTYPES = {
+    "game_id": "int32", "season": "category", "game_type": "Int8", "game_date": "string",
+    "home_team_id": "Int32", "away_team_id": "Int32",
+    "n_events": "int16", "n_shots": "int16", "n_goals": "int16",
+}
+PERIOD_DTYPES = {"game_id": "int32", "period": "int8", "home_def": "category"}
+
+# Used when a game carries no homeTeamDefendingSide at all
+DEFAULT_SIDES = {1: "left", 2: "right", 3: "left", 4: "right", 5: "left"}
+
+
+def play_sides(plays: List[dict]) -> Dict[int, str]:
+    """{period: home team defending side} for the periods whose plays carry it (first play wins)."""
+    per_map = {}
+    for p in plays:
+        pdsc = p.get("periodDescriptor", {}) or {}
+        num = pdsc.get("number")
+        # The API puts the side on the play; older dumps had it in periodDescriptor
+        side = p.get("homeTeamDefendingSide") or pdsc.get("homeTeamDefendingSide")
+        if num and side and num not in per_map:
+            per_map[num] = side
+    return per_map
+
+
+def period_sides(game_json: dict) -> Dict[int, str]:
+    """{period: home team defending side}, from the first play of each period that has it."""
+    return play_sides(game_json.get("plays", [])) or dict(DEFAULT_SIDES)
+
+
+def game_meta(game_json: dict) -> Tuple[tuple, List[tuple]]:
+    """(game row, period rows) for one game, in GAME_COLUMNS / PERIOD_COLUMNS order."""
+    gid = game_json.get("id")
+    plays = game_json.get("plays", [])
+    n_shots = n_goals = 0
+    for p in plays:
+        kind = p.get("typeDescKey")
+        if kind == "goal":
+            n_goals += 1
+            n_shots += 1
+        elif kind == "shot-on-goal":
+            n_shots += 1
+    game_row = (
+        gid, season_of(gid), game_json.get("gameType"), game_json.get("gameDate"),
+        (game_json.get("homeTeam", {}) or {}).get("id"),
+        (game_json.get("awayTeam", {}) or {}).get("id"),
+        len(plays), n_shots, n_goals,
+    )
+    period_rows = [(gid, num, side) for num, side in sorted(period_sides(game_json).items())]
+    return game_row, period_rows
+
+
+def index_frames(game_rows: List[tuple], period_rows: List[tuple]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    games = pd.DataFrame(game_rows, columns=GAME_COLUMNS).astype(GAME_DTYPES)
+    periods = pd.DataFrame(period_rows, columns=PERIOD_COLUMNS).astype(PERIOD_DTYPES)
+    return games, periods
+
+
+def index_paths(processed_dir: str, fmt: str) -> Tuple[str, str]:
+    root = os.path.join(processed_dir, INDEX_NAME)
+    ext = "parquet" if fmt == "parquet" else "csv"
+    return os.path.join(root, f"games.{ext}"), os.path.join(root, f"periods.{ext}")
+
+
+def has_game_index(processed_dir: str = PROCESSED_DIR, fmt: Optional[str] = None) -> bool:
+    return all(os.path.exists(p) for p in index_paths(processed_dir, fmt or default_format()))
+
+
+def save_game_index(games: pd.DataFrame, periods: pd.DataFrame, processed_dir: str = PROCESSED_DIR,
+                    fmt: Optional[str] = None):
+    fmt = fmt or default_format()
+    games_path, periods_path = index_paths(processed_dir, fmt)
+    os.makedirs(os.path.dirname(games_path), exist_ok=True)
+    for df, path in ((games, games_path), (periods, periods_path)):
+        if fmt == "parquet":
+            df.to_parquet(path + ".tmp", index=False, engine="pyarrow")
+        else:
+            df.to_csv(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+    print(f"[INFO] Saved game index: {len(games)} games, {len(periods)} periods")
+
+
+def index_format(processed_dir: str = PROCESSED_DIR, fmt: Optional[str] = None) -> str:
+    """fmt (default: default_format()), or "csv" when only a CSV index is saved."""
+    fmt = fmt or default_format()
+    if fmt == "parquet" and not has_game_index(processed_dir, fmt) and has_game_index(processed_dir, "csv"):
+        return "csv"
+    return fmt
+
+
+def load_game_index(processed_dir: str = PROCESSED_DIR,
+                    fmt: Optional[str] = None) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """(games, periods) or None if no index was saved."""
+    fmt = index_format(processed_dir, fmt)
+    if not has_game_index(processed_dir, fmt):
+        return None
+    games_path, periods_path = index_paths(processed_dir, fmt)
+    if fmt == "parquet":
+        games, periods = pd.read_parquet(games_path), pd.read_parquet(periods_path)
+    else:
+        games = pd.read_csv(games_path, dtype={"season": "string", "game_date": "string"})
+        periods = pd.read_csv(periods_path)
+    return games.astype(GAME_DTYPES), periods.astype(PERIOD_DTYPES)
+
+
+def upsert_game_index(games: pd.DataFrame, periods: pd.DataFrame, drop_ids,
+                      processed_dir: str = PROCESSED_DIR, fmt: Optional[str] = None):
+    """Replace the index rows of drop_ids (changed/removed games) with the given rows."""
+    current = load_game_index(processed_dir, fmt)
+    if current is not None:
+        old_games, old_periods = current
+        drop_ids = set(drop_ids)
+        games = pd.concat([old_games[~old_games["game_id"].isin(drop_ids)], games], ignore_index=True)
+        periods = pd.concat([old_periods[~old_periods["game_id"].isin(drop_ids)], periods], ignore_index=True)
+    save_game_index(games.astype(GAME_DTYPES), periods.astype(PERIOD_DTYPES), processed_dir, fmt)
+
+
+def build_game_index(raw_dir: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Standalone single pass over the raw store (when no saved index is available)."""
+    game_rows, period_rows = [], []
+    for _, g in open_store(raw_dir).iter_games():
+        game_row, periods = game_meta(g)
+        game_rows.append(game_row)
+        period_rows.extend(periods)
+    return index_frames(game_rows, period_rows)
@@ -5,20 +5,75 @@ Use API download NHL play-by-play JSON files for full seasons.
 - Combines stable ID enumeration from original project
 - Keeps retry, rate limit, caching, and improved logging
 - Adjusts season ranges and prints success statistics
+- Optional concurrent fetching over one pooled session, throttled by a
+  token bucket shared across worker threads
+- Probe-based ID discovery (binary search / playoff bracket walk) with a
+  persisted per-season manifest of valid IDs
 """
 
-import os, time, requests, json
+import os, time, requests, json, threading
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
 from typing import Optional, List, Set, Tuple
-from src.utils.config import API_BASE_URL, RAW_DIR
+from src.utils.config import API_BASE_URL, RAW_DIR, MANIFEST_DIR
+from src.data.raw_store import open_store
 
 DEFAULT_TIMEOUT = 20
 RETRY_STATUS = {429, 500, 502, 503, 504}
 
+# Upper bound for the regular-season binary search (32 teams x 82 / 2 = 1312)
+REG_SEASON_MAX = 1400
+# Playoff IDs are YYYY030RSG: round R, series S within the round, game G
+PLAYOFF_SERIES_PER_ROUND = {1: 8, 2: 4, 3: 2, 4: 1}
+PLAYOFF_MAX_GAMES = 7
+# 2019-20 bubble: qualifying round encoded as round 0 (series 1-8)
+PLAYOFF_QUALIFIER_SEASONS = {"20192020"}
+
+
+class ProbeError(RuntimeError):
+    """A probe request failed for a reason other than 404 (network error, exhausted retries)."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests/sec with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
 class NHLDataClient:
-    def __init__(self, rate_limit_s: float = 0.25):
+    def __init__(self, rate_limit_s: float = 0.25, concurrency: int = 1, store=None):
         self.base = API_BASE_URL.rstrip('/')
+        self.store = store or open_store(RAW_DIR)
         self.rate_limit_s = rate_limit_s
+        self.concurrency = max(1, concurrency)
+        # One session shared by all workers; size its pool to the worker count
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # rate_limit_s is the average spacing between requests across all workers
+        rate = 1.0 / rate_limit_s if rate_limit_s > 0 else 0
+        self.bucket = TokenBucket(rate, capacity=self.concurrency)
 
     def play_by_play_url(self, game_id: str) -> str:
         return f"{self.base}/gamecenter/{game_id}/play-by-play"
@@ -27,22 +82,31 @@ class NHLDataClient:
         #TODO：this port doesn't work now
         return f"{self.base}/schedule/season/{season}"
 
-    def _request_json(self, url: str, max_retries: int = 3) -> Optional[dict]:
+    def _request(self, url: str, max_retries: int = 3) -> Tuple[Optional[int], Optional[dict]]:
+        """(status, json) of a GET; status is None after network errors, and the last
+        retryable status (429/5xx) once retries are exhausted."""
         backoff = 0.5
+        status = None
         for attempt in range(1, max_retries + 1):
+            self.bucket.acquire()
             try:
                 r = self.session.get(url, timeout=DEFAULT_TIMEOUT)
-                if r.status_code == 200:
-                    return r.json()
-                if r.status_code in RETRY_STATUS:
-                    print(f"[INFO] Retry {attempt}/{max_retries} after status {r.status_code}...")
+                status = r.status_code
+                if status == 200:
+                    return status, r.json()
+                if status in RETRY_STATUS:
+                    print(f"[INFO] Retry {attempt}/{max_retries} after status {status}...")
                     time.sleep(backoff); backoff *= 2
                     continue
-                return None
+                return status, None
             except requests.RequestException as e:
+                status = None
                 print(f"[WARN] Network error: {e} (attempt {attempt})")
                 time.sleep(backoff); backoff *= 2
-        return None
+        return status, None
+
+    def _request_json(self, url: str, max_retries: int = 3) -> Optional[dict]:
+        return self._request(url, max_retries)[1]
 
     def discover_game_ids_via_schedule(self, season: str) -> List[str]:        
         url = self.schedule_url(season)     
@@ -83,43 +147,204 @@ class NHLDataClient:
         #print(ids)
         return ids
 
-    def discover_game_ids(self, season: str, include_types=('02','03')) -> List[str]:
+    def discover_game_ids(self, season: str, include_types=('02','03'), strategy: str = "probe",
+                          refresh: bool = False) -> List[str]:
         # TODO: currently get id by schedule not work
         # ids = self.discover_game_ids_via_schedule(season)      
         # if ids:
         #     print(f"[INFO] Found {len(ids)} game IDs via schedule API for {season}.")
         #     return [gid for gid in ids if gid[8:10] in include_types]
+        if strategy == "probe":
+            return self.discover_game_ids_via_probe(season, include_types, refresh=refresh)
         print(f"[INFO] Schedule API unavailable for {season}, using legacy fallback enumeration...")
         return self.guess_game_ids_fallback(season, include_types)
 
-    def _cache_path(self, gid: str) -> str:
-        return os.path.join(RAW_DIR, f"game_{gid}.json")
+    # ----------------------------------------------------------------
+    # Probe-based discovery
+    # ----------------------------------------------------------------
+    def _game_exists(self, gid: str) -> bool:
+        """True if the game is cached or the API returns it (the probe also caches it).
+        Only a 404 means "no such game"; anything else that is not a 200 raises ProbeError,
+        so a transient failure cannot silently cut a binary search short."""
+        if self._is_cached(gid):
+            return True
+        status, data = self._request(self.play_by_play_url(gid))
+        if status == 404:
+            return False
+        if status != 200 or not data:
+            raise ProbeError(f"probe of {gid} failed (status {status})")
+        self.store.put(gid, data)
+        return True
+
+    def probe_regular_season(self, season: str, hi: int = REG_SEASON_MAX) -> List[str]:
+        """Regular-season IDs are contiguous from 0001; binary search for the last one."""
+        prefix = f"{str(season)[:4]}02"
+        if not self._game_exists(f"{prefix}0001"):
+            return []
+        lo, hi = 1, hi + 1  # invariant: lo exists, hi does not
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self._game_exists(f"{prefix}{mid:04d}"):
+                lo = mid
+            else:
+                hi = mid
+        return [f"{prefix}{n:04d}" for n in range(1, lo + 1)]
+
+    def _probe_series(self, prefix: str, rnd: int, series: int, max_misses: int) -> List[str]:
+        found, misses = [], 0
+        for game in range(1, PLAYOFF_MAX_GAMES + 1):
+            gid = f"{prefix}0{rnd}{series}{game}"
+            if self._game_exists(gid):
+                found.append(gid)
+                misses = 0
+            else:
+                misses += 1
+                if misses >= max_misses:
+                    break
+        return found
+
+    def probe_playoffs(self, season: str, max_misses: int = 2) -> List[str]:
+        """Walk the bracket round by round; each series stops after `max_misses` consecutive misses."""
+        season = str(season)
+        prefix = f"{season[:4]}03"
+        rounds = dict(PLAYOFF_SERIES_PER_ROUND)
+        if season in PLAYOFF_QUALIFIER_SEASONS:
+            rounds = {0: 8, **rounds}
+        ids = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for rnd, n_series in rounds.items():
+                futures = [pool.submit(self._probe_series, prefix, rnd, s, max_misses)
+                           for s in range(1, n_series + 1)]
+                round_ids = [gid for f in futures for gid in f.result()]
+                if not round_ids and rnd > 0:
+                    break  # bracket has not reached this round (yet)
+                ids.extend(round_ids)
+        return sorted(ids)
+
+    def _manifest_path(self, season: str) -> str:
+        return os.path.join(MANIFEST_DIR, f"season_{season}.json")
+
+    def load_manifest(self, season: str) -> Optional[dict]:
+        path = self._manifest_path(season)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_manifest(self, season: str, ids_by_type: dict):
+        os.makedirs(MANIFEST_DIR, exist_ok=True)
+        # A season is frozen once its playoffs are over (July 1st of the end year)
+        complete = date.today() >= date(int(str(season)[4:8]), 7, 1)
+        manifest = {"season": str(season), "complete": complete, "game_ids": ids_by_type}
+        tmp = self._manifest_path(season) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._manifest_path(season))
+
+    def discover_game_ids_via_probe(self, season: str, include_types=('02','03'),
+                                    refresh: bool = False) -> List[str]:
+        season = str(season)
+        manifest = self.load_manifest(season) if not refresh else None
+        known = manifest["game_ids"] if manifest and manifest.get("complete") else {}
+        ids_by_type = dict(manifest["game_ids"]) if manifest else {}
+        probed, errored = False, False
+        for t in include_types:
+            if t in known:
+                continue
+            try:
+                if t == '02':
+                    found = self.probe_regular_season(season)
+                elif t == '03':
+                    found = self.probe_playoffs(season)
+                else:
+                    found = [gid for gid in self.guess_game_ids_fallback(season, (t,))
+                             if self._game_exists(gid)]
+            except ProbeError as e:
+                # keep the previous manifest's list (if any) and do not persist a partial result
+                print(f"[WARN] Discovery of type-{t} games for {season} failed: {e}")
+                errored = True
+                continue
+            ids_by_type[t] = found
+            probed = True
+            print(f"[INFO] Probe found {len(found)} type-{t} games for {season}.")
+        if errored:
+            print(f"[WARN] Not saving the {season} manifest because some probes failed.")
+        elif probed:
+            self.save_manifest(season, ids_by_type)
+        else:
+            print(f"[INFO] Using manifest for {season}, skipping discovery.")
+        return [gid for t in include_types for gid in ids_by_type.get(t, [])]
+
+    def _is_cached(self, gid: str) -> bool:
+        return self.store.exists(gid)
 
     def fetch_game(self, gid: str, force: bool=False) -> Optional[dict]:
-        path = self._cache_path(gid)
-        if not force and os.path.exists(path):
+        if not force and self._is_cached(gid):
             return None
         url = self.play_by_play_url(gid)
         data = self._request_json(url)
-        time.sleep(self.rate_limit_s)
         if not data: return None
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        self.store.put(gid, data)
         return data
 
-    def fetch_season(self, season: str, include_types=('02','03'), max_games: Optional[int]=None) -> Tuple[int,int]:
-        game_ids = self.discover_game_ids(season, include_types)
-        total, saved, failures = len(game_ids), 0, 0
-        for gid in game_ids:
-            if max_games and saved >= max_games: break
-            data = self.fetch_game(gid, force=False)
-            if data is not None:
-                saved += 1
-                if saved % 50 == 0:
-                    print(f"[INFO] {saved} games saved for {season} so far...")
-            else:
-                failures += 1
+    def fetch_live(self, gid: str) -> Optional[dict]:
+        """Current play-by-play of a (possibly in-progress) game; bypasses and does not fill the raw cache."""
+        return self._request_json(self.play_by_play_url(gid))
+
+    def fetch_season(self, season: str, include_types=('02','03'), max_games: Optional[int]=None,
+                     concurrency: Optional[int]=None, discovery: str = "probe",
+                     refresh_manifest: bool = False) -> Tuple[int,int]:
+        game_ids = self.discover_game_ids(season, include_types, strategy=discovery,
+                                          refresh=refresh_manifest)
+        workers = concurrency or self.concurrency
+        if workers > 1:
+            saved, failures = self._fetch_concurrent(season, game_ids, max_games, workers)
+        else:
+            saved, failures = 0, 0
+            for gid in game_ids:
+                if max_games and saved >= max_games: break
+                data = self.fetch_game(gid, force=False)
+                if data is not None:
+                    saved += 1
+                    if saved % 50 == 0:
+                        print(f"[INFO] {saved} games saved for {season} so far...")
+                else:
+                    failures += 1
+        total = len(game_ids)
         print(f"[INFO] Season {season}: {saved} new files, {failures} skipped/cached, total IDs {total}.")
         success_rate = (saved / total * 100) if total > 0 else 0
         print(f"[INFO] Success rate: {success_rate:.2f}%\n")
-        return saved, failures
\ No newline at end of file
+        return saved, failures
+
+    def _fetch_concurrent(self, season: str, game_ids: List[str], max_games: Optional[int],
+                          workers: int) -> Tuple[int,int]:
+        """Fetch game_ids on a thread pool; all workers share self.session and self.bucket."""
+        saved, failures = 0, 0
+        # Submit in windows of `workers` so max_games can stop the run early
+        pending = iter(game_ids)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = set()
+            while True:
+                while len(futures) < workers * 2:
+                    if max_games and saved + len(futures) >= max_games:
+                        break
+                    gid = next(pending, None)
+                    if gid is None:
+                        break
+                    futures.add(pool.submit(self.fetch_game, gid, False))
+                if not futures:
+                    break
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    try:
+                        data = fut.result()
+                    except Exception as e:
+                        print(f"[WARN] Fetch failed: {e}")
+                        data = None
+                    if data is not None:
+                        saved += 1
+                        if saved % 50 == 0:
+                            print(f"[INFO] {saved} games saved for {season} so far...")
+                    else:
+                        failures += 1
+        return saved, failures
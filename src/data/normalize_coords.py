@@ -1,57 +1,93 @@
 """
 Normalize NHL shot coordinates so that all shots are in the offensive zone (+x).
 """
-import os, json, pandas as pd
-from typing import Dict
+import numpy as np
+import pandas as pd
+from typing import Dict, Tuple
+from src.data.game_index import build_game_index, load_game_index
+from src.utils.config import RAW_DIR, PROCESSED_DIR
+
 
 def build_defending_side_index(raw_dir: str) -> Dict[str, Dict[int, str]]:
     """Return {game_id: {period: 'left'|'right'}} using homeTeamDefendingSide."""
-    idx = {}
-    for fn in os.listdir(raw_dir):
-        if not fn.startswith("game_") or not fn.endswith(".json"):
-            continue
-        with open(os.path.join(raw_dir, fn), "r", encoding="utf-8") as f:
-            g = json.load(f)
-        gid = str(g.get("id"))
-        per_map = {}
-        for p in g.get("plays", []):
-            pdsc = p.get("periodDescriptor", {}) or {}
-            num = pdsc.get("number")
-            side = pdsc.get("homeTeamDefendingSide")
-            if num and side and num not in per_map:
-                per_map[num] = side
-        if not per_map:
-            per_map = {1: "left", 2: "right", 3: "left", 4: "right", 5: "left"}
-        idx[gid] = per_map
+    _, periods = build_game_index(raw_dir)
+    idx: Dict[str, Dict[int, str]] = {}
+    for gid, period, side in periods.itertuples(index=False):
+        idx.setdefault(str(gid), {})[int(period)] = side
     return idx
 
-def normalize_to_offense(df: pd.DataFrame, raw_dir: str) -> pd.DataFrame:
+
+def game_tables(raw_dir: str = RAW_DIR, processed_dir: str = PROCESSED_DIR) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
-    Add x_off, y_off where all shots are in offensive (+x) direction.
+    (sides, teams) for offense_coordinates, from the saved game index
+      sides: game_id, period, home_def   (home team defending side per period)
+      teams: game_id, home_id, away_id
+    Falls back to one pass over the raw store if tidy_all_games has not saved an index yet.
+    """
+    index = load_game_index(processed_dir)
+    if index is None:
+        print(f"[WARN] No game index in {processed_dir}, building it from {raw_dir}")
+        index = build_game_index(raw_dir)
+    games, periods = index
+    teams = games.rename(columns={"home_team_id": "home_id", "away_team_id": "away_id"})
+    return periods, teams[["game_id", "home_id", "away_id"]]
+
+
+def _offense_right(df: pd.DataFrame, sides: pd.DataFrame, teams: pd.DataFrame) -> np.ndarray:
+    """True where the shooting team attacks +x (the right-hand net) in that period."""
+    period = df["period"].fillna(1) if "period" in df else pd.Series(1, index=df.index)
+    keys = pd.DataFrame({
+        "game_id": df["game_id"].to_numpy(dtype="int64"),
+        "period": period.to_numpy(dtype="int64"),
+    })
+    sides = sides.astype({"game_id": "int64", "period": "int64", "home_def": "object"})
+    teams = teams.astype({"game_id": "int64"})
+    # Left merges keep the shot order; games missing from the tables get NaN
+    keys = keys.merge(sides, on=["game_id", "period"], how="left")
+    keys = keys.merge(teams[["game_id", "home_id"]], on="game_id", how="left")
+
+    home_def = keys["home_def"].fillna("left").to_numpy()
+    team = pd.to_numeric(df["team_id"], errors="coerce").to_numpy(dtype="float64")
+    home_id = pd.to_numeric(keys["home_id"], errors="coerce").to_numpy(dtype="float64")
+    return np.where(team == home_id, home_def == "left", home_def == "right")
+
+
+def offense_coordinates(df: pd.DataFrame, sides: pd.DataFrame, teams: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vectorized core of normalize_to_offense: merge the per-period side table and
+    the home/away table onto the shots once, then flip coordinates with masks.
+    Kept identical to the original implementation, which takes |x| and so keeps only the
+    shots of the team attacking +x; features use attacking_coordinates instead.
     """
-    idx = build_defending_side_index(raw_dir)
-    home_away = {}
-    for fn in os.listdir(raw_dir):
-        if fn.startswith("game_") and fn.endswith(".json"):
-            with open(os.path.join(raw_dir, fn), "r", encoding="utf-8") as f:
-                g = json.load(f)
-            home_away[str(g.get("id"))] = (
-                g.get("homeTeam", {}).get("id"),
-                g.get("awayTeam", {}).get("id"),
-            )
+    offense_right = _offense_right(df, sides, teams)
+    x = pd.to_numeric(df["x"], errors="coerce").to_numpy(dtype="float64")
+    y = pd.to_numeric(df["y"], errors="coerce").to_numpy(dtype="float64")
+    df = df.copy()
+    df["x_off"] = np.where(offense_right, np.abs(x), -np.abs(x))
+    df["y_off"] = np.where(offense_right, y, -y)
+    return df[(df["x_off"] >= 0) & df["x_off"].notna() & df["y_off"].notna()]
+
 
+def attacking_coordinates(df: pd.DataFrame, sides: pd.DataFrame, teams: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add x_off, y_off with every shot in its team's attacking frame (the attacked net at
+    x = +89): coordinates are negated for the team attacking -x. Only shots from the
+    shooter's own half (x_off < 0) and shots without coordinates are dropped.
+    """
+    sign = np.where(_offense_right(df, sides, teams), 1.0, -1.0)
+    x = pd.to_numeric(df["x"], errors="coerce").to_numpy(dtype="float64")
+    y = pd.to_numeric(df["y"], errors="coerce").to_numpy(dtype="float64")
     df = df.copy()
-    xo, yo = [], []
-    for _, r in df.iterrows():
-        gid = str(r["game_id"])
-        period = int(r.get("period", 1))
-        x, y, team = r["x"], r["y"], r["team_id"]
-        home_def = idx.get(gid, {}).get(period, "left")
-        home_id, away_id = home_away.get(gid, (None, None))
-        offense_right = (home_def == "left") if team == home_id else (home_def == "right")
-        if offense_right:
-            xo.append(abs(x)); yo.append(y)
-        else:
-            xo.append(-abs(x)); yo.append(-y)
-    df["x_off"], df["y_off"] = xo, yo
+    df["x_off"] = sign * x
+    df["y_off"] = sign * y
     return df[(df["x_off"] >= 0) & df["x_off"].notna() & df["y_off"].notna()]
+
+
+def normalize_to_offense(df: pd.DataFrame, raw_dir: str = RAW_DIR,
+                         processed_dir: str = PROCESSED_DIR) -> pd.DataFrame:
+    """
+    Add x_off, y_off where all shots are in offensive (+x) direction.
+    Uses the game index saved by tidy_all_games; raw_dir is only read if it is missing.
+    """
+    sides, teams = game_tables(raw_dir, processed_dir)
+    return offense_coordinates(df, sides, teams)
@@ -0,0 +1,236 @@
+"""
+raw_store.py
+Storage backends for raw play-by-play JSON.
+
+- JsonDirStore : legacy layout, one game_<id>.json file per game
+- SQLiteStore  : one zlib-compressed blob per game in data/raw/games.sqlite
+
+Both offer random access by game ID, a bulk iterator and cheap per-game
+change signatures, so the downloader, tidy stage, normalization and
+debugger never touch files directly.
+
+python -m src.data.raw_store --to sqlite     # migrate an existing data/raw
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import argparse
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson  # several times faster than the stdlib parser on play-by-play documents
+except ImportError:
+    orjson = None
+
+from src.utils.config import RAW_DIR, RAW_STORE_BACKEND
+
+SQLITE_NAME = "games.sqlite"
+
+
+def season_of(gid: str) -> str:
+    """'2022030411' -> '20222023'"""
+    start = int(str(gid)[:4])
+    return f"{start}{start + 1}"
+
+
+def _dumps(data: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def loads(raw: bytes) -> dict:
+    """Parse raw JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class JsonDirStore:
+    """One compact game_<id>.json per game (reads the old indented files too)."""
+
+    backend = "json"
+
+    def __init__(self, raw_dir: str = RAW_DIR):
+        self.raw_dir = raw_dir
+
+    def path(self, gid: str) -> str:
+        return os.path.join(self.raw_dir, f"game_{gid}.json")
+
+    def exists(self, gid: str) -> bool:
+        return os.path.exists(self.path(gid))
+
+    def get(self, gid: str) -> Optional[dict]:
+        path = self.path(gid)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return loads(f.read())
+
+    def put(self, gid: str, data: dict):
+        os.makedirs(self.raw_dir, exist_ok=True)
+        tmp = self.path(gid) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_dumps(data))
+        os.replace(tmp, self.path(gid))
+
+    def game_ids(self, season: Optional[str] = None) -> List[str]:
+        if not os.path.isdir(self.raw_dir):
+            return []
+        ids = []
+        for fn in os.listdir(self.raw_dir):
+            if not fn.startswith("game_") or not fn.endswith(".json"):
+                continue
+            gid = fn[len("game_"):-len(".json")]
+            if season is None or gid.startswith(str(season)[:4]):
+                ids.append(gid)
+        return sorted(ids)
+
+    def signatures(self) -> Dict[str, str]:
+        """{game_id: 'mtime_ns:size'} for change detection, from one directory scan."""
+        if not os.path.isdir(self.raw_dir):
+            return {}
+        sigs = {}
+        with os.scandir(self.raw_dir) as it:
+            for entry in it:
+                if entry.name.startswith("game_") and entry.name.endswith(".json"):
+                    st = entry.stat()
+                    sigs[entry.name[len("game_"):-len(".json")]] = f"{st.st_mtime_ns}:{st.st_size}"
+        return sigs
+
+    def iter_games(self, season: Optional[str] = None) -> Iterator[Tuple[str, dict]]:
+        for gid in self.game_ids(season):
+            data = self.get(gid)
+            if data is not None:
+                yield gid, data
+
+
+class SQLiteStore:
+    """Compressed blobs keyed by game ID. The database file is created on first write."""
+
+    backend = "sqlite"
+
+    def __init__(self, raw_dir: str = RAW_DIR, level: int = 6):
+        self.raw_dir = raw_dir
+        self.db_path = os.path.join(raw_dir, SQLITE_NAME)
+        self.level = level
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+    def _conn(self, create: bool = False) -> Optional[sqlite3.Connection]:
+        # One connection per thread and per process (connections must not cross a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        if not create and not os.path.exists(self.db_path):
+            return None
+        os.makedirs(self.raw_dir, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS games ("
+            " game_id TEXT PRIMARY KEY, season TEXT NOT NULL,"
+            " data BLOB NOT NULL, updated REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS games_season ON games(season)")
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def exists(self, gid: str) -> bool:
+        conn = self._conn()
+        if conn is None:
+            return False
+        return conn.execute("SELECT 1 FROM games WHERE game_id=?", (str(gid),)).fetchone() is not None
+
+    def get(self, gid: str) -> Optional[dict]:
+        conn = self._conn()
+        if conn is None:
+            return None
+        row = conn.execute("SELECT data FROM games WHERE game_id=?", (str(gid),)).fetchone()
+        return loads(zlib.decompress(row[0])) if row else None
+
+    def put(self, gid: str, data: dict):
+        blob = zlib.compress(_dumps(data), self.level)
+        conn = self._conn(create=True)
+        with self._write_lock, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO games (game_id, season, data, updated) VALUES (?, ?, ?, ?)",
+                (str(gid), season_of(gid), blob, time.time()),
+            )
+
+    def game_ids(self, season: Optional[str] = None) -> List[str]:
+        conn = self._conn()
+        if conn is None:
+            return []
+        if season is None:
+            rows = conn.execute("SELECT game_id FROM games ORDER BY game_id")
+        else:
+            rows = conn.execute("SELECT game_id FROM games WHERE season=? ORDER BY game_id",
+                                (season_of(str(season)[:4]),))
+        return [r[0] for r in rows]
+
+    def signatures(self) -> Dict[str, str]:
+        """{game_id: 'updated:size'} for change detection, without reading blobs."""
+        conn = self._conn()
+        if conn is None:
+            return {}
+        rows = conn.execute("SELECT game_id, updated, length(data) FROM games")
+        return {gid: f"{updated!r}:{size}" for gid, updated, size in rows}
+
+    def iter_games(self, season: Optional[str] = None) -> Iterator[Tuple[str, dict]]:
+        conn = self._conn()
+        if conn is None:
+            return
+        if season is None:
+            rows = conn.execute("SELECT game_id, data FROM games ORDER BY game_id")
+        else:
+            rows = conn.execute("SELECT game_id, data FROM games WHERE season=? ORDER BY game_id",
+                                (season_of(str(season)[:4]),))
+        for gid, blob in rows:
+            yield gid, loads(zlib.decompress(blob))
+
+
+BACKENDS = {"json": JsonDirStore, "sqlite": SQLiteStore}
+
+
+def open_store(raw_dir: str = RAW_DIR, backend: Optional[str] = None):
+    """
+    Open the raw store under raw_dir. Without an explicit backend, use what is
+    already on disk (sqlite db, else legacy JSON files), else RAW_STORE_BACKEND.
+    """
+    if backend is None:
+        if os.path.exists(os.path.join(raw_dir, SQLITE_NAME)):
+            backend = "sqlite"
+        elif JsonDirStore(raw_dir).game_ids():
+            backend = "json"
+        else:
+            backend = RAW_STORE_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown raw store backend '{backend}' (expected one of {sorted(BACKENDS)})")
+    return BACKENDS[backend](raw_dir)
+
+
+def migrate(raw_dir: str = RAW_DIR, src: str = "json", dst: str = "sqlite") -> int:
+    """Copy every game from one backend to the other; returns the number of games copied."""
+    source, target = open_store(raw_dir, src), open_store(raw_dir, dst)
+    n = 0
+    for gid, data in source.iter_games():
+        target.put(gid, data)
+        n += 1
+        if n % 500 == 0:
+            print(f"[INFO] Migrated {n} games...")
+    print(f"[INFO] Migrated {n} games from {src} to {dst} in {raw_dir}")
+    return n
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate raw play-by-play storage")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--from", dest="src", choices=sorted(BACKENDS), default="json")
+    parser.add_argument("--to", dest="dst", choices=sorted(BACKENDS), default="sqlite")
+    args = parser.parse_args()
+    migrate(args.raw_dir, args.src, args.dst)
@@ -0,0 +1,148 @@
+"""
+synthetic_games.py
+Deterministic generator of realistic play-by-play documents, for benchmarks and
+offline tests (same shape as api-web.nhle.com gamecenter/<id>/play-by-play).
+
+python -m src.data.synthetic_games --raw-dir /tmp/nhl_raw --seasons 2 --games 200
+"""
+
+import argparse
+import random
+from typing import List, Optional
+
+from src.data.raw_store import open_store
+
+TEAM_IDS = list(range(1, 33))
+SHOT_TYPES = ["wrist", "snap", "slap", "backhand", "tip-in", "deflected", "wrap-around"]
+# (typeDescKey, typeCode, relative frequency) for a typical game of ~320 plays
+EVENT_MIX = [
+    ("faceoff", 502, 60), ("hit", 503, 45), ("giveaway", 504, 15), ("goal", 505, 6),
+    ("shot-on-goal", 506, 58), ("missed-shot", 507, 25), ("blocked-shot", 508, 30),
+    ("penalty", 509, 8), ("stoppage", 516, 50), ("takeaway", 525, 12),
+]
+FIRST_SEASON = 2016
+
+
+def _mmss(seconds: int) -> str:
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def synthetic_game(game_id: int, seed: Optional[int] = None, n_plays: int = 320) -> dict:
+    """One finished game; identical output for the same (game_id, seed)."""
+    rng = random.Random(game_id if seed is None else game_id * 1_000_003 + seed)
+    gid = str(game_id)
+    game_type = int(gid[4:6])
+    home, away = rng.sample(TEAM_IDS, 2)
+    roster = {t: [t * 100_000 + 8_400_000 + i for i in range(20)] for t in (home, away)}
+    goalie = {t: roster[t][0] for t in (home, away)}
+
+    periods = [(1, "REG", 1200), (2, "REG", 1200), (3, "REG", 1200)]
+    if rng.random() < 0.22:
+        periods.append((4, "OT", 300 if game_type == 2 else 1200))
+        if game_type == 2 and rng.random() < 0.4:
+            periods.append((5, "SO", 0))
+
+    kinds, weights = zip(*[(k[:2], k[2]) for k in EVENT_MIX])
+    first_side = rng.choice(["left", "right"])
+    plays, sort_order, score = [], 0, {home: 0, away: 0}
+    per_period = max(1, n_plays // len(periods))
+    for number, ptype, length in periods:
+        side = first_side if number % 2 else ("right" if first_side == "left" else "left")
+        pdsc = {"number": number, "periodType": ptype, "maxRegulationPeriods": 3}
+        clock = sorted(rng.randrange(0, max(length, 1)) for _ in range(per_period))
+        for kind, t in [(("period-start", 520), 0)] + [(rng.choices(kinds, weights)[0], t) for t in clock] \
+                + [(("period-end", 521), length)]:
+            key, code = kind
+            sort_order += 1
+            team = rng.choice((home, away))
+            opp = away if team == home else home
+            # Home attacks +x when defending left
+            attack_sign = 1 if (team == home) == (side == "left") else -1
+            play = {
+                "eventId": sort_order + 50,
+                "periodDescriptor": pdsc,
+                "timeInPeriod": _mmss(t),
+                "timeRemaining": _mmss(max(length - t, 0)),
+                "situationCode": rng.choice(["1551", "1551", "1551", "1451", "1541", "0651"]),
+                "homeTeamDefendingSide": side,
+                "typeCode": code,
+                "typeDescKey": key,
+                "sortOrder": sort_order,
+            }
+            if key not in ("period-start", "period-end", "stoppage"):
+                details = {
+                    "xCoord": attack_sign * rng.randint(-20, 99) if key != "faceoff" else rng.choice([-69, -20, 0, 20, 69]),
+                    "yCoord": rng.randint(-42, 42),
+                    "zoneCode": rng.choice(["O", "O", "N", "D"]),
+                    "eventOwnerTeamId": team,
+                }
+                shooter = rng.choice(roster[team][1:])
+                if key in ("shot-on-goal", "goal", "missed-shot", "blocked-shot"):
+                    details["shotType"] = rng.choice(SHOT_TYPES)
+                    details["goalieInNetId"] = goalie[opp]
+                if key == "goal":
+                    score[team] += 1
+                    details.update({
+                        "scoringPlayerId": shooter, "assist1PlayerId": rng.choice(roster[team][1:]),
+                        "homeScore": score[home], "awayScore": score[away],
+                    })
+                elif key in ("shot-on-goal", "missed-shot", "blocked-shot"):
+                    details["shootingPlayerId"] = shooter
+                elif key == "hit":
+                    details["hittingPlayerId"] = shooter
+                elif key == "faceoff":
+                    details["winningPlayerId"] = shooter
+                elif key == "penalty":
+                    details["committedByPlayerId"] = shooter
+                else:
+                    details["playerId"] = shooter
+                play["details"] = details
+            plays.append(play)
+
+    def team_obj(t):
+        return {"id": t, "abbrev": f"T{t:02d}", "commonName": {"default": f"Team {t}"}, "score": score[t]}
+
+    return {
+        "id": game_id,
+        "season": int(f"{gid[:4]}{int(gid[:4]) + 1}"),
+        "gameType": game_type,
+        "gameDate": f"{gid[:4]}-{10 + (int(gid[6:]) % 3):02d}-{1 + int(gid[6:]) % 28:02d}",
+        "gameState": "OFF",
+        "homeTeam": team_obj(home),
+        "awayTeam": team_obj(away),
+        "rosterSpots": [
+            {"teamId": t, "playerId": pid, "firstName": {"default": "P"}, "lastName": {"default": str(pid)},
+             "sweaterNumber": i + 1}
+            for t in (home, away) for i, pid in enumerate(roster[t])
+        ],
+        "plays": plays,
+    }
+
+
+def synthetic_game_ids(seasons: int = 1, games_per_season: int = 1312, first_season: int = FIRST_SEASON) -> List[int]:
+    return [
+        int(f"{first_season + s}02{n:04d}")
+        for s in range(seasons)
+        for n in range(1, games_per_season + 1)
+    ]
+
+
+def write_synthetic_seasons(raw_dir: str, seasons: int = 1, games_per_season: int = 1312,
+                            backend: Optional[str] = None, seed: Optional[int] = None) -> List[int]:
+    """Write seasons x games_per_season synthetic games into the raw store under raw_dir."""
+    store = open_store(raw_dir, backend)
+    ids = synthetic_game_ids(seasons, games_per_season)
+    for gid in ids:
+        store.put(str(gid), synthetic_game(gid, seed))
+    print(f"[INFO] Wrote {len(ids)} synthetic games to {raw_dir} ({store.backend})")
+    return ids
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic play-by-play data")
+    parser.add_argument("--raw-dir", required=True)
+    parser.add_argument("--seasons", type=int, default=1)
+    parser.add_argument("--games", type=int, default=1312, help="Games per season")
+    parser.add_argument("--backend", choices=["json", "sqlite"], default=None)
+    args = parser.parse_args()
+    write_synthetic_seasons(args.raw_dir, args.seasons, args.games, args.backend)
@@ -0,0 +1,41 @@
+"""
+src/data/tests/test_event_stream.py
+---------------------------------------
+Generator helpers over play-by-play documents.
+测试事件生成器：类型过滤、字段投影与缺失路径。
+pytest -q src/data/tests/test_event_stream.py
+"""
+
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.data.event_stream import SHOT_TYPES, get_path, iter_plays, project
+
+GAME = {"id": 1, "plays": [
+    {"eventId": 1, "typeDescKey": "faceoff", "details": {"xCoord": 0}},
+    {"eventId": 2, "typeDescKey": "shot-on-goal", "details": {"xCoord": 50, "yCoord": -3}},
+    {"eventId": 3, "typeDescKey": "goal", "details": None},
+]}
+
+
+def test_iter_plays_filters_types():
+    assert [p["eventId"] for p in iter_plays(GAME)] == [1, 2, 3]
+    assert [p["eventId"] for p in iter_plays(GAME, SHOT_TYPES)] == [2, 3]
+    assert list(iter_plays({"plays": None})) == []
+    assert list(iter_plays({})) == []
+
+
+def test_get_path_tolerates_missing_levels():
+    play = GAME["plays"][1]
+    assert get_path(play, ("details", "xCoord")) == 50
+    assert get_path(play, ("details", "zoneCode")) is None
+    assert get_path(GAME["plays"][2], ("details", "xCoord"), default=-1) == -1  # null level
+    assert get_path(play, ("eventId", "nested")) is None                       # non-dict level
+
+
+def test_project_yields_tuples_in_field_order():
+    rows = project(iter_plays(GAME), {"y": ("details", "yCoord"), "id": ("eventId",)})
+    assert not isinstance(rows, list)  # lazy
+    assert list(rows) == [(None, 1), (-3, 2), (None, 3)]
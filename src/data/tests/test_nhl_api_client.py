@@ -0,0 +1,130 @@
+"""
+src/data/tests/test_nhl_api_client.py
+---------------------------------------
+NHLDataClient without network: token bucket pacing and concurrent download with a fake session.
+测试限速令牌桶与并发下载（使用假 session，不访问网络）。
+pytest -q src/data/tests/test_nhl_api_client.py
+"""
+
+import os, sys, time
+import threading
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.data import nhl_api_client
+from src.data.nhl_api_client import NHLDataClient, TokenBucket
+from src.data.raw_store import JsonDirStore
+
+
+class _Resp:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class _FakeSession:
+    """Serves {"id": gid} for every game id in `games`, 404 otherwise."""
+
+    def __init__(self, games=None, delay=0.0, fail=()):
+        self.games = set(games) if games is not None else None
+        self.delay = delay
+        self.fail = set(fail)  # ids answered with 503
+        self.urls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, timeout=None, headers=None):
+        with self.lock:
+            self.urls.append(url)
+        time.sleep(self.delay)
+        gid = url.rstrip("/").split("/")[-2]
+        if gid in self.fail:
+            return _Resp(503)
+        if self.games is not None and gid not in self.games:
+            return _Resp(404)
+        return _Resp(200, {"id": int(gid), "plays": []})
+
+
+def _client(tmp_path, session, **kwargs):
+    client = NHLDataClient(rate_limit_s=0, store=JsonDirStore(str(tmp_path / "raw")), **kwargs)
+    client.session = session
+    return client
+
+
+def test_token_bucket_rate_and_burst():
+    bucket = TokenBucket(rate=50.0, capacity=5)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    burst = time.monotonic() - start
+    for _ in range(10):
+        bucket.acquire()
+    paced = time.monotonic() - start - burst
+    assert burst < 0.05          # the first `capacity` tokens are free
+    assert 0.15 < paced < 0.5    # then 50/s: 10 tokens take ~0.2s
+
+    start = time.monotonic()
+    for _ in range(100):
+        TokenBucket(rate=0).acquire()  # rate 0 = unlimited
+    assert time.monotonic() - start < 0.05
+
+
+def test_concurrent_fetch_stops_at_max_games(tmp_path):
+    session = _FakeSession(delay=0.01)
+    client = _client(tmp_path, session, concurrency=4)
+    game_ids = [f"20220200{n:02d}" for n in range(1, 41)]
+    saved, failures = client._fetch_concurrent("20222023", game_ids, max_games=5, workers=4)
+    assert (saved, failures) == (5, 0)
+    assert len(session.urls) == 5
+    assert sum(client.store.exists(g) for g in game_ids) == 5
+
+    # cached games are skipped (fetch_game returns None) and counted as failures/cached
+    saved, failures = client._fetch_concurrent("20222023", game_ids[:10], max_games=None, workers=4)
+    assert (saved, failures) == (5, 5) and len(session.urls) == 10
+
+
+def _bracket(year="2022"):
+    """Playoff ids: round 1 series go 4-7 games, later rounds 5 games each."""
+    ids = []
+    for rnd, n_series in nhl_api_client.PLAYOFF_SERIES_PER_ROUND.items():
+        for series in range(1, n_series + 1):
+            games = 4 + (series % 4) if rnd == 1 else 5
+            ids += [f"{year}030{rnd}{series}{g}" for g in range(1, games + 1)]
+    return ids
+
+
+def test_probe_regular_season_and_playoffs(tmp_path):
+    regular = [f"202202{n:04d}" for n in range(1, 1313)]
+    session = _FakeSession(regular + _bracket())
+    client = _client(tmp_path, session)
+    assert client.probe_regular_season("20222023") == regular
+    assert len(session.urls) <= 13  # first game + binary search over 1400
+    assert client.probe_playoffs("20222023") == sorted(_bracket())
+
+    # a bracket that has only reached round 2 stops after the first empty round
+    partial = [g for g in _bracket("2023") if g[7] in "12"]
+    client = _client(tmp_path / "b", _FakeSession(partial))
+    assert client.probe_playoffs("20232024") == sorted(partial)
+
+
+def test_manifest_reuse_and_failed_probes(tmp_path, monkeypatch):
+    monkeypatch.setattr(nhl_api_client, "MANIFEST_DIR", str(tmp_path / "manifests"))
+    monkeypatch.setattr(nhl_api_client.time, "sleep", lambda s: None)
+    regular = [f"201802{n:04d}" for n in range(1, 1272)]
+
+    # a 503 at a binary-search midpoint must not truncate the season nor save a manifest
+    session = _FakeSession(regular, fail={"2018020701"})
+    client = _client(tmp_path / "a", session)
+    assert client.discover_game_ids("20182019", ("02",)) == []
+    assert client.load_manifest("20182019") is None
+
+    session = _FakeSession(regular)
+    client = _client(tmp_path / "b", session)
+    assert client.discover_game_ids("20182019", ("02",)) == regular
+    assert client.load_manifest("20182019")["complete"]
+    n = len(session.urls)
+    assert client.discover_game_ids("20182019", ("02",)) == regular
+    assert len(session.urls) == n  # complete manifest: no probing
@@ -0,0 +1,105 @@
+"""
+src/data/tests/test_normalize_coords.py
+---------------------------------------
+Vectorized normalize_to_offense must match the original row-by-row version.
+向量化实现需与原逐行实现结果一致。
+attacking_coordinates (used for features) keeps both teams' shots.
+"""
+
+import os, sys
+import numpy as np
+import pandas as pd
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.data.raw_store import open_store
+from src.data.normalize_coords import attacking_coordinates, build_defending_side_index, normalize_to_offense
+
+
+def legacy_normalize(df, idx, home_away):
+    """Original iterrows implementation, kept as the reference."""
+    df = df.copy()
+    xo, yo = [], []
+    for _, r in df.iterrows():
+        gid = str(r["game_id"])
+        period = int(r.get("period", 1))
+        x, y, team = r["x"], r["y"], r["team_id"]
+        home_def = idx.get(gid, {}).get(period, "left")
+        home_id, away_id = home_away.get(gid, (None, None))
+        offense_right = (home_def == "left") if team == home_id else (home_def == "right")
+        if offense_right:
+            xo.append(abs(x)); yo.append(y)
+        else:
+            xo.append(-abs(x)); yo.append(-y)
+    df["x_off"], df["y_off"] = xo, yo
+    return df[(df["x_off"] >= 0) & df["x_off"].notna() & df["y_off"].notna()]
+
+
+def test_normalize_matches_legacy(tmp_path):
+    rng = np.random.default_rng(0)
+    store = open_store(str(tmp_path), backend="sqlite")
+    home_away = {}
+    for n in range(1, 6):
+        gid = 2022020000 + n
+        plays = []
+        if n % 2:  # some games carry sides, others use the default pattern
+            plays = [{"periodDescriptor": {"number": p, "homeTeamDefendingSide": rng.choice(["left", "right"])}}
+                     for p in (1, 2, 3)]
+        store.put(str(gid), {"id": gid, "homeTeam": {"id": 10}, "awayTeam": {"id": 20}, "plays": plays})
+        home_away[str(gid)] = (10, 20)
+
+    n = 400
+    df = pd.DataFrame({
+        "game_id": rng.integers(2022020001, 2022020008, n),  # includes games missing from the store
+        "period": rng.integers(1, 5, n),
+        "team_id": rng.choice([10, 20], n),
+        "x": rng.integers(-99, 100, n).astype(float),
+        "y": rng.integers(-42, 43, n).astype(float),
+        "shot_type": "wrist",  # mixed dtypes, as in the tidy table (keeps iterrows from upcasting ids)
+    })
+    df.loc[::17, "x"] = np.nan
+
+    expected = legacy_normalize(df, build_defending_side_index(str(tmp_path)), home_away)
+    result = normalize_to_offense(df, str(tmp_path), processed_dir=str(tmp_path / "no_index"))
+
+    assert list(result.index) == list(expected.index)
+    np.testing.assert_allclose(result["x_off"], expected["x_off"].astype(float))
+    np.testing.assert_allclose(result["y_off"], expected["y_off"].astype(float))
+
+
+def test_normalize_uses_saved_game_index(tmp_path):
+    """tidy_all_games 保存的比赛索引可直接用于坐标归一化（不再读取原始 JSON）"""
+    from src.data.tidy_data import tidy_all_games
+
+    raw_dir, processed = tmp_path / "raw", tmp_path / "processed"
+    store = open_store(str(raw_dir), backend="sqlite")
+    play = {
+        "eventId": 1, "typeDescKey": "shot-on-goal", "homeTeamDefendingSide": "left",
+        "periodDescriptor": {"number": 1, "periodType": "REG"}, "timeInPeriod": "01:00",
+        "details": {"xCoord": -60, "yCoord": 10, "shotType": "wrist", "eventOwnerTeamId": 10},
+    }
+    store.put("2022020001", {"id": 2022020001, "homeTeam": {"id": 10}, "awayTeam": {"id": 20},
+                             "plays": [play]})
+    df = tidy_all_games(str(raw_dir), processed_dir=str(processed))
+
+    os.remove(os.path.join(str(raw_dir), "games.sqlite"))
+    result = normalize_to_offense(df, str(raw_dir), processed_dir=str(processed))
+    # Home team defends left, so it attacks +x: x_off = |x|, y unchanged
+    assert result["x_off"].tolist() == [60.0]
+    assert result["y_off"].tolist() == [10.0]
+
+
+def test_attacking_coordinates_keep_both_teams():
+    """两队的射门都保留；只丢弃本方半场的射门"""
+    sides = pd.DataFrame({"game_id": [1, 1], "period": [1, 2], "home_def": ["left", "right"]})
+    teams = pd.DataFrame({"game_id": [1], "home_id": [10], "away_id": [20]})
+    shots = pd.DataFrame({
+        "game_id": [1] * 5, "period": [1, 1, 1, 2, 2], "team_id": [10, 20, 20, 10, 20],
+        "x": [60, -70, 30, -50, 40], "y": [10, 5, 0, -8, 3],
+    })
+    out = attacking_coordinates(shots, sides, teams)
+    # period 1: home attacks +x, away attacks -x; period 2 the other way round
+    assert out["team_id"].tolist() == [10, 20, 10, 20]
+    assert out["x_off"].tolist() == [60.0, 70.0, 50.0, 40.0]
+    assert out["y_off"].tolist() == [10.0, -5.0, 8.0, 3.0]
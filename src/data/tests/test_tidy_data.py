@@ -113,3 +113,152 @@ def test_tidy_all_games_empty(tmp_path):
     empty_dir.mkdir()
     df = tidy_all_games(str(empty_dir))
     assert df.empty
+
+
+def test_tidy_all_games_reads_sqlite_store(tmp_path):
+    """tidy_all_games 通过 raw store 读取压缩存储"""
+    from src.data.raw_store import open_store
+
+    raw_dir = tmp_path / "raw"
+    store = open_store(str(raw_dir), backend="sqlite")
+    play = {
+        "eventId": 1,
+        "periodDescriptor": {"number": 1, "periodType": "REG"},
+        "timeInPeriod": "01:00",
+        "typeDescKey": "shot-on-goal",
+        "details": {"xCoord": 50, "yCoord": 5, "shotType": "wrist", "eventOwnerTeamId": 8},
+    }
+    store.put("2022020001", {"id": 2022020001, "plays": [play]})
+
+    reopened = open_store(str(raw_dir))
+    assert reopened.backend == "sqlite"
+    assert reopened.get("2022020001")["id"] == 2022020001
+    assert reopened.game_ids("20222023") == ["2022020001"]
+
+    df = tidy_all_games(str(raw_dir), save=False)
+    assert len(df) == 1
+    assert df["season"].iloc[0] == "20222023"
+
+
+def _fake_game(gid, n_shots):
+    plays = [{
+        "eventId": i,
+        "periodDescriptor": {"number": 1, "periodType": "REG"},
+        "timeInPeriod": "01:00",
+        "typeDescKey": "shot-on-goal",
+        "details": {"xCoord": 50, "yCoord": 5, "shotType": "wrist", "eventOwnerTeamId": 8},
+    } for i in range(n_shots)]
+    return {"id": int(gid), "plays": plays}
+
+
+def test_tidy_all_games_incremental(tmp_path):
+    """增量模式只处理新增/修改的比赛"""
+    from src.data.raw_store import open_store
+    from src.data.tidy_store import load_tidy_shots
+
+    raw_dir, processed = tmp_path / "raw", tmp_path / "processed"
+    store = open_store(str(raw_dir), backend="sqlite")
+    store.put("2022020001", _fake_game("2022020001", 2))
+    store.put("2023020001", _fake_game("2023020001", 3))
+    full = tidy_all_games(str(raw_dir), processed_dir=str(processed))
+    assert len(full) == 5
+
+    # New game appended, existing game rewritten with more shots
+    store.put("2022020002", _fake_game("2022020002", 4))
+    store.put("2023020001", _fake_game("2023020001", 1))
+    inc = tidy_all_games(str(raw_dir), processed_dir=str(processed), incremental=True)
+    assert len(inc) == 2 + 4 + 1
+    assert len(load_tidy_shots(str(processed), seasons=["20232024"])) == 1
+
+    unchanged = tidy_all_games(str(raw_dir), processed_dir=str(processed), incremental=True)
+    assert len(unchanged) == 7
+
+
+def test_tidy_outputs_typed_parquet(tmp_path):
+    """Parquet 输出保留类型，并支持列投影与赛季过滤"""
+    from src.data.raw_store import open_store
+    from src.data.tidy_store import load_tidy_shots
+
+    raw_dir, processed = tmp_path / "raw", tmp_path / "processed"
+    store = open_store(str(raw_dir), backend="sqlite")
+    store.put("2022020001", _fake_game("2022020001", 2))
+    store.put("2023020001", _fake_game("2023020001", 3))
+    tidy_all_games(str(raw_dir), processed_dir=str(processed), output_format="parquet")
+
+    df = load_tidy_shots(str(processed), seasons=["20232024"], columns=["game_id", "x", "shot_type"])
+    assert list(df.columns) == ["game_id", "x", "shot_type"]
+    assert len(df) == 3
+    assert str(df["x"].dtype) == "float32"  # stored Int16, loaded as float (no integer overflow)
+    assert ((89 - (df["x"] - 149)) ** 2).iloc[0] == 188 ** 2  # would wrap around in Int16
+    assert str(df["shot_type"].dtype) == "category"
+
+    clock = load_tidy_shots(str(processed), columns=["period_seconds", "game_seconds", "seconds_remaining"])
+    assert (clock.dtypes == "Int16").all()
+    assert clock["game_seconds"].tolist() == [60] * 5
+    assert clock["seconds_remaining"].tolist() == [1140] * 5
+
+
+def test_tidy_all_games_keep_events(tmp_path):
+    """keep_events 额外保存包含非射门事件的精简事件表，并支持增量更新"""
+    from src.data.raw_store import open_store
+    from src.data.tidy_store import load_tidy_events
+
+    raw_dir, processed = tmp_path / "raw", tmp_path / "processed"
+    store = open_store(str(raw_dir), backend="sqlite")
+    game = _fake_game("2022020001", 2)
+    game["plays"].insert(0, {"eventId": 99, "sortOrder": 1, "typeDescKey": "faceoff",
+                             "periodDescriptor": {"number": 1}, "timeInPeriod": "00:00",
+                             "details": {"xCoord": 0, "yCoord": 0, "zoneCode": "N"}})
+    store.put("2022020001", game)
+    shots = tidy_all_games(str(raw_dir), processed_dir=str(processed), keep_events=True)
+    events = load_tidy_events(str(processed))
+    assert len(shots) == 2
+    assert len(events) == 3
+    assert events.loc[events["event_id"] == 99, "event_type"].item() == "faceoff"
+
+    store.put("2022020002", _fake_game("2022020002", 4))
+    tidy_all_games(str(raw_dir), processed_dir=str(processed), keep_events=True, incremental=True)
+    assert len(load_tidy_events(str(processed), seasons=["20222023"])) == 3 + 4
+
+
+def test_apply_schema_does_not_mutate_input():
+    """apply_schema 返回新 DataFrame，不修改输入"""
+    from src.data.tidy_store import apply_schema
+
+    df = pd.DataFrame({"x": [1, None], "empty_net": [None, True]})
+    out = apply_schema(df)
+    assert df["empty_net"].isna().iloc[0]
+    assert out["empty_net"].tolist() == [False, True] and str(out["x"].dtype) == "Int16"
+
+
+def test_tidy_all_games_parallel_matches_serial(tmp_path):
+    """workers=2 与 workers=1 的输出（射门表、事件表、比赛索引）完全一致，行顺序相同"""
+    from src.data.game_index import load_game_index
+    from src.data.synthetic_games import write_synthetic_seasons
+    from src.data.tidy_store import load_tidy_events
+
+    raw_dir = str(tmp_path / "raw")
+    write_synthetic_seasons(raw_dir, seasons=2, games_per_season=3)
+    outputs = {}
+    for workers in (1, 2):
+        processed = str(tmp_path / f"processed_{workers}")
+        shots = tidy_all_games(raw_dir, processed_dir=processed, workers=workers, keep_events=True)
+        outputs[workers] = (shots, load_tidy_events(processed), *load_game_index(processed))
+    assert len(outputs[1][0]) > 0 and outputs[1][0]["season"].nunique() == 2
+    for serial, parallel in zip(outputs[1], outputs[2]):
+        pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_load_uses_explicit_schema_across_seasons(tmp_path):
+    """第一个赛季某分类列全为空时，后续赛季的该列仍能正确读取"""
+    from src.data.tidy_store import load_tidy_shots, save_tidy_season
+
+    processed = str(tmp_path / "processed")
+    save_tidy_season(pd.DataFrame({"game_id": [1, 2], "zone_code": [None, None], "strength": [None, None]}),
+                     "20212022", processed, fmt="parquet")
+    save_tidy_season(pd.DataFrame({"game_id": [3, 4], "zone_code": ["O", "D"], "strength": ["EV", "PP"]}),
+                     "20222023", processed, fmt="parquet")
+    df = load_tidy_shots(processed, fmt="parquet")
+    later = df[df["season"] == "20222023"]
+    assert later["zone_code"].tolist() == ["O", "D"] and later["strength"].tolist() == ["EV", "PP"]
+    assert df["zone_code"].iloc[:2].isna().all() and str(df["zone_code"].dtype) == "category"
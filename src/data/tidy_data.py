@@ -10,10 +10,21 @@ into a tidy pandas DataFrame for analysis.
 
 import os
 import json
+import time
+import argparse
 import pandas as pd
-from typing import List, Dict
-from src.utils.config import print_config
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Dict, Optional, Tuple
+from src.utils.config import print_config, PROCESSED_DIR
 from src.data.nhl_api_client import NHLDataClient
+from src.data.raw_store import open_store, season_of
+from src.data.event_stream import SHOT_TYPES, iter_plays, iter_store_games, project
+from src.data.tidy_store import (
+    EVENTS_DATASET, apply_schema, default_format, has_tidy_output, saved_seasons,
+    save_tidy_season, delete_tidy_season, load_tidy_shots,
+)
+from src.data.game_clock import game_clock
+from src.data.game_index import game_meta, index_frames, has_game_index, save_game_index, upsert_game_index
 
 # =============================
 #  Path Handling / 路径处理
@@ -30,21 +41,22 @@ def load_json(filepath: str) -> dict:
         return json.load(f)
 
 
-def tidy_shots_from_game(game_json: dict) -> pd.DataFrame:
-    """Convert one game's shots & goals into tidy rows.
-    将单场比赛中的shots与goals事件整理为DataFrame行"""
+# 输出列顺序 / Column order of the tidy shots table
+SHOT_COLUMNS = [
+    "game_id", "event_id", "event_type", "period", "period_type",
+    "time_in_period", "time_remaining", "team_id", "shooter_id", "goalie_id",
+    "shot_type", "x", "y", "strength", "empty_net", "is_goal", "zone_code",
+]
+
 
-    
+def _iter_shot_rows(game_json: dict) -> Iterator[tuple]:
+    """Yield plain row tuples (SHOT_COLUMNS order) for one game's shots & goals.
+    逐行生成单场比赛的射门/进球元组，供批量构建 DataFrame"""
     game_id = game_json.get("id")   
-    events = game_json.get("plays", [])
 
-    rows = []
-    for event in events:
+    # 只遍历 shot/goal 事件，忽略其他事件类型
+    for event in iter_plays(game_json, SHOT_TYPES):
         event_type = event.get("typeDescKey")
-        if event_type not in ["shot-on-goal", "goal"]:
-            continue  # 忽略其他事件类型
-
-        
 
         details = event.get("details", {})
         period = event.get("periodDescriptor", {}).get("number")
@@ -77,89 +89,301 @@ def tidy_shots_from_game(game_json: dict) -> pd.DataFrame:
         # Zone Code for figuring out which side the team is on
         zone_code = event.get('details', {}).get('zoneCode', None)
 
-        rows.append({
-            "game_id": game_id,
-            'event_id': event_id,
-            "event_type": event_type,
-            "period": period,
-            "period_type": period_type,
-            "time_in_period": time_in_period,
-            'time_remaining': time_remaining,
-            "team_id": event_team_id,
-            "shooter_id": shooter_id,
-            "goalie_id": goalie_id,
-            "shot_type": shot_type,
-            "x": x,
-            "y": y,
-            "strength": strength,
-            "empty_net": empty_net,
-            "is_goal": 1 if event_type == "goal" else 0,
-            'zone_code': zone_code
-        })         
+        yield (
+            game_id, event_id, event_type, period, period_type,
+            time_in_period, time_remaining, event_team_id, shooter_id, goalie_id,
+            shot_type, x, y, strength, empty_net,
+            1 if event_type == "goal" else 0,
+            zone_code,
+        )
 
-    return pd.DataFrame(rows)
 
+# 精简的全事件表 / Slim all-events table (every play, for previous-event features)
+EVENT_FIELDS = {
+    "event_id": ("eventId",),
+    "sort_order": ("sortOrder",),
+    "event_type": ("typeDescKey",),
+    "period": ("periodDescriptor", "number"),
+    "period_type": ("periodDescriptor", "periodType"),
+    "time_in_period": ("timeInPeriod",),
+    "team_id": ("details", "eventOwnerTeamId"),
+    "x": ("details", "xCoord"),
+    "y": ("details", "yCoord"),
+    "zone_code": ("details", "zoneCode"),
+}
+EVENT_COLUMNS = ["game_id"] + list(EVENT_FIELDS)
 
 
+def _iter_event_rows(game_json: dict) -> Iterator[tuple]:
+    """Yield one slim row (EVENT_COLUMNS order) per play, shots and non-shots alike."""
+    game_id = game_json.get("id")
+    for row in project(iter_plays(game_json), EVENT_FIELDS):
+        yield (game_id,) + row
 
-def tidy_all_games(raw_dir: str =  RAW_DIR, save: bool = True) -> pd.DataFrame:
-    """
-    Aggregate all games into DataFrames grouped by season and save as CSV.  
-    """
 
-    season_dfs = {}
+def tidy_shots_from_game(game_json: dict) -> pd.DataFrame:
+    """Convert one game's shots & goals into tidy rows.
+    将单场比赛中的shots与goals事件整理为DataFrame行"""
+    return pd.DataFrame(list(_iter_shot_rows(game_json)), columns=SHOT_COLUMNS)
+
 
-    for file in os.listdir(raw_dir):
-        if not file.endswith(".json"):
+def _tidy_shard(raw_dir: str, backend: str, season: str, game_ids: List[str],
+                events: bool = False) -> Tuple[str, List[tuple], List[tuple], List[tuple], List[tuple]]:
+    """Worker: tidy a shard of one season's games into plain row tuples (shots, and
+    all events if requested), plus the game-index rows (metadata) from the same parse.
+    子进程任务：处理同一赛季的一批比赛，返回射门行、事件行与比赛元数据行（不构建 DataFrame）"""
+    store = open_store(raw_dir, backend)
+    rows, event_rows, game_rows, period_rows = [], [], [], []
+    for gid, data in iter_store_games(store, game_ids):
+        try:
+            shots = list(_iter_shot_rows(data))
+            plays = list(_iter_event_rows(data)) if events else []
+            game_row, periods = game_meta(data)
+        except Exception as e:
+            print(f"[WARN] Skipping game {gid}: {e}")
             continue
-        path = os.path.join(raw_dir, file)
+        rows.extend(shots)
+        event_rows.extend(plays)
+        game_rows.append(game_row)
+        period_rows.extend(periods)
+    return season, rows, event_rows, game_rows, period_rows
+
 
-        # === 自动识别赛季 ===
+def _shard_game_ids(game_ids: List[str], workers: int) -> List[Tuple[str, List[str]]]:
+    """Group IDs by season, then split each season into chunks so all workers stay busy."""
+    by_season: Dict[str, List[str]] = {}
+    for gid in game_ids:
         try:
-            # 文件名如 "game_20200001.json"
-            year_str = file.split("game_")[1][:4]
-            start_year = int(year_str)
-            end_year = start_year + 1
-            season_label = f"{start_year}{end_year}"
+            # 比赛ID如 "2020020001"
+            season_label = season_of(gid)
         except Exception:
             season_label = "unknown"
+        by_season.setdefault(season_label, []).append(gid)
+
+    chunk = max(1, -(-len(game_ids) // (workers * 4)))
+    return [
+        (season, ids[i:i + chunk])
+        for season, ids in sorted(by_season.items())
+        for i in range(0, len(ids), chunk)
+    ]
+
+
+def _parse_games(raw_dir: str, backend: str, game_ids: List[str], workers: int,
+                 events: bool = False) -> Tuple[Dict[str, List[tuple]], Dict[str, List[tuple]],
+                                                List[tuple], List[tuple]]:
+    """Tidy game_ids into ({season: shot rows}, {season: event rows}, game index rows,
+    period index rows), on a process pool when workers > 1.
+    按赛季分片并解析（workers > 1 时使用多进程）"""
+    start = time.perf_counter()
+    season_rows: Dict[str, List[tuple]] = {}
+    season_events: Dict[str, List[tuple]] = {}
+    game_rows, period_rows = [], []
+
+    def collect(result):
+        season, rows, event_rows, games, periods = result
+        season_rows.setdefault(season, []).extend(rows)
+        if events:
+            season_events.setdefault(season, []).extend(event_rows)
+        game_rows.extend(games)
+        period_rows.extend(periods)
+
+    shards = _shard_game_ids(game_ids, workers)
+    if workers > 1 and len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_tidy_shard, raw_dir, backend, season, ids, events)
+                       for season, ids in shards]
+            for fut in futures:  # shard order keeps rows in game order
+                collect(fut.result())
+    else:
+        for season, ids in shards:
+            collect(_tidy_shard(raw_dir, backend, season, ids, events))
+
+    elapsed = time.perf_counter() - start
+    if game_ids:
+        print(f"[INFO] Parsed {len(game_ids)} games in {elapsed:.1f}s "
+              f"({len(game_ids) / max(elapsed, 1e-9):.1f} games/sec, workers={workers})")
+    return season_rows, season_events, game_rows, period_rows
+
+
+# =============================
+#  Incremental manifest / 增量清单
+# =============================
+# Bump when the tidy output changes so the next incremental run rebuilds everything
+TIDY_VERSION = 4
+MANIFEST_NAME = "tidy_manifest.json"
+
+
+def _load_tidy_manifest(processed_dir: str, fmt: str, events: bool = False) -> Optional[Dict[str, str]]:
+    """Return {game_id: signature} of processed games, or None if a full rebuild is needed."""
+    path = os.path.join(processed_dir, MANIFEST_NAME)
+    if not os.path.exists(path) or not has_tidy_output(processed_dir, fmt) \
+            or not has_game_index(processed_dir, fmt):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != TIDY_VERSION or manifest.get("format", "csv") != fmt:
+        print("[INFO] Tidy format changed since last run, rebuilding everything.")
+        return None
+    if manifest.get("events", False) != events:
+        print("[INFO] All-events table requested/dropped since last run, rebuilding everything.")
+        return None
+    return manifest["games"]
+
+
+def _save_tidy_manifest(processed_dir: str, signatures: Dict[str, str], fmt: str, events: bool = False):
+    os.makedirs(processed_dir, exist_ok=True)
+    path = os.path.join(processed_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"version": TIDY_VERSION, "format": fmt, "events": events, "games": signatures},
+                  f, separators=(",", ":"))
+    os.replace(path + ".tmp", path)
+
+
+def add_game_clock(df: pd.DataFrame) -> pd.DataFrame:
+    """Add int16 period_seconds / game_seconds / seconds_remaining, parsed once from the
+    MM:SS strings (vectorized; OT and shootout lengths from period_type).
+    将 MM:SS 字符串一次性转换为整数秒（含加时与点球大战）"""
+    period_s, game_s, remaining = game_clock(
+        df["game_id"].to_numpy(dtype="int64"), df["period"], df["period_type"],
+        df["time_in_period"], df["time_remaining"] if "time_remaining" in df else None,
+    )
+    df["period_seconds"] = period_s
+    df["game_seconds"] = game_s
+    df["seconds_remaining"] = remaining
+    return df
+
+
+def _season_frame(rows: List[tuple], season: str, columns: List[str] = SHOT_COLUMNS) -> pd.DataFrame:
+    df = apply_schema(add_game_clock(pd.DataFrame(rows, columns=columns)))
+    df["season"] = season
+    return df
+
+
+def _upsert_events(season_events: Dict[str, List[tuple]], affected, stale, processed_dir: str, fmt: str):
+    """Replace the stale games' rows of each affected season in the all-events table."""
+    existing = set(saved_seasons(processed_dir, fmt, EVENTS_DATASET))
+    for season in sorted(affected):
+        new_df = _season_frame(season_events.get(season, []), season, EVENT_COLUMNS)
+        if season in existing:
+            old = load_tidy_shots(processed_dir, seasons=[season], fmt=fmt, dataset=EVENTS_DATASET)
+            if stale:
+                old = old[~old["game_id"].isin(stale)]
+            new_df = apply_schema(pd.concat([old.astype({"season": "string"}), new_df], ignore_index=True))
+        if new_df.empty:
+            delete_tidy_season(season, processed_dir, fmt, EVENTS_DATASET)
+        else:
+            save_tidy_season(new_df, season, processed_dir, fmt, EVENTS_DATASET)
+
+
+def _tidy_incremental(store, raw_dir: str, processed_dir: str, workers: int, fmt: str,
+                      signatures: Dict[str, str], manifest: Dict[str, str],
+                      events: bool = False) -> pd.DataFrame:
+    """Parse only new/modified games and upsert them into the per-season outputs.
+    仅处理新增或修改过的比赛，并更新对应赛季的输出文件"""
+    all_path = os.path.join(processed_dir, "tidy_shots_all.csv")
+    changed = sorted(gid for gid, sig in signatures.items() if manifest.get(gid) != sig)
+    removed = sorted(gid for gid in manifest if gid not in signatures)
+    if not changed and not removed:
+        print("[INFO] Tidy outputs are up to date.")
+        return load_tidy_shots(processed_dir, fmt=fmt)
+
+    print(f"[INFO] Incremental tidy: {len(changed)} new/modified, {len(removed)} removed games.")
+    season_rows, season_events, game_rows, period_rows = _parse_games(
+        raw_dir, store.backend, changed, workers, events)
+    stale = {int(gid) for gid in changed + removed if gid in manifest}
+    upsert_game_index(*index_frames(game_rows, period_rows), drop_ids=stale,
+                      processed_dir=processed_dir, fmt=fmt)
+    affected = {season_of(gid) for gid in changed + removed}
+    existing = set(saved_seasons(processed_dir, fmt))
+
+    new_dfs = []
+    for season in sorted(affected):
+        new_df = _season_frame(season_rows.get(season, []), season)
+        new_dfs.append(new_df)
+        if season in existing:
+            old = load_tidy_shots(processed_dir, seasons=[season], fmt=fmt)
+            if stale:
+                old = old[~old["game_id"].isin(stale)]
+            new_df = apply_schema(pd.concat([old.astype({"season": "string"}), new_df], ignore_index=True))
+        if new_df.empty:
+            delete_tidy_season(season, processed_dir, fmt)
+        else:
+            save_tidy_season(new_df, season, processed_dir, fmt)
+    if events:
+        _upsert_events(season_events, affected, stale, processed_dir, fmt)
+
+    if fmt == "csv" and not stale:
+        # Only new games: append to the combined file
+        pd.concat(new_dfs, ignore_index=True).to_csv(all_path, mode="a", header=False, index=False)
+    full_df = load_tidy_shots(processed_dir, fmt=fmt)
+    if fmt == "csv" and stale:
+        # Upserts/removals: rebuild the combined file from the season files
+        full_df.to_csv(all_path, index=False)
+    print(f"[INFO] Updated tidy dataset: {len(full_df)} rows")
+
+    _save_tidy_manifest(processed_dir, signatures, fmt, events)
+    return full_df
 
-        try:
-            data = load_json(path)
-            df = tidy_shots_from_game(data)
-            if not df.empty:
-                df["season"] = season_label
-                if season_label not in season_dfs:
-                    season_dfs[season_label] = []
-                season_dfs[season_label].append(df)
-        except Exception as e:
-            print(f"[WARN] Skipping {file}: {e}")
 
-    if not season_dfs:
+def tidy_all_games(raw_dir: str =  RAW_DIR, save: bool = True, workers: Optional[int] = 1,
+                   processed_dir: str = PROCESSED_DIR, incremental: bool = False,
+                   output_format: Optional[str] = None, keep_events: bool = False) -> pd.DataFrame:
+    """
+    Aggregate all games into DataFrames grouped by season and save them,
+    together with the per-game metadata index (see game_index.py).
+    workers: processes used for parsing (None = all cores, 1 = in-process).
+    incremental: only parse games that are new or changed since the last saved run.
+    output_format: "parquet" (partitioned by season, default when pyarrow is installed) or "csv".
+    keep_events: also save the slim all-events table (EVENT_COLUMNS, every play) used for
+                 previous-event features; load it with tidy_store.load_tidy_events.
+    """
+    store = open_store(raw_dir)
+    signatures = store.signatures()
+    workers = workers or os.cpu_count() or 1
+    fmt = output_format or default_format()
+
+    if incremental and save:
+        manifest = _load_tidy_manifest(processed_dir, fmt, keep_events)
+        if manifest is not None:
+            return _tidy_incremental(store, raw_dir, processed_dir, workers, fmt, signatures, manifest,
+                                     keep_events)
+
+    season_rows, season_events, game_rows, period_rows = _parse_games(
+        raw_dir, store.backend, sorted(signatures), workers, keep_events)
+    season_rows = {season: rows for season, rows in season_rows.items() if rows}
+    if save and game_rows:
+        save_game_index(*index_frames(game_rows, period_rows), processed_dir=processed_dir, fmt=fmt)
+    if save:
+        # Drop event seasons from an earlier run so the table never goes stale
+        for season in saved_seasons(processed_dir, fmt, EVENTS_DATASET):
+            if season not in season_events:
+                delete_tidy_season(season, processed_dir, fmt, EVENTS_DATASET)
+        for season, rows in sorted(season_events.items()):
+            # 每个赛季单独写出，内存中只保留当前赛季的 DataFrame
+            save_tidy_season(_season_frame(rows, season, EVENT_COLUMNS), season, processed_dir, fmt,
+                             EVENTS_DATASET)
+        season_events.clear()
+    if not season_rows:
         print("[WARN] No valid games processed.")
         return pd.DataFrame()
 
-    # 合并并保存每个赛季
+    # 合并并保存每个赛季（每个赛季只构建一次 DataFrame）
     all_dfs = []
-    for season, dfs in season_dfs.items():
-        combined = pd.concat(dfs, ignore_index=True)
+    for season in sorted(season_rows):
+        combined = _season_frame(season_rows[season], season)
         all_dfs.append(combined)
-
         if save:
-            processed_dir = os.path.join("data", "processed")
-            os.makedirs(processed_dir, exist_ok=True)
-            csv_path = os.path.join(processed_dir, f"tidy_shots_{season}.csv")
-            combined.to_csv(csv_path, index=False)
-            size_mb = os.path.getsize(csv_path) / (1024 * 1024)
-            print(f"[INFO] Saved {csv_path} ({size_mb:.2f} MB, {len(combined)} rows)")
-
-    # 生成全赛季合并文件
-    full_df = pd.concat(all_dfs, ignore_index=True)
+            save_tidy_season(combined, season, processed_dir, fmt)
+
+    # 生成全赛季合并数据（CSV 模式额外写出合并文件）
+    full_df = apply_schema(pd.concat(all_dfs, ignore_index=True))
     if save:
-        all_path = os.path.join("data", "processed", "tidy_shots_all.csv")
-        full_df.to_csv(all_path, index=False)
-        size_mb = os.path.getsize(all_path) / (1024 * 1024)
-        print(f"[INFO] Saved combined dataset: {all_path} ({size_mb:.2f} MB)")
+        if fmt == "csv":
+            all_path = os.path.join(processed_dir, "tidy_shots_all.csv")
+            full_df.to_csv(all_path, index=False)
+            size_mb = os.path.getsize(all_path) / (1024 * 1024)
+            print(f"[INFO] Saved combined dataset: {all_path} ({size_mb:.2f} MB)")
+        _save_tidy_manifest(processed_dir, signatures, fmt, keep_events)
 
     return full_df
 
@@ -257,6 +481,18 @@ def summarize_game_info(game_json):
     return {"player_map": player_map, "team_map": team_map}
 
 if __name__ == "__main__":
-    df = tidy_all_games()
+    parser = argparse.ArgumentParser(description="Build tidy shot tables from raw play-by-play")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Parser processes (default: all cores)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only process games that are new or changed since the last run")
+    parser.add_argument("--format", choices=["parquet", "csv"], default=None,
+                        help="Output format (default: parquet if pyarrow is installed)")
+    parser.add_argument("--events", action="store_true",
+                        help="Also save the slim all-events table for previous-event features")
+    args = parser.parse_args()
+    df = tidy_all_games(args.raw_dir, workers=args.workers, incremental=args.incremental,
+                        output_format=args.format, keep_events=args.events)
     print(df.head(10))
 
@@ -0,0 +1,219 @@
+"""
+tidy_store.py
+Typed schema and on-disk format for the tidy shots dataset.
+
+Parquet layout (default), one partition per season:
+    data/processed/tidy_shots/season=20222023/part-0.parquet
+CSV layout (legacy / no pyarrow):
+    data/processed/tidy_shots_<season>.csv + tidy_shots_all.csv
+
+The optional slim all-events table (tidy_all_games(keep_events=True)) uses the same
+layouts under the name "tidy_events" (no combined CSV).
+
+load_tidy_shots() / load_tidy_events() read either layout with column projection
+and season filtering.
+"""
+
+import os
+from typing import List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # CSV-only fallback
+    pa = ds = None
+
+from src.utils.config import PROCESSED_DIR
+
+DATASET_NAME = "tidy_shots"
+EVENTS_DATASET = "tidy_events"
+
+# Explicit dtypes of the tidy tables (nullable ints where the API may omit a field)
+TIDY_DTYPES = {
+    "season": "category",
+    "game_id": "int32",
+    "event_id": "Int32",
+    "sort_order": "Int16",
+    "event_type": "category",
+    "period": "Int8",
+    "period_type": "category",
+    "time_in_period": "string",
+    "time_remaining": "string",
+    "period_seconds": "Int16",
+    "game_seconds": "Int16",
+    "seconds_remaining": "Int16",
+    "team_id": "Int32",
+    "shooter_id": "Int32",
+    "goalie_id": "Int32",
+    "shot_type": "category",
+    "x": "Int16",
+    "y": "Int16",
+    "strength": "category",
+    "empty_net": "bool",
+    "is_goal": "int8",
+    "zone_code": "category",
+}
+
+# Arrow type of each TIDY_DTYPES column. Parquet datasets are read with this schema rather
+# than one inferred from the first partition (an all-null column there would be typed null
+# and null out the column for every other season). Categories are read as strings and
+# turned back into categoricals by apply_schema.
+ARROW_TYPES = {"category": "string", "string": "string", "bool": "bool_",
+               "int32": "int32", "Int32": "int32", "Int16": "int16", "Int8": "int8", "int8": "int8"}
+
+# Stored as Int16 to keep files small, but loaded as float32: pandas arithmetic on Int16
+# wraps around silently (e.g. (89 - x) ** 2 for x = -99), which geometry code would hit.
+# 坐标以 Int16 存储，读取时转为 float32，避免整数运算溢出
+LOAD_FLOAT_COLUMNS = ("x", "y")
+
+
+def default_format() -> str:
+    return "parquet" if pa is not None else "csv"
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast the tidy columns present in df to TIDY_DTYPES (df itself is left unchanged)."""
+    if "empty_net" in df:
+        df = df.assign(empty_net=df["empty_net"].fillna(False))
+    return df.astype({c: t for c, t in TIDY_DTYPES.items() if c in df.columns})
+
+
+def arrow_schema(inferred: "pa.Schema") -> "pa.Schema":
+    """inferred with every TIDY_DTYPES column set to its ARROW_TYPES type."""
+    return pa.schema([(f.name, getattr(pa, ARROW_TYPES[TIDY_DTYPES[f.name]])()) if f.name in TIDY_DTYPES else f
+                      for f in inferred])
+
+
+def _loaded(df: pd.DataFrame) -> pd.DataFrame:
+    """Storage schema -> in-memory schema (float coordinates, see LOAD_FLOAT_COLUMNS)."""
+    df = apply_schema(df)
+    return df.astype({c: "float32" for c in LOAD_FLOAT_COLUMNS if c in df.columns})
+
+
+def _dataset_dir(processed_dir: str, dataset: str = DATASET_NAME) -> str:
+    return os.path.join(processed_dir, dataset)
+
+
+def stored_format(processed_dir: str = PROCESSED_DIR, dataset: str = DATASET_NAME) -> str:
+    """Format of the dataset saved under processed_dir (default_format() if none is saved)."""
+    if os.path.isdir(_dataset_dir(processed_dir, dataset)):
+        return "parquet"
+    if saved_seasons(processed_dir, "csv", dataset):
+        return "csv"
+    return default_format()
+
+
+def _season_csv(processed_dir: str, season: str, dataset: str = DATASET_NAME) -> str:
+    return os.path.join(processed_dir, f"{dataset}_{season}.csv")
+
+
+def has_tidy_output(processed_dir: str = PROCESSED_DIR, fmt: Optional[str] = None,
+                    dataset: str = DATASET_NAME) -> bool:
+    fmt = fmt or default_format()
+    if fmt == "parquet":
+        return os.path.isdir(_dataset_dir(processed_dir, dataset))
+    if dataset == DATASET_NAME:
+        return os.path.exists(os.path.join(processed_dir, "tidy_shots_all.csv"))
+    return bool(saved_seasons(processed_dir, fmt, dataset))
+
+
+def saved_seasons(processed_dir: str = PROCESSED_DIR, fmt: Optional[str] = None,
+                  dataset: str = DATASET_NAME) -> List[str]:
+    """Seasons saved in fmt (default: the format found on disk, see stored_format)."""
+    fmt = fmt or stored_format(processed_dir, dataset)
+    if fmt == "parquet":
+        root = _dataset_dir(processed_dir, dataset)
+        if not os.path.isdir(root):
+            return []
+        return sorted(d.split("=", 1)[1] for d in os.listdir(root) if d.startswith("season="))
+    if not os.path.isdir(processed_dir):
+        return []
+    prefix = f"{dataset}_"
+    return sorted(
+        f[len(prefix):-len(".csv")] for f in os.listdir(processed_dir)
+        if f.startswith(prefix) and f.endswith(".csv") and f != f"{dataset}_all.csv"
+    )
+
+
+def save_tidy_season(df: pd.DataFrame, season: str, processed_dir: str = PROCESSED_DIR,
+                     fmt: Optional[str] = None, dataset: str = DATASET_NAME) -> str:
+    """Write one season's rows (replacing any previous output for that season)."""
+    fmt = fmt or default_format()
+    df = apply_schema(df.drop(columns=["season"], errors="ignore"))
+    if fmt == "parquet":
+        part_dir = os.path.join(_dataset_dir(processed_dir, dataset), f"season={season}")
+        os.makedirs(part_dir, exist_ok=True)
+        path = os.path.join(part_dir, "part-0.parquet")
+        df.to_parquet(path + ".tmp", index=False, engine="pyarrow")
+        os.replace(path + ".tmp", path)
+    else:
+        os.makedirs(processed_dir, exist_ok=True)
+        path = _season_csv(processed_dir, season, dataset)
+        df.assign(season=season).to_csv(path, index=False)
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"[INFO] Saved {path} ({size_mb:.2f} MB, {len(df)} rows)")
+    return path
+
+
+def season_path(season: str, processed_dir: str = PROCESSED_DIR, fmt: Optional[str] = None,
+                dataset: str = DATASET_NAME) -> str:
+    """File holding one season of a tidy dataset (it may not exist)."""
+    fmt = fmt or default_format()
+    if fmt == "parquet":
+        return os.path.join(_dataset_dir(processed_dir, dataset), f"season={season}", "part-0.parquet")
+    return _season_csv(processed_dir, season, dataset)
+
+
+def delete_tidy_season(season: str, processed_dir: str = PROCESSED_DIR, fmt: Optional[str] = None,
+                       dataset: str = DATASET_NAME):
+    fmt = fmt or default_format()
+    path = season_path(season, processed_dir, fmt, dataset)
+    if os.path.exists(path):
+        os.remove(path)
+        if fmt == "parquet":
+            os.rmdir(os.path.dirname(path))
+
+
+def load_tidy_shots(processed_dir: str = PROCESSED_DIR, seasons: Optional[List[str]] = None,
+                    columns: Optional[List[str]] = None, fmt: Optional[str] = None,
+                    dataset: str = DATASET_NAME) -> pd.DataFrame:
+    """
+    Load the tidy shots table (or another tidy dataset, see load_tidy_events).
+    seasons: only read these seasons (partition pruning for parquet, file selection for CSV).
+    columns: only read these columns ('season' is available as a column in both layouts).
+    Columns come back with TIDY_DTYPES, except x / y which are float32 (LOAD_FLOAT_COLUMNS).
+    """
+    fmt = fmt or stored_format(processed_dir, dataset)
+    if fmt == "parquet" and not os.path.isdir(_dataset_dir(processed_dir, dataset)):
+        fmt = "csv"  # outputs written before the parquet switch
+    seasons = [str(s) for s in seasons] if seasons is not None else None
+
+    if fmt == "parquet":
+        part = ds.partitioning(pa.schema([("season", pa.string())]), flavor="hive")
+        root = _dataset_dir(processed_dir, dataset)
+        inferred = ds.dataset(root, format="parquet", partitioning=part).schema
+        data = ds.dataset(root, format="parquet", partitioning=part, schema=arrow_schema(inferred))
+        flt = ds.field("season").isin(seasons) if seasons is not None else None
+        df = data.to_table(columns=columns, filter=flt).to_pandas()
+        return _loaded(df)
+
+    wanted = seasons if seasons is not None else saved_seasons(processed_dir, "csv", dataset)
+    frames = []
+    for season in wanted:
+        path = _season_csv(processed_dir, season, dataset)
+        if not os.path.exists(path):
+            print(f"[WARN] Missing file: {path}")
+            continue
+        df = pd.read_csv(path, usecols=columns, dtype={"season": "string"})
+        frames.append(apply_schema(df))
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return _loaded(pd.concat(frames, ignore_index=True))
+
+
+def load_tidy_events(processed_dir: str = PROCESSED_DIR, seasons: Optional[List[str]] = None,
+                     columns: Optional[List[str]] = None, fmt: Optional[str] = None) -> pd.DataFrame:
+    """Load the slim all-events table written by tidy_all_games(keep_events=True)."""
+    return load_tidy_shots(processed_dir, seasons, columns, fmt, dataset=EVENTS_DATASET)
@@ -2,8 +2,221 @@
 feature_engineering.py
 Build distance, angle, rebound, and other features for ML models.
 Milestone 2 - Feature Engineering
+
+Every feature is computed column-wise over the whole tidy frame (NumPy / grouped
+shifts); there is no per-row or per-game Python code.
+
+Previous-event features come from the slim all-events table when it was saved
+(tidy_all_games(keep_events=True)), so the "previous play" can be a hit, faceoff,
+giveaway...; otherwise they fall back to the previous shot.
 """
 
-def build_features(raw_df):
-    print("[Placeholder] Building features (distance, angle, rebounds, etc.)")
-    return None
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.event_stream import SHOT_TYPES
+from src.data.normalize_coords import attacking_coordinates, game_tables
+from src.data.tidy_store import EVENTS_DATASET, load_tidy_events, load_tidy_shots, saved_seasons
+from src.data.game_clock import game_clock
+from src.features.feature_utils import compute_distance, compute_angle
+from src.utils.config import RAW_DIR, PROCESSED_DIR
+
+# Bump when the feature definitions change, so cached feature matrices are rebuilt
+FEATURE_VERSION = 4
+
+# A shot within this many seconds of a previous (unscored) shot is a rebound
+REBOUND_WINDOW_S = 4.0
+# A shot within this many seconds of an event in the shooting team's neutral/defensive zone is a rush
+RUSH_WINDOW_S = 4.0
+
+FEATURE_COLUMNS = [
+    "distance", "angle", "game_seconds", "period_seconds",
+    "time_since_last", "distance_from_last", "rebound", "angle_change", "speed", "rush",
+]
+CATEGORICAL_COLUMNS = ["prev_event_type"]
+ID_COLUMNS = ["game_id", "season", "period", "event_id", "team_id", "is_goal"]
+
+# Columns read from the tidy tables by iter_season_features
+SHOT_INPUT_COLUMNS = ["game_id", "event_id", "event_type", "period", "period_seconds", "game_seconds",
+                      "team_id", "x", "y", "zone_code", "is_goal"]
+EVENT_INPUT_COLUMNS = ["game_id", "event_id", "sort_order", "event_type", "period",
+                       "period_seconds", "game_seconds", "team_id", "x", "y", "zone_code"]
+
+_FLIP_ZONE = {"O": "D", "D": "O", "N": "N"}
+
+
+def _coords(df: pd.DataFrame):
+    """Offense-normalized coordinates when available, else raw rink coordinates."""
+    xcol, ycol = ("x_off", "y_off") if "x_off" in df else ("x", "y")
+    return (df[xcol].astype("float64").to_numpy(), df[ycol].astype("float64").to_numpy())
+
+
+def _rink(df: pd.DataFrame):
+    """Raw rink coordinates. Previous-event deltas use these: x_off / y_off are flipped per
+    shooting team, so positions of plays by opposite teams cannot be compared in them."""
+    return df["x"].astype("float64").to_numpy(), df["y"].astype("float64").to_numpy()
+
+
+def _clock(df: pd.DataFrame):
+    """(period_seconds, game_seconds) as float arrays: the tidy integer columns, or
+    parsed from time_in_period for frames built before they existed."""
+    if "period_seconds" in df and "game_seconds" in df:
+        return (df["period_seconds"].astype("float64").to_numpy(),
+                df["game_seconds"].astype("float64").to_numpy())
+    period_s, game_s, _ = game_clock(df["game_id"].to_numpy(dtype="int64"), df["period"],
+                                     df["period_type"] if "period_type" in df else None,
+                                     df["time_in_period"])
+    return period_s, game_s
+
+
+def _sequence(df: pd.DataFrame, x, y, game_s) -> pd.DataFrame:
+    """The columns _sequence_features needs, on a fresh RangeIndex."""
+    if "event_type" in df:
+        etype = df["event_type"].astype("object").to_numpy()
+    else:  # bare shots frame: every row is a shot
+        etype = np.where(df["is_goal"].to_numpy() == 1, "goal", "shot-on-goal")
+    seq = pd.DataFrame({
+        "game_id": df["game_id"].to_numpy(),
+        "period": df["period"].to_numpy(),
+        "game_seconds": game_s,
+        "x": x, "y": y,
+        "angle": compute_angle(x, y),
+        "event_type": etype,
+        "team_id": df["team_id"].astype("float64").to_numpy() if "team_id" in df else np.nan,
+        "zone_code": df["zone_code"].astype("object").to_numpy() if "zone_code" in df else None,
+    })
+    for col in ("sort_order", "event_id"):
+        if col in df:
+            seq[col] = df[col].to_numpy()
+    return seq
+
+
+def _sequence_features(seq: pd.DataFrame) -> pd.DataFrame:
+    """
+    Previous-event features for every row of seq: sort once by (game, period, play order),
+    then take the previous row of the same (game_id, period) with a grouped shift.
+    Returned in seq's (RangeIndex) row order.
+    """
+    order_cols = ["game_id", "period"] + (["sort_order"] if "sort_order" in seq else ["game_seconds"]) \
+        + (["event_id"] if "event_id" in seq else [])
+    seq = seq.sort_values(order_cols, kind="stable")
+    prev = seq.groupby(["game_id", "period"], sort=False, observed=True)[
+        ["x", "y", "game_seconds", "angle", "event_type", "team_id", "zone_code"]].shift(1)
+
+    dt = seq["game_seconds"].to_numpy() - prev["game_seconds"].to_numpy(dtype="float64")
+    dist_last = np.hypot(seq["x"].to_numpy() - prev["x"].to_numpy(dtype="float64"),
+                         seq["y"].to_numpy() - prev["y"].to_numpy(dtype="float64"))
+    prev_type = prev["event_type"].to_numpy(dtype=object)
+    rebound = (prev_type == "shot-on-goal") & (dt <= REBOUND_WINDOW_S)
+
+    # Zone codes are relative to the event owner: flip them when the other team made the play
+    prev_zone = prev["zone_code"]
+    same_team = seq["team_id"].to_numpy() == prev["team_id"].to_numpy(dtype="float64")
+    zone = np.where(same_team, prev_zone.to_numpy(dtype=object),
+                    prev_zone.map(_FLIP_ZONE).to_numpy(dtype=object))
+    rush = np.isin(zone, ["N", "D"]) & (dt <= RUSH_WINDOW_S)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speed = np.where(dt > 0, dist_last / dt, np.nan)
+    angle_change = np.where(rebound, np.abs(seq["angle"].to_numpy() - prev["angle"].to_numpy(dtype="float64")), 0.0)
+
+    feats = pd.DataFrame({
+        "time_since_last": dt,
+        "distance_from_last": dist_last,
+        "rebound": rebound,
+        "angle_change": angle_change,
+        "speed": speed,
+        "rush": rush,
+        "prev_event_type": pd.Categorical(prev_type),
+    }, index=seq.index)
+    return feats.sort_index()
+
+
+def previous_event_features(events: pd.DataFrame) -> pd.DataFrame:
+    """
+    Previous-event features of the shots in a slim all-events table (tidy_events),
+    keyed by (game_id, event_id). Non-shot plays only serve as "previous events".
+    """
+    x, y = _rink(events)
+    _, game_s = _clock(events)
+    feats = _sequence_features(_sequence(events, x, y, game_s))
+    shots = events["event_type"].isin(SHOT_TYPES).to_numpy()
+    feats.insert(0, "game_id", events["game_id"].to_numpy(dtype="int64"))
+    feats.insert(1, "event_id", events["event_id"].astype("Int64").to_numpy())
+    return feats[shots].drop_duplicates(["game_id", "event_id"]).reset_index(drop=True)
+
+
+def build_features(raw_df: pd.DataFrame, events: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Feature matrix for a tidy shots frame (one row per shot, same row order as the input).
+
+    distance / angle         : to the nearest net (feature_utils.compute_distance). With
+                               x_off / y_off (attacking_coordinates) that is the attacked net; the
+                               raw x / y fallback mis-measures shots from a team's own half
+    game_seconds             : seconds elapsed since puck drop
+    time_since_last          : seconds since the previous event in the same game & period
+    distance_from_last       : ft between this event and the previous one (rink x / y)
+    rebound / angle_change   : previous event was a shot on goal within REBOUND_WINDOW_S
+    speed                    : distance_from_last / time_since_last (ft/s)
+    rush                     : previous event was in the shooting team's neutral/defensive zone
+                               within RUSH_WINDOW_S
+    prev_event_type          : type of the previous event
+
+    events: the all-events table of the same games (load_tidy_events). Without it the
+            "previous event" is the previous shot in raw_df.
+    """
+    if raw_df is None or raw_df.empty:
+        return pd.DataFrame(columns=[c for c in ID_COLUMNS] + FEATURE_COLUMNS + CATEGORICAL_COLUMNS)
+
+    x, y = _coords(raw_df)
+    period_s, game_s = _clock(raw_df)
+    out = pd.DataFrame({c: raw_df[c].to_numpy() for c in ID_COLUMNS if c in raw_df}, index=raw_df.index)
+    out["distance"] = compute_distance(x, y)
+    out["angle"] = compute_angle(x, y)
+    out["period_seconds"] = period_s
+    out["game_seconds"] = game_s
+
+    if events is not None:
+        keys = pd.DataFrame({"game_id": raw_df["game_id"].to_numpy(dtype="int64"),
+                             "event_id": raw_df["event_id"].astype("Int64").to_numpy()})
+        # A left merge keeps the shots' row order
+        feats = keys.merge(previous_event_features(events), on=["game_id", "event_id"], how="left")
+        feats["rebound"] = feats["rebound"].fillna(False).astype(bool)
+        feats["rush"] = feats["rush"].fillna(False).astype(bool)
+    else:
+        feats = _sequence_features(_sequence(raw_df, *_rink(raw_df), game_s))
+    for col in FEATURE_COLUMNS[4:] + CATEGORICAL_COLUMNS:
+        out[col] = feats[col].to_numpy()
+    return out
+
+
+def iter_season_features(processed_dir: str = PROCESSED_DIR, seasons: Optional[List[str]] = None,
+                         normalize: bool = True, raw_dir: str = RAW_DIR) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Yield (season, features) one season at a time, so only one season of shots and
+    events is in memory. Uses the all-events table for the seasons that have it.
+    normalize: compute distance/angle in the shooting team's attacking frame
+               (normalize_coords.attacking_coordinates; own-half shots are dropped).
+    """
+    seasons = seasons or saved_seasons(processed_dir)
+    with_events = set(saved_seasons(processed_dir, dataset=EVENTS_DATASET))
+    sides, teams = game_tables(raw_dir, processed_dir) if normalize else (None, None)
+    for season in seasons:
+        shots = load_tidy_shots(processed_dir, seasons=[season], columns=SHOT_INPUT_COLUMNS + ["season"])
+        if normalize:
+            shots = attacking_coordinates(shots, sides, teams)
+        events = None
+        if season in with_events:
+            events = load_tidy_events(processed_dir, seasons=[season], columns=EVENT_INPUT_COLUMNS)
+        yield season, build_features(shots, events)
+
+
+def load_features(processed_dir: str = PROCESSED_DIR, seasons: Optional[List[str]] = None,
+                  normalize: bool = True, raw_dir: str = RAW_DIR) -> pd.DataFrame:
+    """Concatenated iter_season_features output."""
+    frames = [df for _, df in iter_season_features(processed_dir, seasons, normalize, raw_dir)]
+    if not frames:
+        return build_features(None)
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,229 @@
+"""
+feature_store.py
+Local cache of engineered feature matrices, so model runs don't rebuild features.
+
+Entries are keyed by (seasons, FEATURE_VERSION, hash of the tidy inputs) and stored as
+plain .npy files that are opened memory-mapped:
+
+    data/features/<key>/X.npy           float32 (n_rows, len(FEATURE_COLUMNS))
+    data/features/<key>/y.npy           int8    is_goal
+    data/features/<key>/<id col>.npy    game_id, event_id, period, team_id, season
+    data/features/<key>/<cat col>.npy   category codes (categories in meta.json)
+    data/features/<key>/meta.json
+
+    store = FeatureStore()
+    fs = store.get_or_build(seasons=["20222023", "20232024"])
+    fs.X, fs.y          # memmaps, no copy
+    fs.frame()          # DataFrame view for pandas code
+
+When the total size exceeds FEATURE_STORE_MAX_BYTES the least recently used entries are removed.
+
+python -m src.features.feature_store --list
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import argparse
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data.game_index import index_format, index_paths
+from src.data.tidy_store import DATASET_NAME, EVENTS_DATASET, saved_seasons, season_path, stored_format
+from src.features.feature_engineering import (
+    FEATURE_VERSION, FEATURE_COLUMNS, CATEGORICAL_COLUMNS, load_features,
+)
+from src.utils.config import RAW_DIR, PROCESSED_DIR, FEATURE_STORE_DIR, FEATURE_STORE_MAX_BYTES
+
+# id column -> stored dtype (missing values become -1)
+ID_DTYPES = {"game_id": "int32", "event_id": "int32", "period": "int8", "team_id": "int32", "season": "int32"}
+META_NAME = "meta.json"
+
+
+def input_hash(processed_dir: str, seasons: List[str], normalize: bool = True) -> str:
+    """Content hash of the tidy files a feature build reads (shots, events, game index)."""
+    # whichever format is on disk (a CSV tidy run is hashed even when pyarrow is installed)
+    paths = []
+    for dataset in (DATASET_NAME, EVENTS_DATASET):
+        fmt = stored_format(processed_dir, dataset)
+        paths.extend(season_path(season, processed_dir, fmt, dataset) for season in seasons)
+    if normalize:
+        paths.extend(index_paths(processed_dir, index_format(processed_dir)))
+    h = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        h.update(os.path.relpath(path, processed_dir).encode())
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+class FeatureSet:
+    """One cached feature matrix (arrays are read-only memmaps)."""
+
+    def __init__(self, path: str, meta: dict, mmap: bool = True):
+        self.path = path
+        self.meta = meta
+        mode = "r" if mmap else None
+        self.X = np.load(os.path.join(path, "X.npy"), mmap_mode=mode)
+        self.y = np.load(os.path.join(path, "y.npy"), mmap_mode=mode)
+        self.ids = {c: np.load(os.path.join(path, f"{c}.npy"), mmap_mode=mode) for c in meta["id_columns"]}
+        self.codes = {c: np.load(os.path.join(path, f"{c}.npy"), mmap_mode=mode) for c in meta["categories"]}
+
+    @property
+    def columns(self) -> List[str]:
+        return self.meta["columns"]
+
+    def __len__(self):
+        return len(self.y)
+
+    def frame(self) -> pd.DataFrame:
+        """Feature columns, ids, categoricals and is_goal as a DataFrame."""
+        df = pd.DataFrame({c: self.ids[c] for c in self.ids})
+        for i, col in enumerate(self.columns):
+            df[col] = self.X[:, i]
+        for col, cats in self.meta["categories"].items():
+            df[col] = pd.Categorical.from_codes(np.asarray(self.codes[col]), categories=cats)
+        df["is_goal"] = self.y
+        return df
+
+
+class FeatureStore:
+    def __init__(self, root: str = FEATURE_STORE_DIR, max_bytes: int = FEATURE_STORE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    # ---------- keys ----------
+    def key(self, seasons: List[str], processed_dir: str = PROCESSED_DIR, normalize: bool = True) -> str:
+        seasons = sorted(str(s) for s in seasons)
+        parts = ",".join(seasons) + f"|v{FEATURE_VERSION}|n{int(normalize)}|" + input_hash(processed_dir, seasons, normalize)
+        return hashlib.blake2b(parts.encode(), digest_size=12).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    # ---------- read / write ----------
+    def get(self, key: str, mmap: bool = True) -> Optional[FeatureSet]:
+        path = self._path(key)
+        meta_path = os.path.join(path, META_NAME)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        os.utime(meta_path)  # LRU: last use = meta.json mtime
+        return FeatureSet(path, meta, mmap)
+
+    def put(self, key: str, features: pd.DataFrame, info: Optional[dict] = None) -> FeatureSet:
+        """Write a build_features frame as entry `key` (atomically), then evict if over budget."""
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self._path(f"{key}.tmp-{os.getpid()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        X = np.empty((len(features), len(FEATURE_COLUMNS)), dtype="float32")
+        for i, col in enumerate(FEATURE_COLUMNS):
+            X[:, i] = features[col].astype("float32").to_numpy()
+        np.save(os.path.join(tmp, "X.npy"), X)
+        np.save(os.path.join(tmp, "y.npy"), features["is_goal"].to_numpy(dtype="int8"))
+        id_columns = [c for c in ID_DTYPES if c in features]
+        for col in id_columns:
+            values = features[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype("string")
+            values = pd.to_numeric(values, errors="coerce")
+            np.save(os.path.join(tmp, f"{col}.npy"), values.fillna(-1).to_numpy(dtype=ID_DTYPES[col]))
+        categories = {}
+        for col in CATEGORICAL_COLUMNS:
+            if col in features:
+                cat = features[col].astype("category")
+                categories[col] = [str(c) for c in cat.cat.categories]
+                np.save(os.path.join(tmp, f"{col}.npy"), cat.cat.codes.to_numpy(dtype="int16"))
+
+        meta = {
+            "key": key, "version": FEATURE_VERSION, "rows": len(features), "columns": FEATURE_COLUMNS,
+            "id_columns": id_columns, "categories": categories, "created": time.time(), **(info or {}),
+        }
+        with open(os.path.join(tmp, META_NAME), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=1)
+
+        path = self._path(key)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+        print(f"[INFO] Cached features {key} ({len(features)} rows, {_dir_size(path) / 2**20:.1f} MB)")
+        self.evict(keep=key)
+        return self.get(key)
+
+    def get_or_build(self, seasons: Optional[List[str]] = None, processed_dir: str = PROCESSED_DIR,
+                     raw_dir: str = RAW_DIR, normalize: bool = True) -> FeatureSet:
+        """Cached features for these seasons (all saved seasons by default); builds them on a miss."""
+        seasons = sorted(str(s) for s in (seasons or saved_seasons(processed_dir)))
+        key = self.key(seasons, processed_dir, normalize)
+        cached = self.get(key)
+        if cached is not None:
+            print(f"[INFO] Feature store hit {key} ({len(cached)} rows)")
+            return cached
+        start = time.perf_counter()
+        features = load_features(processed_dir, seasons, normalize, raw_dir)
+        print(f"[INFO] Built features for {len(seasons)} seasons in {time.perf_counter() - start:.1f}s")
+        return self.put(key, features, {"seasons": seasons, "normalize": normalize})
+
+    # ---------- housekeeping ----------
+    def entries(self) -> List[Dict]:
+        """[{key, bytes, last_used, rows, seasons}] of complete entries, most recently used first."""
+        if not os.path.isdir(self.root):
+            return []
+        out = []
+        for name in os.listdir(self.root):
+            meta_path = os.path.join(self.root, name, META_NAME)
+            if ".tmp-" in name or not os.path.exists(meta_path):
+                continue
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            out.append({
+                "key": name, "bytes": _dir_size(os.path.join(self.root, name)),
+                "last_used": os.path.getmtime(meta_path),
+                "rows": meta.get("rows"), "seasons": meta.get("seasons"),
+            })
+        return sorted(out, key=lambda e: e["last_used"], reverse=True)
+
+    def evict(self, max_bytes: Optional[int] = None, keep: Optional[str] = None) -> List[str]:
+        """Remove least recently used entries until the store fits in max_bytes."""
+        budget = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(e["bytes"] for e in entries)
+        removed = []
+        for e in reversed(entries):  # oldest first
+            if total <= budget:
+                break
+            if e["key"] == keep:
+                continue
+            shutil.rmtree(self._path(e["key"]), ignore_errors=True)
+            total -= e["bytes"]
+            removed.append(e["key"])
+        if removed:
+            print(f"[INFO] Evicted {len(removed)} feature store entries")
+        return removed
+
+
+def _dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or prune the feature store")
+    parser.add_argument("--root", default=FEATURE_STORE_DIR)
+    parser.add_argument("--list", action="store_true", help="List cached feature matrices")
+    parser.add_argument("--max-mb", type=float, default=None, help="Evict down to this size")
+    args = parser.parse_args()
+    store = FeatureStore(args.root)
+    if args.max_mb is not None:
+        store.evict(int(args.max_mb * 2**20))
+    for e in store.entries() if args.list or args.max_mb is not None else []:
+        print(f"{e['key']}  {e['bytes'] / 2**20:8.1f} MB  {e['rows']:>9} rows  "
+              f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(e['last_used']))}  {','.join(e['seasons'] or [])}")
@@ -1,14 +1,30 @@
 """
 feature_utils.py
-Helper functions for geometry and time-based feature computation.
+Helper functions for geometry-based feature computation
+(clock parsing lives in src/data/game_clock.py).
+All helpers take scalars or array-likes (NumPy arrays / pandas Series) and are vectorized.
 """
 
-import math
+import numpy as np
+import pandas as pd
+
+# Goal line x-coordinate (the nets are at x = ±89 ft)
+NET_X = 89.0
+
+
+def _as_float(values):
+    if np.isscalar(values) or values is None:
+        return np.float64(np.nan if values is None else values)
+    return pd.to_numeric(pd.Series(values), errors="coerce").astype("float64").to_numpy()
+
 
 def compute_distance(x, y):
-    print("[Placeholder] Compute distance from net")
-    return math.sqrt(x**2 + y**2)
+    """Distance (ft) from (x, y) to the nearest net at (±89, 0)."""
+    x, y = _as_float(x), _as_float(y)
+    return np.hypot(NET_X - np.abs(x), y)
+
 
 def compute_angle(x, y):
-    print("[Placeholder] Compute shooting angle")
-    return None
+    """Shot angle (degrees) relative to the center line through the nearest net; 0 = straight on."""
+    x, y = _as_float(x), _as_float(y)
+    return np.degrees(np.arctan2(y, NET_X - np.abs(x)))
@@ -0,0 +1,120 @@
+"""
+src/features/tests/test_feature_engineering.py
+---------------------------------------
+Unit tests for the vectorized feature engine.
+pytest -q src/features/tests/test_feature_engineering.py
+"""
+
+import os, sys
+import numpy as np
+import pandas as pd
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.features.feature_engineering import build_features
+from src.data.game_clock import game_clock, mmss_to_seconds
+from src.features.feature_utils import compute_distance, compute_angle
+
+
+def test_geometry_helpers():
+    assert compute_distance(89, 0) == 0
+    np.testing.assert_allclose(compute_distance([-79, 59], [0, 40]), [10, 50])
+    np.testing.assert_allclose(compute_angle([79, 79], [10, -10]), [45, -45])
+    np.testing.assert_allclose(mmss_to_seconds(["02:14", "20:00", "5:30", None]), [134, 1200, 330, np.nan])
+
+
+def test_game_clock_overtime_and_shootout():
+    gids = [2022020001, 2022020001, 2022020001, 2022030111]
+    period_s, game_s, remaining = game_clock(
+        gids, [2, 4, 5, 5], ["REG", "OT", "SO", "OT"], ["05:00", "02:30", "00:00", "10:00"])
+    np.testing.assert_allclose(period_s, [300, 150, 0, 600])
+    # regular-season OT is 5 min; playoff OTs are full 20-min periods
+    np.testing.assert_allclose(game_s, [1500, 3750, 3900, 5400])
+    np.testing.assert_allclose(remaining, [900, 150, 0, 600])
+
+
+def test_build_features_previous_event():
+    """rebound 与上一事件特征按 (game_id, period) 分组计算，且保持输入行顺序"""
+    df = pd.DataFrame({
+        "game_id": [1, 1, 1, 2],
+        "period": [1, 1, 2, 1],
+        "event_id": [11, 10, 12, 20],
+        "event_type": ["goal", "shot-on-goal", "shot-on-goal", "shot-on-goal"],
+        "time_in_period": ["00:13", "00:10", "00:14", "05:00"],
+        "team_id": [5, 5, 5, 6],
+        "x": [80, 60, 70, 50],
+        "y": [0, 0, 5, 5],
+        "is_goal": [1, 0, 0, 0],
+    })
+    f = build_features(df)
+
+    assert list(f["event_id"]) == [11, 10, 12, 20]
+    # row 0 follows row 1 by 3 s and 20 ft: a rebound
+    assert f.loc[0, "time_since_last"] == 3
+    assert f.loc[0, "distance_from_last"] == 20
+    assert bool(f.loc[0, "rebound"])
+    assert f.loc[0, "speed"] == 20 / 3
+    # first event of a period / game has no previous event
+    assert np.isnan(f.loc[1, "time_since_last"])
+    assert np.isnan(f.loc[2, "time_since_last"]) and not f.loc[2, "rebound"]
+    assert f.loc[2, "game_seconds"] == 1200 + 14
+
+
+def test_build_features_from_all_events():
+    """with the all-events table, the previous event may be a non-shot play"""
+    events = pd.DataFrame({
+        "game_id": [1, 1, 1, 1],
+        "event_id": [5, 6, 7, 8],
+        "sort_order": [1, 2, 3, 4],
+        "event_type": ["faceoff", "shot-on-goal", "takeaway", "shot-on-goal"],
+        "period": [1, 1, 1, 1],
+        "time_in_period": ["00:00", "00:05", "00:20", "00:22"],
+        "team_id": [5, 5, 6, 5],
+        "x": [0, 70, 60, 80],
+        "y": [0, 0, 0, 0],
+        "zone_code": ["N", "O", "O", "O"],
+    })
+    shots = events[events["event_type"] == "shot-on-goal"].assign(is_goal=0).reset_index(drop=True)
+    f = build_features(shots, events)
+
+    assert list(f["prev_event_type"]) == ["faceoff", "takeaway"]
+    np.testing.assert_allclose(f["time_since_last"], [5, 2])
+    # takeaway by the other team in its offensive zone = the shooter's defensive zone
+    assert list(f["rush"]) == [False, True]
+    assert not f["rebound"].any()
+
+
+def test_previous_event_deltas_use_rink_coordinates():
+    """x_off / y_off 只用于 distance/angle；上一事件的距离按原始坐标计算"""
+    df = pd.DataFrame({
+        "game_id": [1, 1], "period": [1, 1], "event_id": [10, 11],
+        "event_type": ["shot-on-goal", "shot-on-goal"], "time_in_period": ["00:10", "00:14"],
+        "team_id": [5, 6], "x": [80, -80], "y": [10, -10], "is_goal": [0, 0],
+    })
+    # both teams shoot at the net they attack: the same offense coordinates
+    df["x_off"], df["y_off"] = [80.0, 80.0], [10.0, 10.0]
+    f = build_features(df)
+    np.testing.assert_allclose(f["distance"], compute_distance(80, 10))
+    np.testing.assert_allclose(f.loc[1, "distance_from_last"], np.hypot(160, 20))
+    np.testing.assert_allclose(f.loc[1, "speed"], np.hypot(160, 20) / 4)
+
+
+def test_load_features_keeps_both_teams(tmp_path):
+    """训练特征在每场比赛每节都保留两队的射门"""
+    from src.data.synthetic_games import write_synthetic_seasons
+    from src.data.tidy_data import tidy_all_games
+    from src.features.feature_engineering import load_features
+
+    raw_dir, processed = str(tmp_path / "raw"), str(tmp_path / "processed")
+    write_synthetic_seasons(raw_dir, seasons=1, games_per_season=6)
+    tidy = tidy_all_games(raw_dir, processed_dir=processed)
+    feats = load_features(processed, raw_dir=raw_dir)
+
+    assert len(feats) > 0.75 * len(tidy)  # only own-half shots are dropped
+    teams_tidy = tidy.groupby(["game_id", "period"], observed=True)["team_id"].nunique()
+    teams_feats = feats.groupby(["game_id", "period"], observed=True)["team_id"].nunique()
+    # a team may have taken only own-half shots in a period, but that is rare
+    both = teams_tidy[teams_tidy == 2].index
+    assert (teams_feats.reindex(both) == 2).mean() > 0.9
+    assert (feats["distance"] < 100).all()  # measured to the attacked net
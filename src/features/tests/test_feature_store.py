@@ -0,0 +1,64 @@
+"""
+src/features/tests/test_feature_store.py
+---------------------------------------
+Feature store: cache hits, invalidation on new tidy data, LRU eviction.
+pytest -q src/features/tests/test_feature_store.py
+"""
+
+import os, sys
+import numpy as np
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.data.synthetic_games import write_synthetic_seasons, synthetic_game
+from src.data.raw_store import open_store
+from src.data.tidy_data import tidy_all_games
+from src.features.feature_store import FeatureStore, input_hash
+
+
+def test_feature_store_roundtrip(tmp_path):
+    raw, processed = str(tmp_path / "raw"), str(tmp_path / "processed")
+    write_synthetic_seasons(raw, seasons=2, games_per_season=3, backend="sqlite", seed=1)
+    tidy_all_games(raw, processed_dir=processed, keep_events=True)
+    store = FeatureStore(str(tmp_path / "features"))
+
+    built = store.get_or_build(processed_dir=processed, raw_dir=raw)
+    assert isinstance(built.X, np.memmap)
+    assert built.X.shape == (len(built), len(built.columns))
+    hit = store.get_or_build(processed_dir=processed, raw_dir=raw)
+    assert hit.path == built.path
+    assert set(hit.frame()["season"]) == {20162017, 20172018}
+
+    # New game -> different input hash -> new entry
+    open_store(raw).put("2016020004", synthetic_game(2016020004, 1))
+    tidy_all_games(raw, processed_dir=processed, keep_events=True, incremental=True)
+    rebuilt = store.get_or_build(processed_dir=processed, raw_dir=raw)
+    assert rebuilt.path != built.path
+    assert len(rebuilt) > len(built)
+
+    # Over budget: oldest entries go first, the newest one is kept
+    store.max_bytes = 1
+    store.get_or_build(["20162017"], processed_dir=processed, raw_dir=raw)
+    assert len(store.entries()) == 1
+
+
+def test_csv_tidy_output_is_detected(tmp_path):
+    # 即使安装了 pyarrow，也要识别磁盘上实际保存的 CSV 格式
+    from src.data.tidy_store import saved_seasons
+    from src.features.feature_engineering import load_features
+
+    raw, processed = str(tmp_path / "raw"), str(tmp_path / "processed")
+    write_synthetic_seasons(raw, seasons=1, games_per_season=3, backend="sqlite", seed=1)
+    tidy = tidy_all_games(raw, processed_dir=processed, keep_events=True, output_format="csv")
+    assert saved_seasons(processed) == ["20162017"]
+    assert len(load_features(processed, raw_dir=raw)) > 0.75 * len(tidy)
+
+    digest = input_hash(processed, ["20162017"])
+    assert digest != input_hash(str(tmp_path / "missing"), ["20162017"])
+    fs = FeatureStore(str(tmp_path / "features")).get_or_build(processed_dir=processed, raw_dir=raw)
+    assert len(fs) > 0
+
+    open_store(raw).put("2016020004", synthetic_game(2016020004, 1))
+    tidy_all_games(raw, processed_dir=processed, keep_events=True, output_format="csv")
+    assert input_hash(processed, ["20162017"]) != digest
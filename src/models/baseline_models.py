@@ -1,8 +1,124 @@
 """
 baseline_models.py
 Baseline models such as Logistic Regression.
+
+train_logistic_regression accepts a features DataFrame, a cached FeatureSet
+(feature_store.py) or a processed_dir. Data that fits under IN_MEMORY_MAX_ROWS is fit
+with LogisticRegression in one go; anything larger is streamed in batches through
+SGDClassifier.partial_fit (log loss), so peak memory is one batch (or one season when
+reading the per-season tidy outputs), however many seasons there are.
 """
 
-def train_logistic_regression(df):
-    print("[Placeholder] Training logistic regression baseline model")
-    return None
+import time
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, StandardScaler
+
+from src.models.wandb_logger import timed_stage
+from src.utils.config import PROCESSED_DIR
+
+# Milestone 2 baseline: distance and angle to the net
+BASELINE_FEATURES = ["distance", "angle"]
+IN_MEMORY_MAX_ROWS = 2_000_000
+BATCH_SIZE = 65_536
+
+
+def _matrix(df: pd.DataFrame, columns: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    X = np.empty((len(df), len(columns)), dtype="float32")
+    for i, col in enumerate(columns):
+        X[:, i] = df[col].astype("float32").to_numpy()
+    return X, df["is_goal"].to_numpy(dtype="int8")
+
+
+def _num_rows(source) -> Optional[int]:
+    """Row count of an in-memory / memory-mapped source (None for a processed_dir)."""
+    return None if isinstance(source, str) else len(source)
+
+
+def iter_feature_batches(source, columns: Sequence[str], batch_size: int = BATCH_SIZE,
+                         seasons: Optional[List[str]] = None,
+                         rng: Optional[np.random.Generator] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Yield (X float32, y int8) batches from a DataFrame, a FeatureSet, or the per-season
+    tidy outputs under a processed_dir (features built one season at a time).
+    rng: shuffle the batch order (and rows within each season) — SGD needs mixed batches.
+    """
+    if isinstance(source, str):
+        from src.features.feature_engineering import iter_season_features
+        for _, df in iter_season_features(source, seasons):
+            if rng is not None:
+                df = df.iloc[rng.permutation(len(df))]
+            yield from iter_feature_batches(df, columns, batch_size)
+        return
+
+    n = len(source)
+    starts = np.arange(0, n, batch_size)
+    if rng is not None:
+        rng.shuffle(starts)
+    if isinstance(source, pd.DataFrame):
+        for s in starts:
+            yield _matrix(source.iloc[s:s + batch_size], columns)
+    else:  # FeatureSet: slice the memmaps
+        idx = [source.columns.index(c) for c in columns]
+        for s in starts:
+            yield np.asarray(source.X[s:s + batch_size, idx], dtype="float32"), np.asarray(source.y[s:s + batch_size])
+
+
+def _pipeline(scaler, clf, columns) -> Pipeline:
+    # NaN (e.g. no previous event) -> 0 before scaling
+    model = Pipeline([("fillna", FunctionTransformer(np.nan_to_num)), ("scale", scaler), ("clf", clf)])
+    model.feature_columns = list(columns)
+    return model
+
+
+@timed_stage("train_logistic_regression")
+def train_logistic_regression(data=None, columns: Sequence[str] = BASELINE_FEATURES,
+                              seasons: Optional[List[str]] = None, batch_size: int = BATCH_SIZE,
+                              epochs: int = 3, in_memory_max_rows: int = IN_MEMORY_MAX_ROWS,
+                              random_state: int = 0) -> Pipeline:
+    """
+    Fit the logistic-regression baseline on `columns` -> is_goal.
+    data: build_features DataFrame, FeatureSet, or a processed_dir (default PROCESSED_DIR).
+    Returns a Pipeline (NaN fill, scaler, classifier); model.feature_columns lists its inputs.
+    """
+    data = PROCESSED_DIR if data is None else data
+    columns = list(columns)
+    n = _num_rows(data)
+    start = time.perf_counter()
+
+    if n is not None and n <= in_memory_max_rows:
+        if isinstance(data, pd.DataFrame):
+            X, y = _matrix(data, columns)
+        else:
+            X, y = next(iter_feature_batches(data, columns, batch_size=max(n, 1)))
+        model = _pipeline(StandardScaler(), LogisticRegression(max_iter=1000), columns)
+        model.fit(X, y)
+        elapsed = time.perf_counter() - start
+        print(f"[INFO] Logistic regression (in memory): {n} rows in {elapsed:.2f}s "
+              f"({n / max(elapsed, 1e-9):,.0f} rows/sec)")
+        return model
+
+    # Out of core: one pass for the scaler, then `epochs` passes of partial_fit
+    scaler = StandardScaler()
+    for X, _ in iter_feature_batches(data, columns, batch_size, seasons):
+        scaler.partial_fit(np.nan_to_num(X))
+    clf = SGDClassifier(loss="log_loss", alpha=1e-5, average=True, random_state=random_state)
+    rng = np.random.default_rng(random_state)
+    rows = 0
+    for epoch in range(epochs):
+        t0, epoch_rows = time.perf_counter(), 0
+        for X, y in iter_feature_batches(data, columns, batch_size, seasons, rng):
+            clf.partial_fit(scaler.transform(np.nan_to_num(X)), y, classes=[0, 1])
+            epoch_rows += len(y)
+        rows += epoch_rows
+        dt = time.perf_counter() - t0
+        print(f"[INFO] SGD epoch {epoch + 1}/{epochs}: {epoch_rows} rows in {dt:.2f}s "
+              f"({epoch_rows / max(dt, 1e-9):,.0f} rows/sec)")
+    elapsed = time.perf_counter() - start
+    print(f"[INFO] Logistic regression (streaming): {rows} rows in {elapsed:.2f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/sec incl. scaler pass)")
+    return _pipeline(scaler, clf, columns)
@@ -1,8 +1,222 @@
 """
 evaluation.py
 Evaluate model performance (ROC, AUC, calibration curves).
+
+Predictions are never kept: each batch is folded into fixed-size probability histograms
+(StreamingEvaluator), and every curve is read off the histograms in one cumulative pass
+from the highest to the lowest probability bin:
+
+    ROC / AUC                       cumulative goals / non-goals above each threshold
+    calibration (reliability)       mean predicted vs observed goal rate per probability bin
+    goal rate by percentile         goals / shots within each model-percentile bucket
+    cumulative goals by percentile  share of all goals in the top k% of shots
+
+evaluate_model writes the result as a compact JSON summary, plus optional PNG plots.
 """
 
-def evaluate_model(model, df):
-    print("[Placeholder] Evaluating model performance")
-    return None
+import os
+import json
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.models.wandb_logger import timed_stage
+
+N_BINS = 10_000
+CALIBRATION_BINS = 10
+PERCENTILE_STEP = 5
+
+
+class StreamingEvaluator:
+    """Accumulates (y_true, y_prob) batches into per-bin counts; memory is O(n_bins)."""
+
+    def __init__(self, n_bins: int = N_BINS):
+        self.n_bins = n_bins
+        self.pos = np.zeros(n_bins, dtype="int64")
+        self.neg = np.zeros(n_bins, dtype="int64")
+        self.prob_sum = np.zeros(n_bins, dtype="float64")
+        self.logloss_sum = 0.0
+        self.brier_sum = 0.0
+
+    def update(self, y_true, y_prob) -> "StreamingEvaluator":
+        y = np.asarray(y_true).astype(bool)
+        p = np.clip(np.asarray(y_prob, dtype="float64"), 0.0, 1.0)
+        bins = np.minimum((p * self.n_bins).astype("int64"), self.n_bins - 1)
+        self.pos += np.bincount(bins[y], minlength=self.n_bins)
+        self.neg += np.bincount(bins[~y], minlength=self.n_bins)
+        self.prob_sum += np.bincount(bins, weights=p, minlength=self.n_bins)
+        pc = np.clip(p, 1e-7, 1 - 1e-7)
+        self.logloss_sum -= float(np.sum(np.where(y, np.log(pc), np.log(1 - pc))))
+        self.brier_sum += float(np.sum((p - y) ** 2))
+        return self
+
+    def merge(self, other: "StreamingEvaluator") -> "StreamingEvaluator":
+        """Combine evaluators built on disjoint data (e.g. one per season or worker)."""
+        self.pos += other.pos
+        self.neg += other.neg
+        self.prob_sum += other.prob_sum
+        self.logloss_sum += other.logloss_sum
+        self.brier_sum += other.brier_sum
+        return self
+
+    @property
+    def n(self) -> int:
+        return int(self.pos.sum() + self.neg.sum())
+
+    def curves(self, calibration_bins: int = CALIBRATION_BINS,
+               percentile_step: float = PERCENTILE_STEP) -> Dict[str, np.ndarray]:
+        """All curves as arrays (see module docstring)."""
+        # Descending-probability pass
+        pos, neg = self.pos[::-1], self.neg[::-1]
+        cum_pos = np.concatenate([[0], np.cumsum(pos)])
+        cum_neg = np.concatenate([[0], np.cumsum(neg)])
+        cum_n = cum_pos + cum_neg
+        P, N = max(cum_pos[-1], 1), max(cum_neg[-1], 1)
+        tpr, fpr = cum_pos / P, cum_neg / N
+
+        # Percentile buckets: position k% down the ranking, interpolated inside bins
+        edges = np.arange(0, 100 + 1e-9, percentile_step)
+        cum_goals = np.interp(edges / 100 * cum_n[-1], cum_n, cum_pos)
+        shots = np.diff(edges / 100 * cum_n[-1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            goal_rate = np.where(shots > 0, np.diff(cum_goals) / shots, np.nan)
+
+        # Calibration: fold the fine bins into calibration_bins equal-width bins
+        group = np.arange(self.n_bins) * calibration_bins // self.n_bins
+        cal_n = np.bincount(group, weights=self.pos + self.neg, minlength=calibration_bins)
+        cal_pos = np.bincount(group, weights=self.pos, minlength=calibration_bins)
+        cal_p = np.bincount(group, weights=self.prob_sum, minlength=calibration_bins)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cal_pred = np.where(cal_n > 0, cal_p / cal_n, np.nan)
+            cal_rate = np.where(cal_n > 0, cal_pos / cal_n, np.nan)
+
+        return {
+            "fpr": fpr, "tpr": tpr,
+            # x axis runs from the highest-probability shots (100) down to the lowest (0)
+            "percentile": 100 - edges[1:] + percentile_step / 2,
+            "goal_rate": goal_rate,
+            "cumulative_goals": cum_goals[1:] / P,
+            "cumulative_percentile": 100 - edges[1:],
+            "calibration_pred": cal_pred, "calibration_rate": cal_rate, "calibration_n": cal_n,
+        }
+
+    def auc(self) -> float:
+        # P(goal scores above non-goal): non-goals in lower bins count fully,
+        # those in the same bin count as ties (half credit) - the ROC trapezoid
+        neg_below = np.cumsum(self.neg) - self.neg
+        P, N = self.pos.sum(), self.neg.sum()
+        if P == 0 or N == 0:
+            return float("nan")
+        return float(np.sum(self.pos * (neg_below + self.neg / 2.0)) / (P * N))
+
+    def summary(self, calibration_bins: int = CALIBRATION_BINS, percentile_step: float = PERCENTILE_STEP,
+                roc_points: int = 101) -> Dict:
+        """Compact JSON-serializable metrics (curves rounded and ROC downsampled)."""
+        c = self.curves(calibration_bins, percentile_step)
+        n = max(self.n, 1)
+        # ROC at evenly spaced FPR values
+        grid = np.linspace(0, 1, roc_points)
+        roc_tpr = np.interp(grid, c["fpr"], c["tpr"])
+
+        def r(a, d=5):
+            return [None if np.isnan(v) else round(float(v), d) for v in np.asarray(a, dtype="float64")]
+
+        return {
+            "n": self.n,
+            "goals": int(self.pos.sum()),
+            "auc": round(self.auc(), 6),
+            "logloss": round(self.logloss_sum / n, 6),
+            "brier": round(self.brier_sum / n, 6),
+            "roc": {"fpr": r(grid, 3), "tpr": r(roc_tpr)},
+            "calibration": {"pred": r(c["calibration_pred"]), "rate": r(c["calibration_rate"]),
+                            "n": [int(v) for v in c["calibration_n"]]},
+            "goal_rate_by_percentile": {"percentile": r(c["percentile"], 2), "rate": r(c["goal_rate"])},
+            "cumulative_goals_by_percentile": {"percentile": r(c["cumulative_percentile"], 2),
+                                               "share": r(c["cumulative_goals"])},
+        }
+
+
+def predict_proba(model, X: np.ndarray) -> np.ndarray:
+    """Goal probability from a sklearn classifier/pipeline or an xgboost Booster."""
+    if hasattr(model, "predict_proba"):
+        return model.predict_proba(X)[:, 1]
+    return model.inplace_predict(X)
+
+
+def model_columns(model) -> Sequence[str]:
+    columns = getattr(model, "feature_columns", None) or getattr(model, "feature_names", None)
+    if not columns:
+        raise ValueError("[ERROR] Model does not record its feature columns")
+    return list(columns)
+
+
+def evaluate_batches(model, batches: Iterable[Tuple[np.ndarray, np.ndarray]],
+                     n_bins: int = N_BINS) -> StreamingEvaluator:
+    ev = StreamingEvaluator(n_bins)
+    for X, y in batches:
+        ev.update(y, predict_proba(model, X))
+    return ev
+
+
+def plot_curves(summary: Dict, out_dir: str, name: str = "model") -> Dict[str, str]:
+    """Write the four standard plots as PNGs (each figure is closed right after saving)."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {}
+    specs = {
+        "roc": (summary["roc"]["fpr"], summary["roc"]["tpr"], "False positive rate", "True positive rate",
+                f"ROC (AUC = {summary['auc']:.3f})"),
+        "goal_rate": (summary["goal_rate_by_percentile"]["percentile"], summary["goal_rate_by_percentile"]["rate"],
+                      "Shot probability model percentile", "Goal rate", "Goal rate by percentile"),
+        "cumulative_goals": (summary["cumulative_goals_by_percentile"]["percentile"],
+                             summary["cumulative_goals_by_percentile"]["share"],
+                             "Shot probability model percentile", "Cumulative share of goals",
+                             "Cumulative goals by percentile"),
+        "calibration": (summary["calibration"]["pred"], summary["calibration"]["rate"],
+                        "Mean predicted probability", "Observed goal rate", "Reliability diagram"),
+    }
+    for key, (x, y, xlabel, ylabel, title) in specs.items():
+        fig, ax = plt.subplots(figsize=(5, 4))
+        x = np.array(x, dtype="float64")
+        y = np.array(y, dtype="float64")
+        ax.plot(x, y, marker="o" if key == "calibration" else None, label=name)
+        if key in ("roc", "calibration"):
+            ax.plot([0, 1], [0, 1], "k--", linewidth=0.8)
+        if key in ("goal_rate", "cumulative_goals"):
+            ax.invert_xaxis()
+        ax.set(xlabel=xlabel, ylabel=ylabel, title=title)
+        ax.legend()
+        path = os.path.join(out_dir, f"{name}_{key}.png")
+        fig.savefig(path, dpi=100, bbox_inches="tight")
+        plt.close(fig)
+        paths[key] = path
+    return paths
+
+
+@timed_stage("evaluate_model")
+def evaluate_model(model, data, columns: Optional[Sequence[str]] = None, out_dir: Optional[str] = None,
+                   name: str = "model", plots: bool = False, batch_size: int = 262_144,
+                   seasons=None) -> Dict:
+    """
+    Stream predictions over `data` (features DataFrame, FeatureSet, or processed_dir) and
+    return the summary dict; with out_dir, also write <name>_metrics.json (and PNGs if plots).
+    """
+    from src.models.baseline_models import iter_feature_batches
+
+    columns = list(columns or model_columns(model))
+    ev = evaluate_batches(model, iter_feature_batches(data, columns, batch_size, seasons))
+    summary = ev.summary()
+    print(f"[INFO] {name}: n={summary['n']}  AUC={summary['auc']:.4f}  "
+          f"logloss={summary['logloss']:.4f}  brier={summary['brier']:.4f}")
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+        path = os.path.join(out_dir, f"{name}_metrics.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, separators=(",", ":"))
+        print(f"[INFO] Saved {path}")
+        if plots:
+            plot_curves(summary, out_dir, name)
+    return summary
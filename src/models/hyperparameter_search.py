@@ -0,0 +1,199 @@
+"""
+hyperparameter_search.py
+Parallel hyperparameter search (successive halving) over a cached feature matrix.
+
+Trials run in a process pool. Workers only receive the feature store entry's path
+and open its .npy files memory-mapped, so every process shares the same page-cache
+copy of the data instead of unpickling its own; each worker then builds its DMatrix
+once (advanced_models caches it) and reuses it for all of its trials.
+
+Every finished trial is appended to a JSONL file. Re-running with the same
+arguments skips trials that are already recorded, so an interrupted search resumes.
+
+    python -m src.models.hyperparameter_search --trials 27 --workers 4 --min-rounds 50 --max-rounds 1350
+"""
+
+import os
+import json
+import math
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.metrics import roc_auc_score
+
+from src.features.feature_store import FeatureStore
+from src.utils.config import SEARCH_DIR
+
+# param -> list (choice), (low, high) (uniform; ints if both ints), or (low, high, "log")
+XGB_SEARCH_SPACE = {
+    "max_depth": (3, 10),
+    "eta": (0.01, 0.3, "log"),
+    "subsample": (0.5, 1.0),
+    "colsample_bytree": (0.5, 1.0),
+    "min_child_weight": (1, 20),
+    "lambda": (1e-3, 10.0, "log"),
+}
+
+
+def sample_params(space: Dict, rng: np.random.Generator) -> Dict:
+    params = {}
+    for name, spec in space.items():
+        if isinstance(spec, list):
+            params[name] = spec[int(rng.integers(len(spec)))]
+        elif len(spec) == 3 and spec[2] == "log":
+            params[name] = float(math.exp(rng.uniform(math.log(spec[0]), math.log(spec[1]))))
+        elif isinstance(spec[0], int) and isinstance(spec[1], int):
+            params[name] = int(rng.integers(spec[0], spec[1] + 1))
+        else:
+            params[name] = float(rng.uniform(spec[0], spec[1]))
+    return params
+
+
+# +1: lower is better, -1: higher is better
+METRIC_SIGN = {"logloss": 1, "auc": -1}
+
+
+def rung_budgets(min_budget: int, max_budget: int, eta: int) -> List[int]:
+    """min_budget * eta**k for each rung below max_budget, then max_budget as the last rung."""
+    budgets = [min_budget]
+    while budgets[-1] * eta < max_budget:
+        budgets.append(budgets[-1] * eta)
+    if budgets[-1] < max_budget:
+        budgets.append(max_budget)
+    return budgets
+
+
+def rank_trials(trials: List[int], results: Dict[int, Dict], metric: str) -> List[int]:
+    """Trials best first by `metric` (in its METRIC_SIGN direction); trials without a value go last."""
+    sign = METRIC_SIGN[metric]
+    return sorted(trials, key=lambda t: (results[t][metric] is None, sign * (results[t][metric] or 0.0)))
+
+
+# =============================
+#  Worker side
+# =============================
+_WORKER_FS = None
+
+
+def _init_worker(feature_path: str):
+    global _WORKER_FS
+    _WORKER_FS = FeatureStore(os.path.dirname(feature_path)).get(os.path.basename(feature_path))
+
+
+def _xgb_objective(params: Dict, budget: int, valid_season, nthread: int) -> Dict:
+    from src.models.advanced_models import build_dmatrices, train_xgboost
+    booster = train_xgboost(_WORKER_FS, params=params, valid_season=valid_season, num_boost_round=budget,
+                            early_stopping_rounds=max(10, budget // 10), nthread=nthread)
+    _, dvalid = build_dmatrices(_WORKER_FS, valid_season=valid_season, nthread=nthread)
+    if dvalid is None:
+        raise ValueError("[ERROR] The search needs a held-out validation season")
+    y = dvalid.get_label()
+    p = np.clip(booster.predict(dvalid), 1e-7, 1 - 1e-7)
+    return {
+        "logloss": float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))),
+        "auc": float(roc_auc_score(y, p)) if 0 < y.sum() < len(y) else None,
+        "rounds": booster.num_boosted_rounds(),
+    }
+
+
+OBJECTIVES = {"xgboost": _xgb_objective}
+
+
+def _run_trial(model: str, trial: int, rung: int, budget: int, params: Dict,
+               valid_season, nthread: int) -> Dict:
+    start = time.perf_counter()
+    metrics = OBJECTIVES[model](params, budget, valid_season, nthread)
+    return {"model": model, "trial": trial, "rung": rung, "budget": budget, "params": params,
+            **metrics, "elapsed": round(time.perf_counter() - start, 3), "pid": os.getpid()}
+
+
+# =============================
+#  Driver
+# =============================
+def load_results(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _append_result(path: str, record: Dict):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        f.flush()
+
+
+def successive_halving(feature_set, n_trials: int = 27, min_budget: int = 50, max_budget: int = 1350,
+                       eta: int = 3, workers: Optional[int] = None, model: str = "xgboost",
+                       space: Optional[Dict] = None, valid_season="last", seed: int = 0,
+                       results_path: Optional[str] = None, metric: str = "logloss") -> Tuple[Dict, List[Dict]]:
+    """
+    Successive halving: all n_trials configurations run with min_budget boosting rounds,
+    the best 1/eta by `metric` ("logloss" or "auc") survive to the next rung with eta x the
+    budget; the last rung runs max_budget rounds.
+    feature_set: FeatureSet (its path is what workers receive).
+    Returns (best record of the last rung, all records).
+    """
+    if metric not in METRIC_SIGN:
+        raise ValueError(f"[ERROR] Unknown metric '{metric}' (expected one of {sorted(METRIC_SIGN)})")
+    workers = workers or os.cpu_count() or 1
+    nthread = max(1, (os.cpu_count() or 1) // workers)
+    space = space or XGB_SEARCH_SPACE
+    rng = np.random.default_rng(seed)
+    configs = [sample_params(space, rng) for _ in range(n_trials)]  # same seed -> same trials on resume
+    budgets = rung_budgets(min_budget, max_budget, eta)
+    if results_path is None:
+        os.makedirs(SEARCH_DIR, exist_ok=True)
+        results_path = os.path.join(SEARCH_DIR, f"{model}_{os.path.basename(feature_set.path)}_s{seed}.jsonl")
+
+    records = load_results(results_path)
+    done = {(r["trial"], r["rung"]): r for r in records
+            if r.get("model") == model and r["trial"] < n_trials and r["params"] == configs[r["trial"]]}
+    if done:
+        print(f"[INFO] Resuming search from {results_path} ({len(done)} trials recorded)")
+
+    survivors = list(range(n_trials))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(feature_set.path,)) as pool:
+        for rung, budget in enumerate(budgets):
+            todo = [t for t in survivors if (t, rung) not in done]
+            futures = [pool.submit(_run_trial, model, t, rung, budget, configs[t], valid_season, nthread)
+                       for t in todo]
+            for fut in as_completed(futures):
+                record = fut.result()
+                _append_result(results_path, record)
+                done[(record["trial"], rung)] = record
+                records.append(record)
+            scored = rank_trials(survivors, {t: done[(t, rung)] for t in survivors}, metric)
+            best = done[(scored[0], rung)]
+            value = "n/a" if best[metric] is None else f"{best[metric]:.4f}"
+            print(f"[INFO] Rung {rung}: {len(survivors)} trials x {budget} rounds, "
+                  f"best {metric}={value} (trial {best['trial']})")
+            survivors = scored[:max(1, len(scored) // eta)]
+
+    elapsed = time.perf_counter() - start
+    print(f"[INFO] Search finished in {elapsed:.1f}s ({len(done)} trial runs, workers={workers}); "
+          f"results in {results_path}")
+    return best, records
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Successive-halving hyperparameter search")
+    parser.add_argument("--model", choices=sorted(OBJECTIVES), default="xgboost")
+    parser.add_argument("--seasons", nargs="*", default=None)
+    parser.add_argument("--trials", type=int, default=27)
+    parser.add_argument("--min-rounds", type=int, default=50)
+    parser.add_argument("--max-rounds", type=int, default=1350)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None, help="Trial processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results", default=None, help="JSONL results file (resumed if it exists)")
+    args = parser.parse_args()
+    fs = FeatureStore().get_or_build(args.seasons)
+    best, _ = successive_halving(fs, args.trials, args.min_rounds, args.max_rounds, args.eta, args.workers,
+                                 args.model, seed=args.seed, results_path=args.results)
+    print(json.dumps(best, indent=2))
@@ -0,0 +1,228 @@
+"""
+model_registry.py
+Versioned model artifacts and a local registry, between models/* and serving/.
+
+    data/models/<name>/CURRENT                  promoted version ("v0003"), replaced atomically
+    data/models/<name>/v0003/manifest.json      type, feature schema, preprocessing, calibration, metrics
+    data/models/<name>/v0003/*.npy              weights / scaler / calibration arrays (memory-mapped on load)
+    data/models/<name>/v0003/booster.ubj        xgboost models only
+
+Logistic models are scored with plain NumPy, so loading one imports neither sklearn
+nor xgboost; xgboost is imported only when an xgboost artifact is loaded.
+
+    version = save_model(model, "xg-logreg", metrics=summary, promote_now=True)
+    handle = ModelHandle("xg-logreg")       # serving: cheap refresh() picks up promotions
+    p = handle.model.predict_proba(X)
+"""
+
+import os
+import json
+import time
+import shutil
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.config import MODEL_REGISTRY_DIR
+
+FORMAT_VERSION = 1
+CURRENT_NAME = "CURRENT"
+MANIFEST_NAME = "manifest.json"
+
+
+# =============================
+#  Loaded models (serving side)
+# =============================
+class LoadedModel:
+    """A registry artifact ready to score (n, len(feature_columns)) float arrays."""
+
+    def __init__(self, path: str, manifest: dict):
+        self.path = path
+        self.manifest = manifest
+        self.name = manifest["name"]
+        self.version = manifest["version"]
+        self.model_type = manifest["model_type"]
+        self.feature_columns: List[str] = manifest["feature_columns"]
+        cal = manifest.get("calibration")
+        self._cal = (self._array("calibration_x"), self._array("calibration_y")) if cal else None
+
+    def _array(self, name: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+
+    def _raw_proba(self, X: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Calibrated goal probability per row."""
+        X = np.asarray(X, dtype="float32")
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        p = self._raw_proba(X)
+        if self._cal is not None:
+            p = np.interp(p, self._cal[0], self._cal[1])
+        return p
+
+
+class LinearModel(LoadedModel):
+    """Logistic regression (LogisticRegression / SGDClassifier pipeline) in NumPy."""
+
+    def __init__(self, path: str, manifest: dict):
+        super().__init__(path, manifest)
+        self.mean, self.scale = self._array("scaler_mean"), self._array("scaler_scale")
+        self.coef, self.intercept = self._array("coef"), float(manifest["intercept"])
+
+    def _raw_proba(self, X: np.ndarray) -> np.ndarray:
+        z = ((np.nan_to_num(X) - self.mean) / self.scale) @ self.coef + self.intercept
+        return 1.0 / (1.0 + np.exp(-z))
+
+
+class XGBoostModel(LoadedModel):
+    def __init__(self, path: str, manifest: dict):
+        super().__init__(path, manifest)
+        import xgboost as xgb  # only xgboost artifacts pay this import
+        self.booster = xgb.Booster()
+        self.booster.load_model(os.path.join(path, "booster.ubj"))
+        self.booster.set_param({"nthread": manifest.get("nthread", 1)})
+
+    def _raw_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.booster.inplace_predict(X)
+
+
+MODEL_TYPES = {"linear": LinearModel, "xgboost": XGBoostModel}
+
+
+# =============================
+#  Saving
+# =============================
+def _export(model, out_dir: str) -> Tuple[str, List[str], dict]:
+    """Write the weights of a trained model; returns (model_type, feature_columns, manifest extras)."""
+    if hasattr(model, "named_steps"):  # baseline_models Pipeline: fillna -> scale -> clf
+        scaler, clf = model.named_steps["scale"], model.named_steps["clf"]
+        np.save(os.path.join(out_dir, "scaler_mean.npy"), scaler.mean_.astype("float32"))
+        np.save(os.path.join(out_dir, "scaler_scale.npy"), scaler.scale_.astype("float32"))
+        np.save(os.path.join(out_dir, "coef.npy"), clf.coef_[0].astype("float32"))
+        extras = {"intercept": float(clf.intercept_[0]), "estimator": type(clf).__name__,
+                  "preprocessing": {"fillna": 0.0, "standardize": True}}
+        return "linear", list(model.feature_columns), extras
+    if hasattr(model, "save_model") and hasattr(model, "feature_names"):  # xgboost Booster
+        model.save_model(os.path.join(out_dir, "booster.ubj"))
+        return "xgboost", list(model.feature_names or []), {"preprocessing": {"fillna": None}}
+    raise TypeError(f"[ERROR] Unsupported model type: {type(model).__name__}")
+
+
+def fit_calibration(y_prob, y_true) -> Tuple[np.ndarray, np.ndarray]:
+    """Isotonic calibration map as (x, y) knots, applied at serving time with np.interp."""
+    from sklearn.isotonic import IsotonicRegression
+    iso = IsotonicRegression(out_of_bounds="clip", y_min=0.0, y_max=1.0).fit(y_prob, y_true)
+    return iso.X_thresholds_.astype("float64"), iso.y_thresholds_.astype("float64")
+
+
+def _model_dir(name: str, registry_dir: str) -> str:
+    return os.path.join(registry_dir, name)
+
+
+def list_versions(name: str, registry_dir: str = MODEL_REGISTRY_DIR) -> List[str]:
+    root = _model_dir(name, registry_dir)
+    if not os.path.isdir(root):
+        return []
+    return sorted(d for d in os.listdir(root)
+                  if d.startswith("v") and os.path.exists(os.path.join(root, d, MANIFEST_NAME)))
+
+
+def save_model(model, name: str, registry_dir: str = MODEL_REGISTRY_DIR, metrics: Optional[Dict] = None,
+               calibration: Optional[Tuple[Sequence[float], Sequence[float]]] = None,
+               promote_now: bool = False, extra: Optional[Dict] = None) -> str:
+    """
+    Write `model` as the next version of `name` (atomically) and return the version.
+    calibration: (x, y) knots from fit_calibration, applied after the raw probability.
+    """
+    root = _model_dir(name, registry_dir)
+    os.makedirs(root, exist_ok=True)
+    existing = list_versions(name, registry_dir)
+    version = f"v{int(existing[-1][1:]) + 1 if existing else 1:04d}"
+    tmp = os.path.join(root, f".{version}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    model_type, columns, extras = _export(model, tmp)
+    if calibration is not None:
+        np.save(os.path.join(tmp, "calibration_x.npy"), np.asarray(calibration[0], dtype="float64"))
+        np.save(os.path.join(tmp, "calibration_y.npy"), np.asarray(calibration[1], dtype="float64"))
+    manifest = {
+        "format_version": FORMAT_VERSION, "name": name, "version": version, "model_type": model_type,
+        "feature_columns": columns, "calibration": "isotonic" if calibration is not None else None,
+        "metrics": metrics or {}, "created": time.time(), **extras, **(extra or {}),
+    }
+    with open(os.path.join(tmp, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, default=float)
+    os.replace(tmp, os.path.join(root, version))
+    print(f"[INFO] Saved model {name}:{version} ({model_type}, {len(columns)} features)")
+    if promote_now:
+        promote(name, version, registry_dir)
+    return version
+
+
+# =============================
+#  Registry
+# =============================
+def promote(name: str, version: str, registry_dir: str = MODEL_REGISTRY_DIR):
+    """Point CURRENT at `version` with an atomic rename (readers never see a partial file)."""
+    root = _model_dir(name, registry_dir)
+    if not os.path.exists(os.path.join(root, version, MANIFEST_NAME)):
+        raise FileNotFoundError(f"[ERROR] No such model version: {name}:{version}")
+    tmp = os.path.join(root, f".{CURRENT_NAME}.tmp-{os.getpid()}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(root, CURRENT_NAME))
+    print(f"[INFO] Promoted {name}:{version}")
+
+
+def current_version(name: str, registry_dir: str = MODEL_REGISTRY_DIR) -> Optional[str]:
+    path = os.path.join(_model_dir(name, registry_dir), CURRENT_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().strip() or None
+
+
+def load_model(name: str, version: Optional[str] = None, registry_dir: str = MODEL_REGISTRY_DIR) -> LoadedModel:
+    """Load `version` of `name` (the promoted one by default)."""
+    version = version or current_version(name, registry_dir)
+    if version is None:
+        raise FileNotFoundError(f"[ERROR] No promoted version of model {name}")
+    path = os.path.join(_model_dir(name, registry_dir), version)
+    with open(os.path.join(path, MANIFEST_NAME), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version", 0) > FORMAT_VERSION:
+        raise ValueError(f"[ERROR] {name}:{version} uses a newer artifact format")
+    return MODEL_TYPES[manifest["model_type"]](path, manifest)
+
+
+class ModelHandle:
+    """
+    Holds the promoted version of a model for a serving process.
+    refresh() is a cheap CURRENT check; a new version is loaded off to the side and
+    swapped in with one reference assignment, so requests never see a half-loaded model.
+    """
+
+    def __init__(self, name: str, registry_dir: str = MODEL_REGISTRY_DIR):
+        self.name = name
+        self.registry_dir = registry_dir
+        self._lock = threading.Lock()
+        self.model: Optional[LoadedModel] = None
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """Load the promoted version if it changed; True when a swap happened."""
+        version = current_version(self.name, self.registry_dir)
+        if version is None or (self.model is not None and self.model.version == version):
+            return False
+        with self._lock:
+            if self.model is not None and self.model.version == version:
+                return False
+            start = time.perf_counter()
+            model = load_model(self.name, version, self.registry_dir)
+            self.model = model
+        print(f"[INFO] Loaded {self.name}:{version} in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return True
@@ -0,0 +1,57 @@
+"""
+src/models/tests/test_advanced_models.py
+---------------------------------------
+XGBoost trainer on a cached FeatureSet: held-out season, early stopping, DMatrix cache.
+pytest -q src/models/tests/test_advanced_models.py
+"""
+
+import os, sys
+import numpy as np
+import pandas as pd
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.features.feature_engineering import FEATURE_COLUMNS
+from src.features.feature_store import FeatureStore
+from src.models.advanced_models import build_dmatrices, train_xgboost
+
+
+def _feature_set(tmp_path, n=4_000, seed=0, seasons=(20212022, 20222023)):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({c: rng.normal(size=n) for c in FEATURE_COLUMNS})
+    df["distance"] = rng.uniform(0, 90, n)
+    df["is_goal"] = (rng.random(n) < 1 / (1 + np.exp(0.1 * df["distance"] - 1))).astype("int8")
+    df["season"] = np.where(np.arange(n) < n * 3 // 4, seasons[0], seasons[-1])
+    df["game_id"] = 2021020001 + np.arange(n) // 50
+    return FeatureStore(str(tmp_path / "features")).put("test", df)
+
+
+def test_train_xgboost_early_stopping(tmp_path):
+    fs = _feature_set(tmp_path)
+    dtrain, dvalid = build_dmatrices(fs)
+    assert (dtrain.num_row(), dvalid.num_row()) == (3_000, 1_000)
+    assert build_dmatrices(fs)[0] is dtrain  # cached
+
+    booster = train_xgboost(fs, num_boost_round=300, early_stopping_rounds=10, nthread=1)
+    assert booster.num_boosted_rounds() < 300
+    assert booster.feature_names == FEATURE_COLUMNS
+    X = np.asarray(fs.X[:, :1], dtype="float32")
+    p = booster.inplace_predict(np.asarray(fs.X))
+    assert p[X[:, 0] < 10].mean() > p[X[:, 0] > 80].mean()
+
+
+def test_train_xgboost_single_season(tmp_path):
+    # 只有一个赛季时 "last" 不留验证集，直接训练（不早停）
+    fs = _feature_set(tmp_path, seasons=(20222023,))
+    dtrain, dvalid = build_dmatrices(fs)
+    assert dvalid is None and dtrain.num_row() == 4_000
+
+    booster = train_xgboost(fs, num_boost_round=20, early_stopping_rounds=5, nthread=1)
+    assert booster.num_boosted_rounds() == 20
+
+    try:
+        build_dmatrices(fs, valid_season=20222023)
+        assert False, "holding out the only season should raise"
+    except ValueError:
+        pass
@@ -0,0 +1,45 @@
+"""
+src/models/tests/test_baseline_models.py
+---------------------------------------
+In-memory and streaming (partial_fit) logistic regression give the same kind of model.
+pytest -q src/models/tests/test_baseline_models.py
+"""
+
+import os, sys
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.models.baseline_models import train_logistic_regression, iter_feature_batches
+
+
+def _shots(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    distance = rng.uniform(0, 90, n)
+    angle = rng.uniform(-80, 80, n)
+    p = 1 / (1 + np.exp(0.08 * distance - 1.5))
+    return pd.DataFrame({"distance": distance, "angle": angle,
+                         "is_goal": (rng.random(n) < p).astype("int8")})
+
+
+def test_in_memory_and_streaming_agree():
+    df = _shots()
+    fast = train_logistic_regression(df)
+    streamed = train_logistic_regression(df, in_memory_max_rows=0, batch_size=2_000, epochs=2)
+    X = df[["distance", "angle"]].to_numpy()
+    p_fast = fast.predict_proba(X)[:, 1]
+    p_stream = streamed.predict_proba(X)[:, 1]
+    # Goal probability falls with distance in both, and they rank shots equally well
+    assert fast.named_steps["clf"].coef_[0, 0] < 0
+    assert streamed.named_steps["clf"].coef_[0, 0] < 0
+    assert abs(roc_auc_score(df["is_goal"], p_fast) - roc_auc_score(df["is_goal"], p_stream)) < 0.01
+
+
+def test_batches_cover_all_rows_once():
+    df = _shots(n=1_001)
+    batches = list(iter_feature_batches(df, ["distance"], batch_size=100, rng=np.random.default_rng(1)))
+    assert sum(len(y) for _, y in batches) == 1_001
+    assert batches[0][0].dtype == np.float32
@@ -0,0 +1,51 @@
+"""
+src/models/tests/test_evaluation.py
+---------------------------------------
+Histogram-based streaming metrics match the exact (in-memory) ones.
+pytest -q src/models/tests/test_evaluation.py
+"""
+
+import os, sys, json
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score, log_loss
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.models.evaluation import StreamingEvaluator, evaluate_model
+from src.models.baseline_models import train_logistic_regression
+
+
+def test_streaming_matches_exact_metrics():
+    rng = np.random.default_rng(0)
+    p = rng.beta(1, 9, 200_000)
+    y = rng.random(len(p)) < p
+    ev = StreamingEvaluator()
+    for chunk in np.array_split(np.arange(len(p)), 7):
+        ev.update(y[chunk], p[chunk])
+    s = ev.summary()
+    assert abs(s["auc"] - roc_auc_score(y, p)) < 1e-4
+    assert abs(s["logloss"] - log_loss(y, p)) < 1e-5
+    # Top 5% of shots by probability
+    top = y[np.argsort(-p)][: len(p) // 20]
+    assert abs(s["goal_rate_by_percentile"]["rate"][0] - top.mean()) < 1e-3
+    assert abs(s["cumulative_goals_by_percentile"]["share"][0] - top.sum() / y.sum()) < 1e-3
+    assert s["cumulative_goals_by_percentile"]["share"][-1] == 1.0
+    # Well calibrated by construction
+    cal = [(a, b) for a, b in zip(s["calibration"]["pred"], s["calibration"]["rate"]) if a is not None]
+    assert all(abs(a - b) < 0.05 for a, b in cal[:4])
+
+
+def test_evaluate_model_writes_summary_and_plots(tmp_path):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({"distance": rng.uniform(0, 90, 5_000), "angle": rng.uniform(-80, 80, 5_000)})
+    df["is_goal"] = (rng.random(len(df)) < 1 / (1 + np.exp(0.08 * df["distance"]))).astype("int8")
+    model = train_logistic_regression(df)
+    summary = evaluate_model(model, df, out_dir=str(tmp_path), name="logreg", plots=True, batch_size=1_000)
+
+    assert summary["n"] == 5_000 and summary["auc"] > 0.6
+    with open(tmp_path / "logreg_metrics.json", encoding="utf-8") as f:
+        assert json.load(f)["goals"] == int(df["is_goal"].sum())
+    assert (tmp_path / "logreg_roc.png").exists()
+    assert (tmp_path / "logreg_calibration.png").exists()
@@ -0,0 +1,54 @@
+"""
+src/models/tests/test_hyperparameter_search.py
+---------------------------------------
+Successive halving in a process pool, with resumable JSONL results.
+pytest -q src/models/tests/test_hyperparameter_search.py
+"""
+
+import os, sys
+import numpy as np
+import pandas as pd
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.features.feature_engineering import FEATURE_COLUMNS
+from src.features.feature_store import FeatureStore
+from src.models.hyperparameter_search import load_results, rank_trials, rung_budgets, successive_halving
+
+
+def test_rung_budgets():
+    assert rung_budgets(50, 1350, 3) == [50, 150, 450, 1350]
+    assert rung_budgets(10, 50, 3) == [10, 30, 50]
+    assert rung_budgets(50, 50, 3) == [50]
+
+
+def test_rank_trials_direction():
+    # auc 越大越好，logloss 越小越好；没有 auc 的试验排在最后
+    results = {0: {"logloss": 0.30, "auc": 0.70}, 1: {"logloss": 0.25, "auc": None},
+               2: {"logloss": 0.28, "auc": 0.80}}
+    assert rank_trials([0, 1, 2], results, "logloss") == [1, 2, 0]
+    assert rank_trials([0, 1, 2], results, "auc") == [2, 0, 1]
+
+
+def test_successive_halving_resumes(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 2_000
+    df = pd.DataFrame({c: rng.normal(size=n) for c in FEATURE_COLUMNS})
+    df["is_goal"] = (df["distance"] + rng.normal(size=n) > 1.5).astype("int8")
+    df["season"] = np.where(np.arange(n) < 1_500, 20212022, 20222023)
+    fs = FeatureStore(str(tmp_path / "features")).put("hp", df)
+    results = str(tmp_path / "search.jsonl")
+
+    best, records = successive_halving(fs, n_trials=4, min_budget=5, max_budget=20, eta=2,
+                                       workers=2, results_path=results)
+    assert [r["rung"] for r in records].count(0) == 4
+    assert [r["rung"] for r in records].count(2) == 1
+    assert best["rung"] == 2 and best["auc"] > 0.7
+    assert len(load_results(results)) == 4 + 2 + 1
+
+    # Second run finds every trial in the results file and trains nothing
+    best_again, _ = successive_halving(fs, n_trials=4, min_budget=5, max_budget=20, eta=2,
+                                       workers=2, results_path=results)
+    assert len(load_results(results)) == 7
+    assert best_again == best
@@ -0,0 +1,58 @@
+"""
+src/models/tests/test_model_registry.py
+---------------------------------------
+Model artifacts: round trip without sklearn at load time, calibration, atomic promote + hot-swap.
+pytest -q src/models/tests/test_model_registry.py
+"""
+
+import os, sys
+import numpy as np
+import pandas as pd
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.models.baseline_models import train_logistic_regression
+from src.models.model_registry import (ModelHandle, fit_calibration, list_versions, load_model, promote,
+                                       save_model)
+
+
+def _frame(n=3_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"distance": rng.uniform(0, 90, n), "angle": rng.uniform(-90, 90, n)})
+    df["is_goal"] = (rng.random(n) < 1 / (1 + np.exp(0.08 * df["distance"]))).astype("int8")
+    df.loc[:10, "angle"] = np.nan
+    return df
+
+
+def test_linear_round_trip(tmp_path):
+    df = _frame()
+    model = train_logistic_regression(df)
+    registry = str(tmp_path / "models")
+    version = save_model(model, "logreg", registry, metrics={"auc": 0.7})
+    assert version == "v0001" and list_versions("logreg", registry) == ["v0001"]
+
+    loaded = load_model("logreg", version, registry)
+    assert loaded.feature_columns == ["distance", "angle"]
+    assert isinstance(loaded.coef, np.memmap)
+    X = df[loaded.feature_columns].to_numpy("float32")
+    np.testing.assert_allclose(loaded.predict_proba(X), model.predict_proba(X)[:, 1], atol=1e-5)
+
+
+def test_calibration_and_hot_swap(tmp_path):
+    df = _frame()
+    registry = str(tmp_path / "models")
+    model = train_logistic_regression(df)
+    X = df[["distance", "angle"]].to_numpy("float32")
+    save_model(model, "logreg", registry, promote_now=True)
+    handle = ModelHandle("logreg", registry)
+    assert handle.model.version == "v0001" and not handle.refresh()
+
+    cal = fit_calibration(model.predict_proba(X)[:, 1], df["is_goal"].to_numpy())
+    v2 = save_model(model, "logreg", registry, calibration=cal)
+    assert handle.refresh() is False  # saved but not promoted yet
+    promote("logreg", v2, registry)
+    assert handle.refresh() and handle.model.version == "v0002"
+    p = handle.model.predict_proba(X)
+    assert abs(p.mean() - df["is_goal"].mean()) < 1e-3  # isotonic is calibrated in-sample
+    assert not [f for f in os.listdir(os.path.join(registry, "logreg")) if f.startswith(".")]
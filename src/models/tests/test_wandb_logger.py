@@ -0,0 +1,48 @@
+"""
+src/models/tests/test_wandb_logger.py
+---------------------------------------
+Buffered local (offline) experiment logging and stage timing.
+pytest -q src/models/tests/test_wandb_logger.py
+"""
+
+import os, sys, json, time
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.models.wandb_logger import init_wandb, active_logger, timed_stage
+
+
+@timed_stage("toy_training")
+def _toy_training():
+    time.sleep(0.01)
+    return 42
+
+
+def test_local_logger_buffers_and_times_stages(tmp_path):
+    artifact = tmp_path / "model.json"
+    artifact.write_text("{}", encoding="utf-8")
+    logger = init_wandb("test-project", run_name="r1", mode="local", log_dir=str(tmp_path),
+                        flush_every=1000, flush_interval_s=60)
+    assert active_logger() is logger
+
+    start = time.perf_counter()
+    for step in range(500):
+        logger.log({"loss": 1.0 / (step + 1)}, step=step)
+    assert time.perf_counter() - start < 0.5  # producers never wait on I/O
+    assert _toy_training() == 42
+    logger.log_artifact(str(artifact))
+    logger.flush()
+
+    run_dir = tmp_path / "test-project" / "r1"
+    lines = [json.loads(l) for l in (run_dir / "metrics.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 501
+    assert lines[-1]["timing/toy_training_wall_s"] >= 0.01
+    assert (run_dir / "artifacts" / "model.json").exists()
+
+    logger.finish()
+    assert active_logger() is None
+    logger.log({"ignored": 1})  # after finish: dropped, no error
+    start = time.perf_counter()
+    logger.flush()  # after finish: returns at once (the writer thread is gone)
+    assert time.perf_counter() - start < 0.5
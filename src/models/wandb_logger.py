@@ -1,8 +1,240 @@
 """
 wandb_logger.py
 Handles experiment tracking with Weights & Biases.
+
+ExperimentLogger is a non-blocking facade: log() / log_artifact() only put the record
+on a queue; a background thread batches the records and flushes them every
+FLUSH_EVERY records or FLUSH_INTERVAL_S seconds. Every record is also written to a
+local JSONL file, which is the whole backend in "local" mode (training nodes have
+no network; wandb may not even be installed).
+
+    logger = init_wandb("nhl-xg", config={"model": "xgboost"})
+    with logger.stage("features"):          # logs timing/features_* (wall, cpu, peak RSS)
+        fs = FeatureStore().get_or_build()
+    logger.log({"valid/auc": 0.76}, step=1)
+    logger.finish()
+
+Modes: "online" / "offline" (wandb's own offline mode), "local" (JSONL only),
+"disabled", or "auto" (online if wandb is installed and WANDB_API_KEY is set, else local).
 """
 
-def init_wandb(project_name):
-    print(f"[Placeholder] Initializing WandB project: {project_name}")
-    return None
+import os
+import json
+import time
+import queue
+import shutil
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import wandb
+except ImportError:
+    wandb = None
+
+from src.utils.config import EXPERIMENT_LOG_DIR
+
+FLUSH_EVERY = 50
+FLUSH_INTERVAL_S = 5.0
+
+_ACTIVE: Optional["ExperimentLogger"] = None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _resolve_mode(mode: str) -> str:
+    if mode == "auto":
+        return "online" if wandb is not None and os.environ.get("WANDB_API_KEY") else "local"
+    if mode in ("online", "offline") and wandb is None:
+        print(f"[WARN] wandb is not installed, logging locally instead of mode={mode}")
+        return "local"
+    return mode
+
+
+class ExperimentLogger:
+    def __init__(self, project: str, run_name: Optional[str] = None, config: Optional[Dict] = None,
+                 mode: str = "auto", log_dir: str = EXPERIMENT_LOG_DIR,
+                 flush_every: int = FLUSH_EVERY, flush_interval_s: float = FLUSH_INTERVAL_S):
+        self.project = project
+        self.mode = _resolve_mode(mode)
+        self.run_name = run_name or time.strftime("run-%Y%m%d-%H%M%S")
+        self.flush_every = flush_every
+        self.flush_interval_s = flush_interval_s
+        self.run_dir = os.path.join(log_dir, project, self.run_name)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._step = 0
+        self._run = None
+        self._closed = False
+        self._pid = os.getpid()
+        if self.mode == "disabled":
+            return
+
+        os.makedirs(self.run_dir, exist_ok=True)
+        with open(os.path.join(self.run_dir, "config.json"), "w", encoding="utf-8") as f:
+            json.dump({"project": project, "run": self.run_name, "mode": self.mode, "config": config or {}},
+                      f, indent=1, default=str)
+        if self.mode in ("online", "offline"):
+            self._run = wandb.init(project=project, name=self.run_name, config=config or {}, mode=self.mode,
+                                   dir=self.run_dir)
+        self._metrics_file = open(os.path.join(self.run_dir, "metrics.jsonl"), "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._worker, name="experiment-logger", daemon=True)
+        self._thread.start()
+
+    # ---------- producer side (called from training code, never blocks) ----------
+    def log(self, metrics: Dict, step: Optional[int] = None):
+        if self.mode == "disabled" or self._closed:
+            return
+        if step is None:
+            step = self._step
+        self._step = max(self._step, step) + 1
+        self._queue.put(("metrics", {"_step": step, "_time": time.time(), **metrics}))
+
+    def log_artifact(self, path: str, name: Optional[str] = None, type: str = "model"):
+        """Copy a file/directory into the run (and upload it as a wandb artifact when online)."""
+        if self.mode == "disabled" or self._closed:
+            return
+        self._queue.put(("artifact", {"path": path, "name": name or os.path.basename(path), "type": type}))
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a pipeline stage; logs timing/<name>_wall_s, _cpu_s and peak RSS."""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            metrics = {
+                f"timing/{name}_wall_s": round(time.perf_counter() - wall, 4),
+                f"timing/{name}_cpu_s": round(time.process_time() - cpu, 4),
+            }
+            rss = _peak_rss_mb()
+            if rss is not None:
+                metrics[f"timing/{name}_peak_rss_mb"] = round(rss, 1)
+            self.log(metrics)
+
+    def flush(self, timeout: Optional[float] = None):
+        """Block until everything logged so far has been written (no-op after finish())."""
+        if self.mode == "disabled" or self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        done.wait(timeout)
+
+    def finish(self):
+        global _ACTIVE
+        if self.mode == "disabled" or self._closed:
+            return
+        self._closed = True
+        self._queue.put(("stop", None))
+        self._thread.join()
+        self._metrics_file.close()
+        if self._run is not None:
+            self._run.finish()
+        if _ACTIVE is self:
+            _ACTIVE = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.finish()
+
+    # ---------- background thread ----------
+    def _write(self, metrics, artifacts):
+        if metrics:
+            self._metrics_file.write("".join(json.dumps(m, separators=(",", ":"), default=float) + "\n"
+                                             for m in metrics))
+            self._metrics_file.flush()
+            if self._run is not None:
+                for m in metrics:
+                    self._run.log({k: v for k, v in m.items() if not k.startswith("_")}, step=m["_step"])
+        for a in artifacts:
+            dest = os.path.join(self.run_dir, "artifacts", a["name"])
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            if os.path.isdir(a["path"]):
+                shutil.copytree(a["path"], dest, dirs_exist_ok=True)
+            else:
+                shutil.copy2(a["path"], dest)
+            if self._run is not None:
+                art = wandb.Artifact(a["name"], type=a["type"])
+                if os.path.isdir(dest):
+                    art.add_dir(dest)
+                else:
+                    art.add_file(dest)
+                self._run.log_artifact(art)
+
+    def _worker(self):
+        metrics, artifacts, events = [], [], []
+        deadline = time.monotonic() + self.flush_interval_s
+        stop = False
+        while not stop:
+            try:
+                kind, item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if kind == "metrics":
+                    metrics.append(item)
+                elif kind == "artifact":
+                    artifacts.append(item)
+                elif kind == "flush":
+                    events.append(item)
+                else:
+                    stop = True
+            except queue.Empty:
+                pass
+            if stop or events or len(metrics) >= self.flush_every or time.monotonic() >= deadline:
+                try:
+                    self._write(metrics, artifacts)
+                except Exception as e:  # logging must never take the training run down
+                    print(f"[WARN] Experiment logger flush failed: {e}")
+                metrics, artifacts = [], []
+                for ev in events:
+                    ev.set()
+                events = []
+                deadline = time.monotonic() + self.flush_interval_s
+
+
+def init_wandb(project_name, run_name: Optional[str] = None, config: Optional[Dict] = None,
+               mode: str = "auto", **kwargs) -> ExperimentLogger:
+    """Create the run's logger and make it the active one (see active_logger / log_stage)."""
+    global _ACTIVE
+    _ACTIVE = ExperimentLogger(project_name, run_name, config, mode, **kwargs)
+    print(f"[INFO] Experiment logging: project={project_name} run={_ACTIVE.run_name} mode={_ACTIVE.mode}")
+    return _ACTIVE
+
+
+def active_logger() -> Optional[ExperimentLogger]:
+    """The logger created by init_wandb in this process (forked workers get None)."""
+    if _ACTIVE is None or _ACTIVE._pid != os.getpid():
+        return None
+    return _ACTIVE
+
+
+@contextmanager
+def log_stage(name: str):
+    """Time a pipeline stage into the active logger (no-op when none is active)."""
+    logger = active_logger()
+    if logger is None:
+        yield
+        return
+    with logger.stage(name):
+        yield
+
+
+def timed_stage(name: str):
+    """Decorator form of log_stage, for pipeline entry points."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with log_stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -2,8 +2,215 @@
 flask_app.py
 Flask API for model serving.
 Milestone 3 - Serving
+
+POST /predict takes a batch of shots and scores them with one vectorized predict_proba
+call. The body goes straight from bytes to a float32 (n_shots, n_features) matrix in the
+model's feature order, without building a DataFrame:
+
+    application/json                      columnar: {"distance": [...], "angle": [...]}
+                                          (or the same mapping under "columns")
+    application/vnd.apache.arrow.stream   Arrow IPC stream with one column per feature
+
+Bodies may be gzip-compressed (Content-Encoding: gzip).
+
+The response is {"model", "version", "n", "goal_probability": [...]} as JSON, or an Arrow
+stream with a goal_probability column when the request's Accept header asks for Arrow.
+
+Small requests from concurrent clients are coalesced by a MicroBatcher into one model
+call (see micro_batcher.py); GET /metrics reports its queue depth and batch sizes.
+
+GET /model describes the loaded model; promoted versions are picked up automatically.
+
+    python -m src.serving.flask_app --model logreg_baseline --port 5000
 """
 
-def start_server():
-    print("[Placeholder] Starting Flask model serving app")
-    return None
+import gzip
+import time
+import argparse
+import threading
+from typing import Dict, Sequence
+
+import numpy as np
+from flask import Flask, Response, request
+
+try:
+    import orjson  # serializes numpy arrays directly
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # JSON-only service
+    pa = None
+
+from src.models.model_registry import ModelHandle
+from src.serving.micro_batcher import MicroBatcher, QueueFull
+from src.utils.config import (MODEL_REGISTRY_DIR, SERVING_BATCH_WINDOW_MS, SERVING_HOST, SERVING_MAX_BATCH_ROWS,
+                              SERVING_MODEL, SERVING_PORT)
+
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+MODEL_REFRESH_S = 2.0
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# =============================
+#  Request / response encoding
+# =============================
+def _loads(body: bytes):
+    if orjson is not None:
+        return orjson.loads(body)
+    import json
+    return json.loads(body)
+
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    import json
+    return json.dumps(obj, default=lambda a: a.tolist()).encode("utf-8")
+
+
+def _from_columns(columns: Dict, feature_columns: Sequence[str]) -> np.ndarray:
+    missing = [c for c in feature_columns if c not in columns]
+    if missing:
+        raise BadRequest(f"missing feature columns: {missing}")
+    n = len(columns[feature_columns[0]]) if feature_columns else 0
+    X = np.empty((n, len(feature_columns)), dtype="float32")
+    for j, c in enumerate(feature_columns):
+        values = columns[c]
+        if len(values) != n:
+            raise BadRequest(f"column {c!r} has {len(values)} values, expected {n}")
+        X[:, j] = values if isinstance(values, np.ndarray) else np.asarray(values, dtype="float32")
+    return X
+
+
+def parse_features(body: bytes, content_type: str, feature_columns: Sequence[str]) -> np.ndarray:
+    """Request body -> float32 (n, len(feature_columns)); null / missing values become NaN."""
+    if ARROW_MIME in (content_type or ""):
+        if pa is None:
+            raise BadRequest("Arrow requests need pyarrow on the server")
+        try:
+            table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+            names = set(table.column_names)
+            cols = {c: table.column(c).to_numpy(zero_copy_only=False).astype("float32", copy=False)
+                    for c in feature_columns if c in names}
+        except (pa.ArrowException, TypeError, ValueError) as e:  # corrupt stream / non-numeric column
+            raise BadRequest(f"invalid Arrow body: {e}")
+        return _from_columns(cols, feature_columns)
+    try:
+        payload = _loads(body)
+    except ValueError as e:
+        raise BadRequest(f"invalid JSON body: {e}")
+    if not isinstance(payload, dict):
+        raise BadRequest("expected a columnar JSON object {feature: [values, ...]}")
+    try:
+        return _from_columns(payload.get("columns", payload), feature_columns)
+    except BadRequest:
+        raise
+    except (TypeError, ValueError) as e:  # non-numeric values
+        raise BadRequest(f"non-numeric feature values: {e}")
+
+
+def encode_predictions(p: np.ndarray, model, accept: str):
+    """(body, mimetype) for a predictions array."""
+    if ARROW_MIME in (accept or "") and pa is not None:
+        sink = pa.BufferOutputStream()
+        table = pa.table({"goal_probability": np.asarray(p, dtype="float32")})
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes(), ARROW_MIME
+    body = _dumps({"model": model.name, "version": model.version, "n": int(len(p)),
+                   "goal_probability": np.ascontiguousarray(p, dtype="float64")})
+    return body, "application/json"
+
+
+# =============================
+#  App
+# =============================
+def _error(status: int, message: str) -> Response:
+    return Response(_dumps({"error": message}), status=status, mimetype="application/json")
+
+
+def create_app(model_name: str = SERVING_MODEL, registry_dir: str = MODEL_REGISTRY_DIR,
+               refresh_s: float = MODEL_REFRESH_S, batch_window_ms: float = SERVING_BATCH_WINDOW_MS,
+               max_batch_rows: int = SERVING_MAX_BATCH_ROWS) -> Flask:
+    app = Flask(__name__)
+    handle = ModelHandle(model_name, registry_dir)
+    batcher = MicroBatcher(batch_window_ms, max_batch_rows) if batch_window_ms > 0 else None
+    last_check = [time.monotonic()]
+    check_lock = threading.Lock()
+    app.config["MODEL_HANDLE"] = handle
+    app.config["MICRO_BATCHER"] = batcher
+
+    def current_model():
+        # at most one CURRENT check every refresh_s; the swap itself happens in ModelHandle
+        now = time.monotonic()
+        if now - last_check[0] >= refresh_s and check_lock.acquire(blocking=False):
+            try:
+                last_check[0] = now
+                handle.refresh()
+            except Exception as e:  # keep serving the loaded version
+                print(f"[WARN] Model refresh failed: {e}")
+            finally:
+                check_lock.release()
+        return handle.model
+
+    @app.post("/predict")
+    def predict():
+        model = current_model()
+        if model is None:
+            return _error(503, f"no promoted version of model {model_name}")
+        try:
+            body = request.get_data(cache=False)
+            if request.content_encoding == "gzip":
+                body = gzip.decompress(body)
+            X = parse_features(body, request.content_type, model.feature_columns)
+        except (BadRequest, OSError, EOFError) as e:  # OSError / EOFError: corrupt gzip body
+            return _error(400, str(e))
+        if not len(X):
+            p = np.empty(0, dtype="float32")
+        elif batcher is not None and len(X) < max_batch_rows:  # large batches are already efficient
+            try:
+                p = batcher.predict(X, model)
+            except QueueFull as e:
+                return _error(503, f"overloaded: {e}")
+        else:
+            p = model.predict_proba(X)
+        body, mimetype = encode_predictions(p, model, request.headers.get("Accept", ""))
+        return Response(body, mimetype=mimetype)
+
+    @app.get("/model")
+    def model_info():
+        model = current_model()
+        if model is None:
+            return _error(503, f"no promoted version of model {model_name}")
+        info = {k: model.manifest.get(k) for k in ("name", "version", "model_type", "feature_columns",
+                                                   "calibration", "metrics", "created")}
+        return Response(_dumps(info), mimetype="application/json")
+
+    @app.get("/metrics")
+    def metrics():
+        return Response(_dumps({"micro_batcher": batcher.stats() if batcher is not None else None}),
+                        mimetype="application/json")
+
+    return app
+
+
+def start_server(host: str = SERVING_HOST, port: int = SERVING_PORT, model_name: str = SERVING_MODEL,
+                 registry_dir: str = MODEL_REGISTRY_DIR):
+    app = create_app(model_name, registry_dir)
+    print(f"[INFO] Serving {model_name} on http://{host}:{port}")
+    app.run(host=host, port=port, threaded=True)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="xG model service")
+    parser.add_argument("--model", default=SERVING_MODEL)
+    parser.add_argument("--host", default=SERVING_HOST)
+    parser.add_argument("--port", type=int, default=SERVING_PORT)
+    args = parser.parse_args()
+    start_server(args.host, args.port, args.model)
@@ -1,8 +1,168 @@
 """
 game_client.py
 Client to fetch and stream live NHL game data for prediction.
+
+LiveGameTracker keeps a small state per game: the sortOrder of the last processed
+play (the cursor), the last play itself (previous-event features of the next shot
+need it), and running xG totals per team. Each poll still downloads the whole
+play-by-play document, but only the plays after the cursor are parsed, featurized
+and sent to the model; the cursor is found by binary search over the (sortOrder-
+sorted) plays list, so the work per poll is O(new events), not O(game length).
+
+Features come from feature_engineering.build_features on the [previous play + new
+plays] slice, i.e. the same definitions as the all-events training path. Shots are
+put in the shooting team's attacking frame first, as in training: the home team's
+defending side per period (collected from the plays as they arrive) and the home team
+id feed normalize_coords.attacking_coordinates, which drops only shots from the
+shooter's own half.
+
+    tracker = LiveGameTracker(model=load_model("logreg_baseline"))
+    new_shots = tracker.poll("2023020204")      # DataFrame of shots since the last poll, with xg
+    tracker.state("2023020204").team_xg         # {team_id: cumulative xG}
 """
 
-def ping_game(game_id):
-    print(f"[Placeholder] Fetching new events for game {game_id}")
-    return None
+import time
+import bisect
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data.event_stream import SHOT_TYPES, project
+from src.data.game_index import DEFAULT_SIDES, PERIOD_COLUMNS, play_sides
+from src.data.nhl_api_client import NHLDataClient
+from src.data.normalize_coords import attacking_coordinates
+from src.data.tidy_data import EVENT_COLUMNS, EVENT_FIELDS, add_game_clock
+from src.features.feature_engineering import FEATURE_COLUMNS, build_features
+
+FINAL_STATES = frozenset({"OFF", "FINAL"})
+
+LIVE_COLUMNS = ["game_id", "event_id", "sort_order", "event_type", "period", "time_in_period",
+                "team_id", "x", "y", "is_goal"]
+
+
+def _sort_key(play: dict) -> int:
+    order = play.get("sortOrder")
+    return -1 if order is None else int(order)
+
+
+class GameState:
+    """Per-game tracking state (everything a poll needs to process only the new plays)."""
+
+    def __init__(self, game_id: str):
+        self.game_id = str(game_id)
+        self.cursor = -1                 # sortOrder of the last processed play
+        self.prev: Optional[tuple] = None  # that play, as an EVENT_COLUMNS row
+        self.game_state: Optional[str] = None
+        self.home_id: Optional[int] = None
+        self.sides: Dict[int, str] = {}   # period -> home team defending side
+        self.events = 0
+        self.shots = 0
+        self.team_xg: Dict[int, float] = {}
+        self.polls = 0
+        self.last_poll: Optional[float] = None
+
+    @property
+    def final(self) -> bool:
+        return self.game_state in FINAL_STATES
+
+
+class LiveGameTracker:
+    def __init__(self, client: Optional[NHLDataClient] = None, model=None):
+        """
+        model: anything with feature_columns and predict_proba(X) -> goal probabilities
+               (a registry LoadedModel, or the serving client). None = features only.
+        """
+        self.client = client
+        self.model = model
+        self.games: Dict[str, GameState] = {}
+
+    def state(self, game_id: str) -> GameState:
+        game_id = str(game_id)
+        if game_id not in self.games:
+            self.games[game_id] = GameState(game_id)
+        return self.games[game_id]
+
+    def reset(self, game_id: str):
+        self.games.pop(str(game_id), None)
+
+    # ---------- polling ----------
+    def poll(self, game_id: str) -> pd.DataFrame:
+        """Fetch the game and process the plays added since the previous poll."""
+        if self.client is None:
+            self.client = NHLDataClient(rate_limit_s=0)
+        game = self.client.fetch_live(str(game_id))
+        if game is None:
+            print(f"[WARN] Could not fetch live game {game_id}")
+            return self._empty()
+        return self.update(game)
+
+    def update(self, game: dict) -> pd.DataFrame:
+        """Process an already-fetched play-by-play document; returns the new shots (with xg)."""
+        st = self.state(game.get("id"))
+        st.polls += 1
+        st.last_poll = time.time()
+        st.game_state = game.get("gameState", st.game_state)
+        plays = game.get("plays") or []
+        start = bisect.bisect_right(plays, st.cursor, key=_sort_key)
+        if start >= len(plays):
+            return self._empty()
+
+        st.home_id = (game.get("homeTeam") or {}).get("id", st.home_id)
+        for period, side in play_sides(plays[start:]).items():
+            st.sides.setdefault(period, side)
+
+        gid = int(st.game_id)
+        rows = [(gid,) + row for row in project(plays[start:], EVENT_FIELDS)]
+        carried = [st.prev] if st.prev is not None else []
+        events = add_game_clock(pd.DataFrame(carried + rows, columns=EVENT_COLUMNS))
+        st.prev = rows[-1]
+        st.cursor = _sort_key(plays[-1])
+        st.events += len(rows)
+        return self._score(st, events, len(carried))
+
+    # ---------- features / model ----------
+    def _score(self, st: GameState, events: pd.DataFrame, n_carried: int) -> pd.DataFrame:
+        # the first n_carried rows were processed by an earlier poll; they only feed the features
+        is_shot = events["event_type"].isin(SHOT_TYPES).to_numpy().copy()
+        is_shot[:n_carried] = False
+        shots = self._offense(st, events[is_shot])
+        if shots.empty:
+            return self._empty()
+        shots["is_goal"] = (shots["event_type"] == "goal").astype("int8")
+        feats = build_features(shots, events)
+        out = shots[LIVE_COLUMNS].reset_index(drop=True)
+        for col in FEATURE_COLUMNS:
+            out[col] = feats[col].to_numpy()
+        if self.model is not None:
+            X = feats[list(self.model.feature_columns)].to_numpy(dtype="float32")
+            out["xg"] = np.asarray(self.model.predict_proba(X), dtype="float64")
+            for team, xg in out.groupby("team_id")["xg"].sum().items():
+                st.team_xg[int(team)] = st.team_xg.get(int(team), 0.0) + float(xg)
+        st.shots += len(out)
+        return out
+
+    def _offense(self, st: GameState, shots: pd.DataFrame) -> pd.DataFrame:
+        """x_off / y_off in the shooting team's attacking frame; own-half shots dropped (as in training)."""
+        gid = int(st.game_id)
+        sides = pd.DataFrame([(gid, period, side) for period, side in (st.sides or DEFAULT_SIDES).items()],
+                             columns=PERIOD_COLUMNS)
+        teams = pd.DataFrame({"game_id": [gid], "home_id": [st.home_id]})
+        return attacking_coordinates(shots, sides, teams)
+
+    def _empty(self) -> pd.DataFrame:
+        cols = LIVE_COLUMNS + FEATURE_COLUMNS + (["xg"] if self.model is not None else [])
+        return pd.DataFrame(columns=cols)
+
+
+_TRACKER: Optional[LiveGameTracker] = None
+
+
+def ping_game(game_id, model=None) -> pd.DataFrame:
+    """New shots of `game_id` since the previous ping (module-level tracker)."""
+    global _TRACKER
+    if _TRACKER is None:
+        _TRACKER = LiveGameTracker(model=model)
+    elif model is not None:
+        _TRACKER.model = model
+    return _TRACKER.poll(game_id)
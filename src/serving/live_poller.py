@@ -0,0 +1,222 @@
+"""
+live_poller.py
+Polls every in-progress game of the night concurrently and feeds a LiveGameTracker.
+
+One asyncio task per game; the blocking HTTP calls and tracker updates run in a small
+thread pool over NHLDataClient's pooled session (keep-alive connections, pool sized to
+the concurrency), so a slate of 15 games costs 15 overlapping requests, not a serial
+loop. A failure in one game only backs that game off; the others keep polling.
+
+Each game's next poll is scheduled from what the last response said:
+
+    FUT / PRE          wait until shortly before the start time (or PRE interval)
+    LIVE / CRIT        LIVE interval; x1.5 per unchanged response, up to UNCHANGED_MAX
+    intermission       INTERMISSION interval
+    OFF / FINAL        stop polling the game
+    errors             ERROR interval, doubling (failed requests, unparsable bodies,
+                       and exceptions from the tracker or on_shots)
+
+"Unchanged" is a 304 to the If-None-Match / If-Modified-Since validators of the
+previous response or, when the API sends none, an identical body; either way the
+document is not parsed and the tracker is not called.
+
+    poller = LivePoller(LiveGameTracker(model=load_model("logreg_baseline")), on_shots=print)
+    asyncio.run(poller.run())                        # today's games, until all are final
+"""
+
+import json
+import time
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from src.data.nhl_api_client import DEFAULT_TIMEOUT, NHLDataClient
+from src.serving.game_client import FINAL_STATES, LiveGameTracker
+
+POLL_INTERVALS = {
+    "LIVE": 5.0,
+    "UNCHANGED_MAX": 20.0,
+    "INTERMISSION": 60.0,
+    "PRE": 30.0,
+    "FUT_MAX": 600.0,
+    "ERROR": 10.0,
+}
+UNCHANGED_BACKOFF = 1.5
+# Start polling a scheduled game this long before its start time
+PREGAME_LEAD_S = 120.0
+
+
+def _loads(body: bytes):
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+class GamePoll:
+    """Per-game HTTP state: validators of the last response and the current interval."""
+
+    def __init__(self, game_id: str):
+        self.game_id = str(game_id)
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.body_hash: Optional[bytes] = None
+        self.interval = 0.0
+        self.errors = 0
+        self.requests = 0
+        self.not_modified = 0
+        self.unchanged = 0
+        self.game_state: Optional[str] = None
+
+
+class LivePoller:
+    def __init__(self, tracker: Optional[LiveGameTracker] = None, client: Optional[NHLDataClient] = None,
+                 max_concurrency: int = 16, intervals: Optional[Dict[str, float]] = None,
+                 on_shots: Optional[Callable] = None):
+        """
+        on_shots(game_id, shots_df): called with each non-empty batch of new shots
+        (may be a coroutine function).
+        """
+        self.client = client or NHLDataClient(rate_limit_s=0, concurrency=max_concurrency)
+        self.tracker = tracker or LiveGameTracker(self.client)
+        self.max_concurrency = max_concurrency
+        self.intervals = {**POLL_INTERVALS, **(intervals or {})}
+        self.on_shots = on_shots
+        self.games: Dict[str, GamePoll] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="live-poller")
+
+    # ---------- HTTP (in worker threads) ----------
+    def _get(self, url: str, headers: Dict[str, str]):
+        self.client.bucket.acquire()
+        r = self.client.session.get(url, headers=headers, timeout=DEFAULT_TIMEOUT)
+        return r.status_code, r.headers, r.content
+
+    async def _fetch(self, url: str, headers: Optional[Dict[str, str]] = None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._get, url, headers or {})
+
+    async def live_game_ids(self) -> List[str]:
+        """IDs of today's games that are not final yet (from the /score/now endpoint)."""
+        status, _, body = await self._fetch(f"{self.client.base}/score/now")
+        if status != 200:
+            print(f"[WARN] Could not load today's games (status {status})")
+            return []
+        games = _loads(body).get("games") or []
+        return [str(g["id"]) for g in games if g.get("gameState") not in FINAL_STATES]
+
+    # ---------- scheduling ----------
+    def next_interval(self, gp: GamePoll, game: Optional[dict], changed: bool) -> Optional[float]:
+        """Seconds until the next poll of a game (None = stop)."""
+        iv = self.intervals
+        if game is None:  # unchanged: keep the previous state, back off
+            if gp.game_state in ("LIVE", "CRIT"):
+                return min(max(gp.interval, iv["LIVE"]) * UNCHANGED_BACKOFF, iv["UNCHANGED_MAX"])
+            return gp.interval or iv["LIVE"]
+        state = gp.game_state
+        if state in FINAL_STATES:
+            return None
+        if state == "FUT":
+            start = game.get("startTimeUTC")
+            if start:
+                wait = datetime.fromisoformat(start.replace("Z", "+00:00")).timestamp() - time.time()
+                return min(max(wait - PREGAME_LEAD_S, iv["PRE"]), iv["FUT_MAX"])
+            return iv["PRE"]
+        if state == "PRE":
+            return iv["PRE"]
+        if (game.get("clock") or {}).get("inIntermission"):
+            return iv["INTERMISSION"]
+        return iv["LIVE"] if changed else min(max(gp.interval, iv["LIVE"]) * UNCHANGED_BACKOFF,
+                                              iv["UNCHANGED_MAX"])
+
+    # ---------- polling ----------
+    async def poll_once(self, game_id: str) -> Optional[float]:
+        """One conditional request + tracker update; returns the next interval (None = done)."""
+        gp = self.games.setdefault(str(game_id), GamePoll(game_id))
+        headers = {}
+        if gp.etag:
+            headers["If-None-Match"] = gp.etag
+        if gp.last_modified:
+            headers["If-Modified-Since"] = gp.last_modified
+        gp.requests += 1
+        try:
+            status, resp_headers, body = await self._fetch(self.client.play_by_play_url(gp.game_id), headers)
+        except Exception as e:
+            status, resp_headers, body = None, {}, b""
+            print(f"[WARN] Live poll of {gp.game_id} failed: {e}")
+
+        if status == 304:
+            gp.not_modified += 1
+            gp.interval = self.next_interval(gp, None, False)
+            return gp.interval
+        if status != 200:
+            return self._backoff(gp)
+        gp.etag = resp_headers.get("ETag") or gp.etag
+        gp.last_modified = resp_headers.get("Last-Modified") or gp.last_modified
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if digest == gp.body_hash:
+            gp.unchanged += 1
+            gp.interval = self.next_interval(gp, None, False)
+            return gp.interval
+        gp.body_hash = digest
+
+        try:
+            game = _loads(body)
+            gp.game_state = game.get("gameState")
+            loop = asyncio.get_running_loop()
+            shots = await loop.run_in_executor(self._executor, self.tracker.update, game)
+            if len(shots) and self.on_shots is not None:
+                result = self.on_shots(gp.game_id, shots)
+                if asyncio.iscoroutine(result):
+                    await result
+        except Exception as e:
+            print(f"[WARN] Processing live game {gp.game_id} failed: {e}")
+            # forget the validators so the next poll re-reads the document (the tracker cursor
+            # keeps already-processed plays from being scored twice)
+            gp.etag = gp.last_modified = gp.body_hash = None
+            return self._backoff(gp)
+        gp.errors = 0
+        interval = self.next_interval(gp, game, True)
+        if interval is not None:
+            gp.interval = interval
+        return interval
+
+    def _backoff(self, gp: GamePoll) -> float:
+        gp.errors += 1
+        return self.intervals["ERROR"] * 2 ** min(gp.errors - 1, 5)
+
+    async def _track(self, game_id: str, deadline: Optional[float]):
+        while True:
+            interval = await self.poll_once(game_id)
+            if interval is None:
+                print(f"[INFO] Game {game_id} is final, stopped polling")
+                return
+            if deadline is not None and time.monotonic() + interval > deadline:
+                return
+            await asyncio.sleep(interval)
+
+    async def run(self, game_ids: Optional[List[str]] = None, duration_s: Optional[float] = None):
+        """Poll `game_ids` (default: today's unfinished games) until all are final or duration_s passes."""
+        game_ids = [str(g) for g in game_ids] if game_ids is not None else await self.live_game_ids()
+        deadline = time.monotonic() + duration_s if duration_s is not None else None
+        print(f"[INFO] Polling {len(game_ids)} games")
+        try:
+            results = await asyncio.gather(*(self._track(gid, deadline) for gid in game_ids),
+                                           return_exceptions=True)
+            for gid, result in zip(game_ids, results):
+                if isinstance(result, Exception):
+                    print(f"[WARN] Stopped polling game {gid}: {result}")
+        finally:
+            self.close()
+        return self.stats()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Dict]:
+        return {gid: {"requests": gp.requests, "not_modified": gp.not_modified, "unchanged": gp.unchanged,
+                      "errors": gp.errors, "game_state": gp.game_state}
+                for gid, gp in self.games.items()}
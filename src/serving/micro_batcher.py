@@ -0,0 +1,163 @@
+"""
+micro_batcher.py
+Coalesces concurrent small /predict requests into one model call.
+
+Request threads submit their feature matrix and block on a Future. A single worker
+thread takes the oldest request, keeps collecting until either max_batch_rows rows
+are queued or window_ms has passed since that request arrived, then runs one
+predict_proba over the concatenated rows and scatters the slices back. The window is
+measured from the oldest request's arrival, so time spent queued behind a running
+batch counts against it and queueing delay stays bounded by about one window plus
+one model call. max_pending_rows is the backpressure limit: beyond it, submit()
+raises QueueFull instead of letting latency grow without bound.
+
+    batcher = MicroBatcher(window_ms=3.0, max_batch_rows=4096)
+    p = batcher.predict(X, model)          # from any request thread
+    batcher.stats()                        # queue depth, batch-size histogram, wait percentiles
+"""
+
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+WINDOW_MS = 3.0
+MAX_BATCH_ROWS = 4096
+MAX_PENDING_ROWS = 100_000
+
+
+class QueueFull(RuntimeError):
+    pass
+
+
+class _Request:
+    __slots__ = ("X", "model", "future", "arrived")
+
+    def __init__(self, X: np.ndarray, model):
+        self.X = X
+        self.model = model
+        self.future: Future = Future()
+        self.arrived = time.monotonic()
+
+
+def _default_predict(model, X: np.ndarray) -> np.ndarray:
+    return model.predict_proba(X)
+
+
+class MicroBatcher:
+    def __init__(self, window_ms: float = WINDOW_MS, max_batch_rows: int = MAX_BATCH_ROWS,
+                 max_pending_rows: int = MAX_PENDING_ROWS,
+                 predict_fn: Callable = _default_predict, wait_samples: int = 10_000):
+        self.window_s = window_ms / 1000.0
+        self.max_batch_rows = max_batch_rows
+        self.max_pending_rows = max_pending_rows
+        self.predict_fn = predict_fn
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending_rows = 0
+        self._closed = False
+        # metrics
+        self._requests = self._served = self._batches = self._rows = self._rejected = 0
+        self._max_depth = 0
+        self._batch_hist: Dict[int, int] = {}  # requests per batch, power-of-two buckets
+        self._waits = deque(maxlen=wait_samples)  # seconds from arrival to model call
+        self._thread = threading.Thread(target=self._worker, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    # ---------- request side ----------
+    def submit(self, X: np.ndarray, model) -> Future:
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        with self._lock:
+            if self._pending_rows + len(X) > self.max_pending_rows:
+                self._rejected += 1
+                raise QueueFull(f"{self._pending_rows} rows already queued")
+            self._pending_rows += len(X)
+            self._requests += 1
+            self._max_depth = max(self._max_depth, self._queue.qsize() + 1)
+        req = _Request(X, model)
+        self._queue.put(req)
+        return req.future
+
+    def predict(self, X: np.ndarray, model, timeout: Optional[float] = None) -> np.ndarray:
+        return self.submit(X, model).result(timeout)
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    # ---------- worker ----------
+    def _collect(self, first: _Request) -> Tuple[List[_Request], bool]:
+        batch, rows = [first], len(first.X)
+        deadline = first.arrived + self.window_s
+        while rows < self.max_batch_rows:
+            remaining = deadline - time.monotonic()
+            try:
+                req = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if req is None:
+                return batch, True
+            batch.append(req)
+            rows += len(req.X)
+        return batch, False
+
+    def _run(self, batch: List[_Request]):
+        start = time.monotonic()
+        groups: Dict[int, List[_Request]] = {}
+        for req in batch:  # requests parsed against different model versions never share a call
+            groups.setdefault(id(req.model), []).append(req)
+        for reqs in groups.values():
+            try:
+                X = reqs[0].X if len(reqs) == 1 else np.concatenate([r.X for r in reqs])
+                p = self.predict_fn(reqs[0].model, X)
+                offset = 0
+                for r in reqs:
+                    r.future.set_result(p[offset:offset + len(r.X)])
+                    offset += len(r.X)
+            except Exception as e:
+                for r in reqs:
+                    if not r.future.done():
+                        r.future.set_exception(e)
+        rows = sum(len(r.X) for r in batch)
+        bucket = 1 << (len(batch) - 1).bit_length()
+        with self._lock:
+            self._pending_rows -= rows
+            self._served += len(batch)
+            self._batches += 1
+            self._rows += rows
+            self._batch_hist[bucket] = self._batch_hist.get(bucket, 0) + 1
+            self._waits.extend(start - r.arrived for r in batch)
+
+    def _worker(self):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stop = self._collect(first)
+            self._run(batch)
+
+    # ---------- metrics ----------
+    def stats(self) -> Dict:
+        with self._lock:
+            waits = np.asarray(self._waits, dtype="float64") * 1000
+            return {
+                "queue_depth": self._queue.qsize(),
+                "pending_rows": self._pending_rows,
+                "max_queue_depth": self._max_depth,
+                "requests": self._requests,
+                "rejected": self._rejected,
+                "batches": self._batches,
+                "rows": self._rows,
+                "mean_batch_requests": round(self._served / self._batches, 3) if self._batches else None,
+                "mean_batch_rows": round(self._rows / self._batches, 3) if self._batches else None,
+                "batch_requests_hist": {str(k): v for k, v in sorted(self._batch_hist.items())},
+                "wait_ms_p50": round(float(np.percentile(waits, 50)), 3) if len(waits) else None,
+                "wait_ms_p99": round(float(np.percentile(waits, 99)), 3) if len(waits) else None,
+            }
@@ -1,8 +1,278 @@
 """
 serving_client.py
 Client for interacting with Flask API service.
+
+ServingClient keeps one requests.Session whose HTTPAdapter pool holds keep-alive
+connections to the service, so repeated calls skip the TCP handshake. Transient failures
+(connection errors, timeouts, 429 / 502 / 503 / 504) are retried a bounded number of
+times with full-jitter exponential backoff; 4xx errors are raised immediately.
+
+    client = ServingClient()                         # SERVING_URL
+    p = client.predict(shots_df)                     # one request, goal probabilities
+    ps = client.predict_many([df1, df2, ...])        # coalesced into few large requests
+    client.latency_stats()                           # p50 / p90 / p99 per call, in ms
+
+AsyncServingClient has the same methods as coroutines (run on the pooled session in a
+thread pool). Both expose feature_columns and predict_proba(X), so they can stand in for
+a registry model in LiveGameTracker.
 """
 
-def predict(input_data):
-    print("[Placeholder] Sending /predict request to Flask app")
-    return None
+import gzip
+import json
+import time
+import random
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from src.utils.config import SERVING_URL
+
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+RETRY_STATUS = {429, 502, 503, 504}
+DEFAULT_TIMEOUT = 10.0
+# Bodies smaller than this are sent uncompressed even when compression is on
+COMPRESS_MIN_BYTES = 1024
+
+
+class ServingError(RuntimeError):
+    pass
+
+
+class LatencyHistogram:
+    """Thread-safe log-bucketed latency histogram (0.1 ms .. 60 s, ~5% wide buckets)."""
+
+    def __init__(self, lo_ms: float = 0.1, hi_ms: float = 60_000.0, growth: float = 1.05):
+        n = int(np.ceil(np.log(hi_ms / lo_ms) / np.log(growth))) + 1
+        self.edges = lo_ms * growth ** np.arange(n)
+        self.counts = np.zeros(n + 1, dtype="int64")
+        self.total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, ms: float):
+        i = int(np.searchsorted(self.edges, ms))
+        with self._lock:
+            self.counts[i] += 1
+            self.total_ms += ms
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper edge of the bucket holding the q-th percentile (within ~5%)."""
+        with self._lock:
+            counts = self.counts.copy()
+        n = counts.sum()
+        if n == 0:
+            return None
+        i = int(np.searchsorted(np.cumsum(counts), np.ceil(q / 100 * n)))
+        return float(self.edges[min(i, len(self.edges) - 1)])
+
+    def summary(self) -> Dict:
+        n = int(self.counts.sum())
+        return {"n": n, "mean_ms": round(self.total_ms / n, 3) if n else None,
+                **{f"p{q}_ms": self.percentile(q) for q in (50, 90, 99)}}
+
+
+def _columns(data, feature_columns: Sequence[str]) -> Dict[str, np.ndarray]:
+    """DataFrame / {column: values} / (n, k) array in feature order -> {column: float array}."""
+    if isinstance(data, np.ndarray):
+        data = np.asarray(data, dtype="float32").reshape(len(data), -1)
+        return {c: np.ascontiguousarray(data[:, j]) for j, c in enumerate(feature_columns)}
+    return {c: np.asarray(data[c], dtype="float32") for c in feature_columns}
+
+
+def _n_rows(data) -> int:
+    if isinstance(data, dict):
+        return len(next(iter(data.values()))) if data else 0
+    return len(data)
+
+
+class ServingClient:
+    def __init__(self, base_url: str = SERVING_URL, pool_size: int = 8, max_retries: int = 3,
+                 backoff_s: float = 0.05, max_backoff_s: float = 2.0, timeout: float = DEFAULT_TIMEOUT,
+                 compress: bool = False, fmt: str = "json", max_rows_per_request: int = 8192):
+        """
+        compress: gzip request bodies (>= COMPRESS_MIN_BYTES).
+        fmt: "json" (columnar) or "arrow" (Arrow IPC both ways, needs pyarrow).
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.timeout = timeout
+        self.compress = compress
+        self.fmt = "arrow" if fmt == "arrow" and pa is not None else "json"
+        self.max_rows_per_request = max_rows_per_request
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.latency = LatencyHistogram()
+        self.retries = 0
+        self._feature_columns: Optional[List[str]] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    # ---------- transport ----------
+    def _request(self, method: str, path: str, body: Optional[bytes] = None,
+                 headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        url = f"{self.base_url}{path}"
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                r = self.session.request(method, url, data=body, headers=headers, timeout=self.timeout)
+                if r.status_code not in RETRY_STATUS:
+                    self.latency.record((time.perf_counter() - start) * 1000)
+                    if r.status_code >= 400:
+                        raise ServingError(f"{method} {path} -> {r.status_code}: {r.text[:200]}")
+                    return r
+                error = f"status {r.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = str(e)
+            if attempt == self.max_retries:
+                raise ServingError(f"{method} {path} failed after {attempt + 1} attempts ({error})")
+            self.retries += 1
+            # full jitter: uniform in [0, min(cap, base * 2^attempt)]
+            time.sleep(random.uniform(0, min(self.max_backoff_s, self.backoff_s * 2 ** attempt)))
+
+    @property
+    def feature_columns(self) -> List[str]:
+        if self._feature_columns is None:
+            self._feature_columns = list(self.model_info()["feature_columns"])
+        return self._feature_columns
+
+    def model_info(self) -> Dict:
+        return self._request("GET", "/model").json()
+
+    # ---------- encoding ----------
+    def _encode(self, data):
+        cols = _columns(data, self.feature_columns)
+        headers = {}
+        if self.fmt == "arrow":
+            sink = pa.BufferOutputStream()
+            table = pa.table(cols)
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            body = sink.getvalue().to_pybytes()
+            headers["Content-Type"] = headers["Accept"] = ARROW_MIME
+        else:
+            body = orjson.dumps(cols, option=orjson.OPT_SERIALIZE_NUMPY) if orjson is not None else \
+                json.dumps({c: v.tolist() for c, v in cols.items()}).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        if self.compress and len(body) >= COMPRESS_MIN_BYTES:
+            body = gzip.compress(body, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+        return body, headers
+
+    def _decode(self, r: requests.Response) -> np.ndarray:
+        if r.headers.get("Content-Type", "").startswith(ARROW_MIME):
+            table = pa.ipc.open_stream(pa.py_buffer(r.content)).read_all()
+            return table.column("goal_probability").to_numpy().astype("float64")
+        payload = orjson.loads(r.content) if orjson is not None else r.json()
+        return np.asarray(payload["goal_probability"], dtype="float64")
+
+    # ---------- API ----------
+    def predict(self, data) -> np.ndarray:
+        """Goal probabilities for one batch (DataFrame, {column: values} or (n, k) array)."""
+        if _n_rows(data) == 0:
+            return np.empty(0, dtype="float64")
+        body, headers = self._encode(data)
+        return self._decode(self._request("POST", "/predict", body, headers))
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self.predict(X)
+
+    def _chunks(self, batches: Sequence) -> List[Dict[str, np.ndarray]]:
+        """All batches concatenated column-wise, re-split into requests of max_rows_per_request."""
+        cols = [_columns(b, self.feature_columns) for b in batches if _n_rows(b)]
+        if not cols:
+            return []
+        merged = {c: np.concatenate([b[c] for b in cols]) for c in self.feature_columns}
+        n, step = len(merged[self.feature_columns[0]]), self.max_rows_per_request
+        return [{c: v[i:i + step] for c, v in merged.items()} for i in range(0, n, step)]
+
+    def _split(self, batches: Sequence, results: List[np.ndarray]) -> List[np.ndarray]:
+        p = np.concatenate(results) if results else np.empty(0, dtype="float64")
+        bounds = np.cumsum([0] + [_n_rows(b) for b in batches])
+        return [p[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def predict_many(self, batches: Sequence) -> List[np.ndarray]:
+        """
+        Probabilities for several batches with as few requests as possible: the batches are
+        merged, sent in chunks of max_rows_per_request (concurrently over the pool), and the
+        results split back per input batch.
+        """
+        chunks = self._chunks(batches)
+        if len(chunks) <= 1:
+            return self._split(batches, [self.predict(c) for c in chunks])
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="serving-client")
+        return self._split(batches, list(self._pool.map(self.predict, chunks)))
+
+    def latency_stats(self) -> Dict:
+        return {**self.latency.summary(), "retries": self.retries}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncServingClient(ServingClient):
+    """Coroutine API over the same pooled session (the HTTP calls run in a thread pool)."""
+
+    async def _run(self, fn, *args):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="serving-client")
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    async def predict(self, data) -> np.ndarray:
+        return await self._run(ServingClient.predict, self, data)
+
+    def predict_proba(self, X) -> np.ndarray:
+        # blocking, for synchronous callers such as LiveGameTracker
+        return ServingClient.predict(self, X)
+
+    async def predict_many(self, batches: Sequence) -> List[np.ndarray]:
+        await self._run(lambda: self.feature_columns)
+        chunks = self._chunks(batches)
+        results = await asyncio.gather(*(self._run(ServingClient.predict, self, c) for c in chunks))
+        return self._split(batches, list(results))
+
+    async def model_info(self) -> Dict:
+        return await self._run(ServingClient.model_info, self)
+
+    @property
+    def feature_columns(self) -> List[str]:
+        if self._feature_columns is None:
+            self._feature_columns = list(ServingClient.model_info(self)["feature_columns"])
+        return self._feature_columns
+
+
+_CLIENT: Optional[ServingClient] = None
+
+
+def predict(input_data) -> np.ndarray:
+    """Goal probabilities from the model service (module-level pooled client)."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = ServingClient()
+    return _CLIENT.predict(input_data)
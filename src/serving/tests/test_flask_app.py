@@ -0,0 +1,76 @@
+"""
+src/serving/tests/test_flask_app.py
+-----------------------------------
+Batched /predict: columnar JSON and Arrow IPC bodies, one vectorized call, model hot-swap.
+pytest -q src/serving/tests/test_flask_app.py
+"""
+
+import os, sys
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.models.baseline_models import train_logistic_regression
+from src.models.model_registry import promote, save_model
+from src.serving.flask_app import ARROW_MIME, create_app
+
+
+def _registry(tmp_path, n=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"distance": rng.uniform(0, 90, n), "angle": rng.uniform(-90, 90, n)})
+    df["is_goal"] = (rng.random(n) < 1 / (1 + np.exp(0.08 * df["distance"]))).astype("int8")
+    model = train_logistic_regression(df)
+    registry = str(tmp_path / "models")
+    save_model(model, "xg", registry, promote_now=True)
+    return registry, model
+
+
+def test_predict_json_and_arrow(tmp_path):
+    registry, model = _registry(tmp_path)
+    client = create_app("xg", registry).test_client()
+    shots = {"distance": [5.0, 60.0, None], "angle": [0.0, 30.0, 10.0]}
+    expected = model.predict_proba(np.array([[5, 0], [60, 30], [np.nan, 10]], dtype="float32"))[:, 1]
+
+    r = client.post("/predict", json=shots)
+    assert r.status_code == 200 and r.json["n"] == 3 and r.json["version"] == "v0001"
+    np.testing.assert_allclose(r.json["goal_probability"], expected, atol=1e-5)
+    assert client.post("/predict", json={"columns": shots}).json["goal_probability"] == r.json["goal_probability"]
+
+    sink = pa.BufferOutputStream()
+    table = pa.table({"angle": shots["angle"], "distance": shots["distance"]})
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    r = client.post("/predict", data=sink.getvalue().to_pybytes(), content_type=ARROW_MIME,
+                    headers={"Accept": ARROW_MIME})
+    assert r.mimetype == ARROW_MIME
+    p = pa.ipc.open_stream(r.data).read_all().column("goal_probability").to_numpy()
+    np.testing.assert_allclose(p, expected, atol=1e-5)
+
+    assert client.post("/predict", json={"distance": [1.0]}).status_code == 400
+    assert client.post("/predict", json={"distance": ["x"], "angle": [1]}).status_code == 400
+
+
+def test_bad_arrow_body_is_400(tmp_path):
+    registry, _ = _registry(tmp_path)
+    client = create_app("xg", registry).test_client()
+    r = client.post("/predict", data=b"not an arrow stream", content_type=ARROW_MIME)
+    assert r.status_code == 400 and "Arrow" in r.json["error"]
+
+    # 非数值列 → 400 而不是 500
+    sink = pa.BufferOutputStream()
+    table = pa.table({"distance": ["far"], "angle": [1.0]})
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    assert client.post("/predict", data=sink.getvalue().to_pybytes(), content_type=ARROW_MIME).status_code == 400
+
+
+def test_promoted_version_is_hot_swapped(tmp_path):
+    registry, model = _registry(tmp_path)
+    client = create_app("xg", registry, refresh_s=0.0).test_client()
+    v2 = save_model(model, "xg", registry)
+    assert client.get("/model").json["version"] == "v0001"
+    promote("xg", v2, registry)
+    assert client.post("/predict", json={"distance": [10.0], "angle": [0.0]}).json["version"] == v2
@@ -0,0 +1,105 @@
+"""
+src/serving/tests/test_game_client.py
+-------------------------------------
+Live tracker: polls that only add plays give the same features as one pass over the whole game,
+and the same features as the training pipeline (tidy -> offense coordinates -> build_features).
+pytest -q src/serving/tests/test_game_client.py
+"""
+
+import os, sys
+import numpy as np
+import pandas as pd
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.data.synthetic_games import synthetic_game, write_synthetic_seasons
+from src.data.tidy_data import tidy_all_games
+from src.features.feature_engineering import FEATURE_COLUMNS, iter_season_features
+from src.serving.game_client import LiveGameTracker
+
+TYPES = ["faceoff", "shot-on-goal", "hit", "shot-on-goal", "goal", "giveaway", "missed-shot"]
+
+
+def _game(n_plays, seed=0, state="LIVE"):
+    rng = np.random.default_rng(seed)
+    plays, t = [], 0
+    for i in range(n_plays):
+        t += int(rng.integers(1, 30))
+        period = min(1 + t // 1200, 3)
+        sec = t - (period - 1) * 1200
+        plays.append({
+            "eventId": 100 + i, "sortOrder": 10 * i, "typeDescKey": TYPES[i % len(TYPES)],
+            "periodDescriptor": {"number": period, "periodType": "REG"},
+            "homeTeamDefendingSide": "left" if period % 2 else "right",
+            "timeInPeriod": f"{min(sec, 1199) // 60:02d}:{min(sec, 1199) % 60:02d}",
+            "details": {"eventOwnerTeamId": [1, 2][int(rng.integers(2))], "xCoord": int(rng.integers(-99, 99)),
+                        "yCoord": int(rng.integers(-40, 40)), "zoneCode": ["O", "N", "D"][i % 3]},
+        })
+    return {"id": 2023020204, "gameState": state, "homeTeam": {"id": 1}, "awayTeam": {"id": 2}, "plays": plays}
+
+
+class _Model:
+    feature_columns = ["distance", "angle"]
+
+    def __init__(self):
+        self.rows = 0
+
+    def predict_proba(self, X):
+        self.rows += len(X)
+        return 1 / (1 + np.exp(0.05 * X[:, 0]))
+
+
+def test_incremental_polls_match_full_game():
+    full = _game(120)
+    reference = LiveGameTracker().update(full)
+
+    model = _Model()
+    tracker = LiveGameTracker(model=model)
+    parts = []
+    for end in (1, 2, 9, 9, 40, 77, 120):
+        parts.append(tracker.update({**full, "plays": full["plays"][:end]}))
+    live = pd.concat([p for p in parts if len(p)], ignore_index=True)
+
+    assert live["event_id"].tolist() == reference["event_id"].tolist()
+    np.testing.assert_allclose(live[FEATURE_COLUMNS].to_numpy(float), reference[FEATURE_COLUMNS].to_numpy(float))
+    st = tracker.state("2023020204")
+    assert st.cursor == 1190 and st.events == 120 and st.polls == 7
+    assert model.rows == len(reference) == st.shots  # every shot scored exactly once
+    assert abs(sum(st.team_xg.values()) - live["xg"].sum()) < 1e-9
+    assert tracker.update(full).empty
+
+
+def test_final_state():
+    tracker = LiveGameTracker()
+    tracker.update(_game(5, state="OFF"))
+    assert tracker.state(2023020204).final
+
+
+def test_live_features_match_training(tmp_path):
+    # 同一场比赛：实时追踪的特征 == 训练流水线的特征（进攻方向坐标、同样的射门过滤）
+    raw_dir, processed_dir = str(tmp_path / "raw"), str(tmp_path / "processed")
+    gid = write_synthetic_seasons(raw_dir, seasons=1, games_per_season=1)[0]
+    tidy_all_games(raw_dir, processed_dir=processed_dir, keep_events=True)
+    _, training = next(iter_season_features(processed_dir, raw_dir=raw_dir))
+    training = training.sort_values("event_id").reset_index(drop=True)
+
+    game = synthetic_game(gid)
+    tracker = LiveGameTracker()
+    parts = [tracker.update({**game, "plays": game["plays"][:end]}) for end in (50, 51, 200, len(game["plays"]))]
+    live = pd.concat([p for p in parts if len(p)], ignore_index=True).sort_values("event_id").reset_index(drop=True)
+
+    assert len(live) > 0 and live["event_id"].tolist() == training["event_id"].tolist()
+    np.testing.assert_allclose(live[FEATURE_COLUMNS].to_numpy(float), training[FEATURE_COLUMNS].to_numpy(float))
+
+
+def test_both_teams_get_xg_every_period():
+    # 每节两队的射门都会被打分（只丢弃本方半场的射门）
+    game = synthetic_game(2022020001, 0)
+    tracker = LiveGameTracker(model=_Model())
+    live = tracker.update(game)
+    home, away = game["homeTeam"]["id"], game["awayTeam"]["id"]
+    per_period = live.groupby(["period", "team_id"])["xg"].sum().unstack()
+    assert set(per_period.columns) == {home, away}
+    assert (per_period.loc[[1, 2, 3]] > 0).all().all()
+    assert set(tracker.state(2022020001).team_xg) == {home, away}
@@ -0,0 +1,120 @@
+"""
+src/serving/tests/test_live_poller.py
+-------------------------------------
+Async poller against a local stand-in for the NHL API: concurrent games, ETag 304s,
+stopping at final, and every shot processed exactly once.
+pytest -q src/serving/tests/test_live_poller.py
+"""
+
+import os, sys
+import json
+import asyncio
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.data.nhl_api_client import NHLDataClient
+from src.serving.game_client import LiveGameTracker
+from src.serving.live_poller import LivePoller
+from src.serving.tests.test_game_client import _game
+
+FAST = {"LIVE": 0.02, "UNCHANGED_MAX": 0.05, "INTERMISSION": 0.05, "PRE": 0.05, "FUT_MAX": 0.05, "ERROR": 0.02}
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    docs = {}
+    hits = {}
+
+    def do_GET(self):
+        gid = self.path.split("/")[-2] if "play-by-play" in self.path else None
+        if self.path.endswith("/score/now"):
+            doc = {"games": [{"id": int(g), "gameState": d["gameState"]} for g, d in self.docs.items()]}
+        elif gid in self.docs:
+            doc = self.docs[gid]
+            self.hits[gid] = self.hits.get(gid, 0) + 1
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = json.dumps(doc).encode()
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_poller_follows_games_until_final(tmp_path):
+    full = _game(60)
+    live_id, final_id = str(full["id"]), "2023020205"
+    _StandIn.docs = {live_id: {**full, "plays": full["plays"][:10]},
+                     final_id: {**_game(8, seed=1, state="OFF"), "id": int(final_id)}}
+    _StandIn.hits = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = NHLDataClient(rate_limit_s=0, concurrency=4, store=object())
+    client.base = f"http://127.0.0.1:{server.server_address[1]}"
+    received = []
+    poller = LivePoller(LiveGameTracker(client), client, max_concurrency=4, intervals=FAST,
+                        on_shots=lambda gid, shots: received.append(shots))
+
+    async def feed():
+        for end, state in ((35, "LIVE"), (60, "OFF")):
+            await asyncio.sleep(0.3)
+            _StandIn.docs[live_id] = {**full, "plays": full["plays"][:end], "gameState": state}
+
+    async def main():
+        assert sorted(await poller.live_game_ids()) == [live_id]
+        stats, _ = await asyncio.gather(poller.run([live_id, final_id], duration_s=10), feed())
+        return stats
+
+    stats = asyncio.run(main())
+    server.shutdown()
+
+    reference = LiveGameTracker().update(full)
+    live = pd.concat(received, ignore_index=True)
+    final = LiveGameTracker().update(_StandIn.docs[final_id])
+    assert live["game_id"].value_counts().to_dict() == {int(live_id): len(reference), int(final_id): len(final)}
+    assert sorted(live.loc[live["game_id"] == int(live_id), "event_id"]) == sorted(reference["event_id"])
+    assert stats[final_id]["requests"] == 1 and stats[live_id]["game_state"] == "OFF"
+    assert stats[live_id]["not_modified"] > 0
+
+
+def test_failing_game_does_not_stop_the_others():
+    # 一场比赛的坏数据 / 回调异常只让这场退避，其它比赛照常处理
+    docs = {"2023020204": json.dumps(_game(30, state="OFF")).encode(),
+            "2023020205": json.dumps({**_game(30, seed=1, state="OFF"), "id": 2023020205}).encode(),
+            "2023020206": b"{not json"}
+    client = NHLDataClient(rate_limit_s=0, concurrency=4, store=object())
+    received, calls = [], []
+
+    def on_shots(gid, shots):
+        calls.append(gid)
+        if gid == "2023020205":
+            raise RuntimeError("downstream unavailable")
+        received.append(shots)
+
+    poller = LivePoller(LiveGameTracker(client), client, max_concurrency=4, intervals=FAST, on_shots=on_shots)
+
+    async def fetch(url, headers=None):
+        return 200, {}, docs[url.split("/")[-2]]
+
+    poller._fetch = fetch
+    stats = asyncio.run(poller.run(list(docs), duration_s=0.5))
+
+    assert len(received) == 1 and stats["2023020204"]["game_state"] == "OFF"
+    assert calls.count("2023020205") == 1 and stats["2023020205"]["requests"] == 2  # re-read after the error, then final
+    assert stats["2023020206"]["errors"] > 1 and stats["2023020206"]["requests"] > 1
@@ -0,0 +1,67 @@
+"""
+src/serving/tests/test_micro_batcher.py
+---------------------------------------
+Concurrent single-shot requests are coalesced into few model calls and get their own rows back.
+pytest -q src/serving/tests/test_micro_batcher.py
+"""
+
+import os, sys, time
+import threading
+import numpy as np
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.serving.micro_batcher import MicroBatcher, QueueFull
+
+
+class _SlowModel:
+    def __init__(self):
+        self.calls = []
+
+    def predict_proba(self, X):
+        self.calls.append(len(X))
+        time.sleep(0.005)
+        return X[:, 0] * 2
+
+
+def test_concurrent_requests_share_model_calls():
+    model = _SlowModel()
+    batcher = MicroBatcher(window_ms=5.0, max_batch_rows=64)
+    results = {}
+
+    def client(i):
+        X = np.array([[i, 0.0]], dtype="float32")
+        results[i] = batcher.predict(X, model, timeout=5)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(40)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    assert all(results[i].tolist() == [2.0 * i] for i in range(40))
+    assert len(model.calls) < 40 and max(model.calls) <= 64
+    stats = batcher.stats()
+    assert stats["requests"] == 40 and stats["rows"] == 40 and stats["pending_rows"] == 0
+    assert stats["batches"] == len(model.calls) and stats["mean_batch_requests"] > 1
+    assert stats["wait_ms_p99"] is not None
+
+
+def test_backpressure_and_errors():
+    batcher = MicroBatcher(window_ms=1.0, max_pending_rows=10)
+    try:
+        batcher.submit(np.zeros((11, 2), dtype="float32"), _SlowModel())
+        raise AssertionError("expected QueueFull")
+    except QueueFull:
+        pass
+
+    class _Broken:
+        def predict_proba(self, X):
+            raise RuntimeError("boom")
+
+    fut = batcher.submit(np.zeros((2, 2), dtype="float32"), _Broken())
+    assert isinstance(fut.exception(timeout=5), RuntimeError)
+    assert batcher.stats()["rejected"] == 1
+    batcher.close()
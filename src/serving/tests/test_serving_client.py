@@ -0,0 +1,103 @@
+"""
+src/serving/tests/test_serving_client.py
+----------------------------------------
+Serving client against a real local server: pooled calls, predict_many, gzip, Arrow,
+the async variant, and jittered retries on transient errors.
+pytest -q src/serving/tests/test_serving_client.py
+"""
+
+import os, sys
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+from werkzeug.serving import make_server
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.serving.flask_app import create_app
+from src.serving.serving_client import AsyncServingClient, ServingClient, ServingError
+from src.serving.tests.test_flask_app import _registry
+
+
+def _serve(app):
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def test_client_round_trips(tmp_path):
+    registry, model = _registry(tmp_path)
+    server, url = _serve(create_app("xg", registry))
+    rng = np.random.default_rng(1)
+    batches = [pd.DataFrame({"angle": rng.uniform(-90, 90, n), "distance": rng.uniform(0, 90, n)})
+               for n in (3, 0, 1, 2_000)]
+    expected = [model.predict_proba(b[["distance", "angle"]].to_numpy("float32"))[:, 1] if len(b) else np.empty(0)
+                for b in batches]
+    try:
+        for kwargs in ({}, {"compress": True}, {"fmt": "arrow", "compress": True}):
+            with ServingClient(url, max_rows_per_request=512, **kwargs) as client:
+                assert client.feature_columns == ["distance", "angle"]
+                np.testing.assert_allclose(client.predict(batches[0]), expected[0], atol=1e-5)
+                for got, want in zip(client.predict_many(batches), expected):
+                    np.testing.assert_allclose(got, want, atol=1e-5)
+                stats = client.latency_stats()
+                assert stats["n"] >= 6 and stats["p99_ms"] >= stats["p50_ms"] > 0 and stats["retries"] == 0
+
+        async def run_async():
+            client = AsyncServingClient(url, max_rows_per_request=512)
+            out = await client.predict_many(batches)
+            single = await client.predict({"distance": [5.0], "angle": [0.0]})
+            client.close()
+            return out, single
+
+        out, single = asyncio.run(run_async())
+        for got, want in zip(out, expected):
+            np.testing.assert_allclose(got, want, atol=1e-5)
+        assert len(single) == 1
+    finally:
+        server.shutdown()
+
+
+class _Flaky(BaseHTTPRequestHandler):
+    failures = 2
+    calls = 0
+
+    def do_GET(self):
+        _Flaky.calls += 1
+        if _Flaky.calls <= _Flaky.failures:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b'{"feature_columns": ["distance"]}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_retries_are_bounded():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Flaky)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        _Flaky.calls, _Flaky.failures = 0, 2
+        client = ServingClient(url, max_retries=3, backoff_s=0.001)
+        assert client.feature_columns == ["distance"] and client.retries == 2
+
+        _Flaky.calls, _Flaky.failures = 0, 10
+        client = ServingClient(url, max_retries=2, backoff_s=0.001)
+        try:
+            client.model_info()
+            raise AssertionError("expected ServingError")
+        except ServingError:
+            pass
+        assert _Flaky.calls == 3
+    finally:
+        server.shutdown()
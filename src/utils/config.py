@@ -12,6 +12,27 @@ API_BASE_URL = "https://api-web.nhle.com/v1"
 # Data directories
 DATA_DIR = "./data"
 RAW_DIR = os.path.join(DATA_DIR, "raw")
+MANIFEST_DIR = os.path.join(DATA_DIR, "manifests")
+PROCESSED_DIR = os.path.join(DATA_DIR, "processed")
+FEATURE_STORE_DIR = os.path.join(DATA_DIR, "features")
+SEARCH_DIR = os.path.join(DATA_DIR, "search")
+EXPERIMENT_LOG_DIR = os.path.join(DATA_DIR, "experiments")
+MODEL_REGISTRY_DIR = os.path.join(DATA_DIR, "models")
+
+# Cached feature matrices beyond this size are evicted, least recently used first
+FEATURE_STORE_MAX_BYTES = 2 * 1024 ** 3
+
+# Raw play-by-play storage for new data dirs: "sqlite" (compressed) or "json" (one file per game)
+RAW_STORE_BACKEND = "sqlite"
+
+# Model service: registry name of the model /predict serves, and where it listens
+SERVING_MODEL = "logreg_baseline"
+SERVING_HOST = "0.0.0.0"
+SERVING_PORT = 5000
+SERVING_URL = f"http://127.0.0.1:{SERVING_PORT}"
+# Concurrent small /predict requests are coalesced for up to this long (0 disables micro-batching)
+SERVING_BATCH_WINDOW_MS = 3.0
+SERVING_MAX_BATCH_ROWS = 4096
 
 # Ensure directories exist
 os.makedirs(RAW_DIR, exist_ok=True)
@@ -21,3 +42,6 @@ def print_config():
     print(f"[INFO] API base URL: {API_BASE_URL}")
     print(f"[INFO] Data directory: {DATA_DIR}")
     print(f"[INFO] Raw data directory: {RAW_DIR}")
+    print(f"[INFO] Game ID manifests: {MANIFEST_DIR}")
+    print(f"[INFO] Feature store: {FEATURE_STORE_DIR}")
+    print(f"[INFO] Model registry: {MODEL_REGISTRY_DIR}")
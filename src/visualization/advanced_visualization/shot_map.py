@@ -8,14 +8,23 @@ Advanced Shot Map Visualization
 
 import os
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 from PIL import Image
 from scipy.stats import gaussian_kde
 
+from src.data.tidy_store import load_tidy_shots
+
 
 # ==================== 核心函数 ====================
 
+def shot_histogram(df, bins=(50, 50)):
+    """2D shot counts over the offensive half-rink (x: 0..100, y: -42.5..42.5)."""
+    hist, _, _ = np.histogram2d(
+        df["x"], df["y"], bins=bins, range=[[0, 100], [-42.5, 42.5]]
+    )
+    return hist
+
+
 def plot_hockeyviz_map_interactive(
     season="20202021",
     team_id=None,
@@ -36,15 +45,12 @@ def plot_hockeyviz_map_interactive(
     """
 
     # === 加载数据 ===
-    csv = os.path.join(processed_dir, f"tidy_shots_{season}.csv")
-    if not os.path.exists(csv):
-        print(f"[WARN] Missing file: {csv}")
-        return
-
-    df = pd.read_csv(csv)
-    if "x" not in df or "y" not in df:
-        print("[ERROR] Missing coordinate columns.")
+    # 只读取需要的列与赛季
+    df = load_tidy_shots(processed_dir, seasons=[season], columns=["team_id", "x", "y"])
+    if df.empty:
+        print(f"[WARN] No tidy shots for season {season} in {processed_dir}")
         return
+    df = df.dropna(subset=["team_id", "x", "y"])
 
     if team_id is None:
         team_id = int(df["team_id"].mode().iloc[0])
@@ -68,9 +74,7 @@ def plot_hockeyviz_map_interactive(
     # 🔹 Mode 1: Simple heatmap
     # ----------------------------------------------------------
     if mode == "heatmap":
-        heatmap, xedges, yedges = np.histogram2d(
-            df_team["x"], df_team["y"], bins=(50, 50), range=[[0, 100], [-42.5, 42.5]]
-        )
+        heatmap = shot_histogram(df_team)
         im = ax.imshow(
             heatmap.T,
             extent=[0, 100, -42.5, 42.5],
@@ -85,12 +89,8 @@ def plot_hockeyviz_map_interactive(
     # 🔹 Mode 2: League difference (rectangular)
     # ----------------------------------------------------------
     elif mode == "diff":
-        hist_all, _, _ = np.histogram2d(
-            df_all["x"], df_all["y"], bins=(50, 50), range=[[0, 100], [-42.5, 42.5]]
-        )
-        hist_team, _, _ = np.histogram2d(
-            df_team["x"], df_team["y"], bins=(50, 50), range=[[0, 100], [-42.5, 42.5]]
-        )
+        hist_all = shot_histogram(df_all)
+        hist_team = shot_histogram(df_team)
 
         diff = hist_team / hist_team.max() - hist_all / hist_all.max()
         im = ax.imshow(
@@ -8,7 +8,6 @@ NHL 比赛事件交互调试工具
 - pandas: tabular display of selected events (player/team names)
 """
 import os
-import json
 import requests
 from io import BytesIO
 from typing import Dict, Any, List, Optional
@@ -19,6 +18,9 @@ from ipywidgets import interact, Dropdown, Output
 from IPython.display import display
 import pandas as pd
 
+from src.data.raw_store import open_store
+from src.data.event_stream import iter_plays, project
+
 # =============================
 #  Path Handling / 路径处理
 # =============================
@@ -47,12 +49,10 @@ def ensure_rink_image():
 #  Load & Extract / 加载与提取
 # =====================================
 def load_game_data(game_id: str) -> Optional[Dict[str, Any]]:
-    path = os.path.join(RAW_DIR, f"game_{game_id}.json")
-    if not os.path.exists(path):
-        print(f"[WARN] Missing file: {path}")
-        return None
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    game = open_store(RAW_DIR).get(game_id)
+    if game is None:
+        print(f"[WARN] Missing game {game_id} in {RAW_DIR}")
+    return game
 
 def build_team_map(game: Dict[str, Any]) -> Dict[int, Dict[str, str]]:
     team_map: Dict[int, Dict[str, str]] = {}
@@ -80,40 +80,42 @@ def build_player_map(game: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
         pmap[pid] = {"name": (f"{first} {last}").strip() or f"Player {pid}", "number": str(jersey) if jersey else ""}
     return pmap
 
+# Fields kept per event (everything else in the play is skipped)
+EVENT_FIELDS = {
+    "type": ("typeDescKey",),
+    "period": ("periodDescriptor", "number"),
+    "time": ("timeInPeriod",),
+    "details": ("details",),
+}
+
+#  球员ID提取逻辑（按优先级）
+PLAYER_KEYS = (
+    "scoringPlayerId", "shootingPlayerId", "hittingPlayerId", "committedByPlayerId",
+    "winningPlayerId", "fightingPlayerId1", "playerId",
+)
+
 def extract_events(game: Dict[str, Any]) -> List[Dict[str, Any]]:
-    plays = game.get("plays", []) or []
     events: List[Dict[str, Any]] = []
-    for p in plays:
-        details = p.get("details", {}) or {}
+    for etype, period, time, details in project(iter_plays(game), EVENT_FIELDS):
+        details = details or {}
         # Coordinates may be missing
-        if "xCoord" in details and "yCoord" in details:
-            # Try to resolve best-effort player id key
-            #  球员ID提取逻辑
-            player_id = (
-                details.get("scoringPlayerId")
-                or details.get("shootingPlayerId")
-                or details.get("hittingPlayerId")
-                or details.get("committedByPlayerId")
-                or details.get("winningPlayerId")               
-                or details.get("fightingPlayerId1")
-                or details.get("playerId")
-        
-         
-            )
-
-            events.append(
-                {
-                    "type": p.get("typeDescKey", "unknown"),
-                    "period": (p.get("periodDescriptor", {}) or {}).get("number", "?"),
-                    "time": p.get("timeInPeriod", "?"),
-                    "teamId": details.get("eventOwnerTeamId"),
-                    "playerId": player_id,
-                    "x": details.get("xCoord"),
-                    "y": details.get("yCoord"),
-                    "homeScore": details.get("homeScore"),
-                    "awayScore": details.get("awayScore"),
-                }
-            )
+        if "xCoord" not in details or "yCoord" not in details:
+            continue
+        # Try to resolve best-effort player id key
+        player_id = next((details[k] for k in PLAYER_KEYS if details.get(k)), None)
+        events.append(
+            {
+                "type": etype or "unknown",
+                "period": period if period is not None else "?",
+                "time": time or "?",
+                "teamId": details.get("eventOwnerTeamId"),
+                "playerId": player_id,
+                "x": details.get("xCoord"),
+                "y": details.get("yCoord"),
+                "homeScore": details.get("homeScore"),
+                "awayScore": details.get("awayScore"),
+            }
+        )
     return events
 
 # =====================================
@@ -199,16 +201,17 @@ def interactive_debugger(season: Optional[str] = None, all_games: bool = False):
     if not os.path.exists(RAW_DIR):
         print(f"[ERROR] Missing directory: {RAW_DIR}")
         return
-    files = [f for f in os.listdir(RAW_DIR) if f.startswith("game_") and f.endswith(".json")]
-    if not files:
-        print("[ERROR] No JSON files found in data/raw")
+    store = open_store(RAW_DIR)
+    if not store.game_ids():
+        print("[ERROR] No games found in data/raw")
         return
 
     # Build game list
     if all_games:
-        game_ids = [f.split("game_")[1].split(".json")[0] for f in files]
-    else:      
-        game_ids = [f.split("game_")[1].split(".json")[0] for f in files if "game_"+season[:4] in f]
+        game_ids = store.game_ids()
+    else:
+        season = season or store.game_ids()[0][:4]
+        game_ids = store.game_ids(season)
 
     if not game_ids:
         print(f"[WARN] No games found for season={season}")
@@ -9,7 +9,10 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-import os
+
+from src.data.tidy_store import load_tidy_shots, saved_seasons
+
+PROCESSED_DIR = "../data/processed"
 
 
 # ========== Helper Functions / 辅助函数 ==========
@@ -29,11 +32,11 @@ def plot_shot_type_distribution( season: str):
     按射门类型统计射门与进球数量并绘图。
     """
 
-    df = pd.read_csv("../data/processed/tidy_shots_"+season+".csv")
+    df = load_tidy_shots(PROCESSED_DIR, seasons=[season], columns=["shot_type", "is_goal"])
 
     if df.empty:
         print(f"[WARN] No data found for season {season}")
-        print("[INFO] Available seasons:", df["season"].unique()[:10])
+        print("[INFO] Available seasons:", saved_seasons(PROCESSED_DIR)[:10])
         return pd.DataFrame()
 
     print(f"[INFO] Plotting for season {season} — {len(df)} events found")
@@ -90,15 +93,14 @@ def plot_distance_vs_goal_probability(season_list=None):
 
     # === 🔹 读取各赛季 CSV 文件 ===
     for season in season_list:
-        csv_path = os.path.join("../data/processed", f"tidy_shots_{season}.csv")   
-        if not os.path.exists(csv_path):
-            print(f"[WARN] Missing file: {csv_path}")
+        df = load_tidy_shots(PROCESSED_DIR, seasons=[season], columns=["x", "y", "is_goal"])
+        if df.empty:
+            print(f"[WARN] No tidy shots for season {season}")
             continue
 
-        df = pd.read_csv(csv_path)
         df["season"] = str(season)
         all_data.append(df)
-        print(f"[INFO] Loaded {csv_path} ({len(df)} rows)")
+        print(f"[INFO] Loaded season {season} ({len(df)} rows)")
 
     if not all_data:
         print("[ERROR] No data loaded. Please check season_list or file paths.")
@@ -140,12 +142,7 @@ def plot_goal_percentage_by_distance_and_type(season="20222023"):
     import seaborn as sns
     import matplotlib.pyplot as plt
 
-    csv_path = os.path.join("../data/processed", f"tidy_shots_{season}.csv")   
-    if not os.path.exists(csv_path):
-        print(f"[WARN] Missing file: {csv_path}")
-        return
-
-    df = pd.read_csv(csv_path)
+    df = load_tidy_shots(PROCESSED_DIR, seasons=[season], columns=["x", "y", "shot_type", "is_goal"])
     if df.empty:
         print(f"[WARN] Empty dataset for {season}.")
         return
@@ -205,7 +202,7 @@ def plot_goal_percentage_by_distance_and_type(season="20222023"):
 
 if __name__ == "__main__":
     # Example: load tidy dataset
-    df = pd.read_csv("data/processed/tidy_shots_20222023.csv")
+    PROCESSED_DIR = "data/processed"
     plot_shot_type_distribution(season="20222023")
     plot_distance_vs_goal_probability( season_list=["20182019", "20192020", "20202021"])
     plot_goal_percentage_by_distance_and_type(season="20222023")